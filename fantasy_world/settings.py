@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import environ
 import os
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'trading.middleware.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,16 +83,43 @@ WSGI_APPLICATION = 'fantasy_world.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    "default": {
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds (0 closes them after every request,
+# an empty value or None never does) and checked before reuse. DATABASE_POOL=True switches to psycopg 3's connection
+# pool when psycopg[pool] is installed; pooled connections are returned to the pool after each request
+# instead of being kept by the thread. Setting DATABASE_REPLICA_HOST adds a "replica" alias whose other
+# settings default to the primary's.
+DATABASE_CONN_MAX_AGE = env("DATABASE_CONN_MAX_AGE", default="60").strip()
+DATABASE_CONN_MAX_AGE = None if DATABASE_CONN_MAX_AGE.lower() in ("", "none") else int(DATABASE_CONN_MAX_AGE)
+DATABASE_CONN_HEALTH_CHECKS = env.bool("DATABASE_CONN_HEALTH_CHECKS", default=True)
+DATABASE_POOL = env.bool("DATABASE_POOL", default=False) and find_spec("psycopg_pool") is not None
+DATABASE_POOL_MIN_SIZE = env.int("DATABASE_POOL_MIN_SIZE", default=2)
+DATABASE_POOL_MAX_SIZE = env.int("DATABASE_POOL_MAX_SIZE", default=20)
+DATABASE_POOL_TIMEOUT = env.float("DATABASE_POOL_TIMEOUT", default=10.0)
+
+
+def database(prefix, primary=None):
+    """
+    Builds a DATABASES entry from the <prefix>_NAME/_USER/_PASSWORD/_HOST/_PORT env vars,
+    falling back to the primary entry's values when one is given.
+    """
+    config = {
         "ENGINE": "django.db.backends.postgresql",
-        "NAME": env("DATABASE_NAME"),
-        "USER": env("DATABASE_USER"),
-        "PASSWORD": env("DATABASE_PASSWORD"),
-        "HOST": env("DATABASE_HOST"),
-        "PORT": env("DATABASE_PORT"),
+        "CONN_MAX_AGE": 0 if DATABASE_POOL else DATABASE_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DATABASE_CONN_HEALTH_CHECKS,
+        "OPTIONS": {},
     }
+    for key in ("NAME", "USER", "PASSWORD", "HOST", "PORT"):
+        config[key] = env(f"{prefix}_{key}", default=primary[key]) if primary else env(f"{prefix}_{key}")
+    if DATABASE_POOL:
+        config["OPTIONS"]["pool"] = {"min_size": DATABASE_POOL_MIN_SIZE, "max_size": DATABASE_POOL_MAX_SIZE, "timeout": DATABASE_POOL_TIMEOUT}
+    return config
+
+
+DATABASES = {
+    "default": database("DATABASE"),
 }
+if env("DATABASE_REPLICA_HOST", default=""):
+    DATABASES["replica"] = {**database("DATABASE_REPLICA", DATABASES["default"]), "TEST": {"MIRROR": "default"}}
 
 
 # Password validation
@@ -133,3 +162,87 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Inventory snapshots live in their own alias so the backend can be swapped (e.g. to Redis) via env.
+
+CACHES = {
+    "default": {
+        "BACKEND": env("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env("CACHE_LOCATION", default="fantasy-world"),
+    },
+    "inventory": {
+        "BACKEND": env("INVENTORY_CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env("INVENTORY_CACHE_LOCATION", default="fantasy-world-inventory"),
+    },
+}
+
+INVENTORY_CACHE_ALIAS = "inventory"
+INVENTORY_CACHE_TIMEOUT = env.int("INVENTORY_CACHE_TIMEOUT", default=300)
+
+
+# Trading
+
+# Bounded retries for trade transactions that fail on lock contention (deadlocks, serialization failures).
+TRADE_CONFLICT_MAX_RETRIES = env.int("TRADE_CONFLICT_MAX_RETRIES", default=5)
+TRADE_CONFLICT_BACKOFF_SECONDS = env.float("TRADE_CONFLICT_BACKOFF_SECONDS", default=0.02)
+TRADE_CONFLICT_MAX_BACKOFF_SECONDS = env.float("TRADE_CONFLICT_MAX_BACKOFF_SECONDS", default=0.5)
+
+TRADE_HISTORY_PAGE_SIZE = env.int("TRADE_HISTORY_PAGE_SIZE", default=50)
+TRADE_HISTORY_MAX_PAGE_SIZE = env.int("TRADE_HISTORY_MAX_PAGE_SIZE", default=500)
+
+TRADE_BULK_MAX_OFFERS = env.int("TRADE_BULK_MAX_OFFERS", default=1000)
+
+TRADE_REVERSAL_CHUNK_SIZE = env.int("TRADE_REVERSAL_CHUNK_SIZE", default=500)
+
+# Accepted offers are queued and settled by `manage.py settle_trades` instead of inside the request.
+TRADE_ASYNC_SETTLEMENT = env.bool("TRADE_ASYNC_SETTLEMENT", default=False)
+TRADE_SETTLEMENT_BATCH_SIZE = env.int("TRADE_SETTLEMENT_BATCH_SIZE", default=200)
+TRADE_SETTLEMENT_WORKERS = env.int("TRADE_SETTLEMENT_WORKERS", default=4)
+TRADE_SETTLEMENT_MAX_ATTEMPTS = env.int("TRADE_SETTLEMENT_MAX_ATTEMPTS", default=3)
+TRADE_SETTLEMENT_STALE_SECONDS = env.int("TRADE_SETTLEMENT_STALE_SECONDS", default=300)
+
+# Longest ring of open offers (A -> B -> C -> A) the matching engine searches for, and how long it keeps
+# re-scanning recent offers because a transaction still committing may hold a lower id than one already seen.
+TRADE_MATCHING_MAX_CYCLE_LENGTH = env.int("TRADE_MATCHING_MAX_CYCLE_LENGTH", default=4)
+TRADE_MATCHING_LAG_SECONDS = env.int("TRADE_MATCHING_LAG_SECONDS", default=10)
+
+# Rows fetched per round trip from the server-side cursor when streaming trade exports.
+TRADE_EXPORT_CHUNK_SIZE = env.int("TRADE_EXPORT_CHUNK_SIZE", default=2000)
+
+# Market rollups (`manage.py rollup_market`): ledger rows younger than the lag are left for the next run
+# so transactions still committing lower ids are not skipped; minute buckets are pruned after the retention.
+MARKET_ROLLUP_BATCH_SIZE = env.int("MARKET_ROLLUP_BATCH_SIZE", default=5000)
+MARKET_ROLLUP_LAG_SECONDS = env.int("MARKET_ROLLUP_LAG_SECONDS", default=10)
+MARKET_ROLLUP_MINUTE_RETENTION_DAYS = env.int("MARKET_ROLLUP_MINUTE_RETENTION_DAYS", default=7)
+
+# NumPy trade analytics (`manage.py trade_analytics`, /analytics/<metric>/): rows per cursor round trip,
+# rows stored and returned per metric and how long a process caches the stored result.
+ANALYTICS_CHUNK_SIZE = env.int("ANALYTICS_CHUNK_SIZE", default=20000)
+ANALYTICS_RESULT_LIMIT = env.int("ANALYTICS_RESULT_LIMIT", default=100)
+ANALYTICS_CACHE_TIMEOUT = env.int("ANALYTICS_CACHE_TIMEOUT", default=900)
+
+# Request and service metrics (/metrics/): the fraction of requests and top-level service calls measured.
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_SAMPLE_RATE = env.float("METRICS_SAMPLE_RATE", default=0.1)
+# Only these client addresses, or requests with "Authorization: Bearer <METRICS_TOKEN>", may scrape /metrics/.
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
+# Request profiling: the fraction of API requests profiled without the admin-only X-Profile header,
+# and how long stored profiles are kept (`manage.py profiles --prune`).
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.0)
+PROFILING_RETENTION_DAYS = env.int("PROFILING_RETENTION_DAYS", default=7)
+
+# Read-only endpoints read from this alias when it is configured (DATABASE_REPLICA_HOST). After a write,
+# the users involved read from the primary for REPLICA_STICKY_SECONDS (pins live in the default cache).
+DATABASE_ROUTERS = ["trading.routers.ReplicaRouter"]
+REPLICA_DATABASE_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = env.int("REPLICA_STICKY_SECONDS", default=10)
+
+# Trade archival (`manage.py archive_trades`): settled offers older than this move to the archive tables,
+# a batch of offers per short transaction.
+TRADE_ARCHIVE_AFTER_DAYS = env.int("TRADE_ARCHIVE_AFTER_DAYS", default=180)
+TRADE_ARCHIVE_BATCH_SIZE = env.int("TRADE_ARCHIVE_BATCH_SIZE", default=1000)
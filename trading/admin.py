@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, Weapon, Inventory, TradeOffer, TradeItem, Ledger
+from .models import User, Weapon, Inventory, TradeOffer, TradeItem, Ledger, SettlementJob
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -19,6 +19,29 @@ class WeaponAdmin(admin.ModelAdmin):
 class InventoryAdmin(admin.ModelAdmin):
     list_display = ("user", "weapon", "quantity")
 
+    # Manual edits are recorded as ledger adjustments so the ledger keeps replaying to live inventory.
+    def save_model(self, request, obj, form, change):
+        previous = Inventory.objects.filter(pk=obj.pk).first() if change else None
+        super().save_model(request, obj, form, change)
+
+        balances = {}
+        if previous:
+            balances[(previous.user_id, previous.weapon_id, previous.variant_id)] = -previous.quantity
+        key = (obj.user_id, obj.weapon_id, obj.variant_id)
+        balances[key] = balances.get(key, 0) + obj.quantity
+
+        Ledger.objects.bulk_create(Ledger.adjustment(*key, delta) for key, delta in balances.items() if delta)
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Inventory.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        Ledger.objects.bulk_create(
+            Ledger.adjustment(row.user_id, row.weapon_id, row.variant_id, -row.quantity)
+            for row in queryset if row.quantity
+        )
+        super().delete_queryset(request, queryset)
+
 @admin.register(TradeOffer)
 class TradeOfferAdmin(admin.ModelAdmin):
     list_display = ("sender", "receiver", "status", "created_at")
@@ -33,3 +56,18 @@ class LedgerAdmin(admin.ModelAdmin):
     list_display = ("trade_offer", "sender", "receiver", "weapon", "quantity", "created_at", "reversed")
     list_filter = ("reversed",)
 
+    # The ledger is append-only; entries are written by trade execution only.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(SettlementJob)
+class SettlementJobAdmin(admin.ModelAdmin):
+    list_display = ("trade_offer", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("trade_offer", "attempts", "error", "created_at", "started_at", "finished_at")
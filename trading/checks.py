@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+PROCESS_LOCAL_CACHE_BACKENDS = {"django.core.cache.backends.locmem.LocMemCache"}
+
+
+def process_local_caches():
+    """
+    Returns the aliases of the caches holding inventory snapshots and replica pins whose backend
+    is private to each process, so invalidations and pins made elsewhere never reach them.
+    """
+    return [
+        alias for alias in ("default", settings.INVENTORY_CACHE_ALIAS)
+        if settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_CACHE_BACKENDS
+    ]
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Inventory snapshots are invalidated and users pinned to the primary in whichever process made
+    the write. With TRADE_ASYNC_SETTLEMENT that is the settle_trades worker, so the web processes
+    would serve stale inventories (and matching ETags) until INVENTORY_CACHE_TIMEOUT.
+    """
+    aliases = process_local_caches()
+    if not aliases:
+        return []
+
+    hint = "Set CACHE_BACKEND and INVENTORY_CACHE_BACKEND to a shared backend such as Redis or Memcached."
+    if settings.TRADE_ASYNC_SETTLEMENT:
+        return [Error(
+            f"TRADE_ASYNC_SETTLEMENT needs caches shared between processes, but {', '.join(aliases)} are process-local.",
+            hint=hint, id="trading.E001",
+        )]
+    if not settings.DEBUG:
+        return [Warning(
+            f"The {', '.join(aliases)} caches are process-local: inventory invalidations from other server workers "
+            f"or `replay_ledger --rebuild` do not reach them.",
+            hint=hint, id="trading.W001",
+        )]
+    return []
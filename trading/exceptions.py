@@ -3,4 +3,9 @@ from rest_framework.exceptions import APIException
 class TradeValidationError(APIException):
     status_code = 400
     default_detail = "Invalid trade request."
-    default_code = "trade_validation_error"
\ No newline at end of file
+    default_code = "trade_validation_error"
+
+class TradeConflictError(APIException):
+    status_code = 409
+    default_detail = "The trade could not be completed because of concurrent updates. Please retry."
+    default_code = "trade_conflict"
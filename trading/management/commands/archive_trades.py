@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from trading.services.archive_service import TradeArchiveService
+
+class Command(BaseCommand):
+    help = (
+        "Moves accepted, rejected and reversed trade offers older than TRADE_ARCHIVE_AFTER_DAYS, with their items, "
+        "into the archive tables, a batch per short transaction so live trading is never blocked for long. "
+        "Archived offers stay in trade history and exports but can no longer be reversed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.TRADE_ARCHIVE_BATCH_SIZE, help="Offers archived per transaction.")
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches (default: until none are left).")
+
+    def handle(self, *args, **options):
+        archived = TradeArchiveService.run(options["batch_size"], options["max_batches"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} trade offers."))
@@ -0,0 +1,86 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from trading.services.analytics_service import TradeAnalyticsService, np
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the NumPy analytics kernels on --rows synthetic trade items, ledger movements and "
+        "inventory rows each, and compares them with a plain Python loop over a --python-rows sample. "
+        "No database access; arrays are generated in memory (about 80 bytes per row at peak)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000_000, help="Rows per synthetic table.")
+        parser.add_argument("--python-rows", type=int, default=200_000, help="Rows timed with the pure Python baseline.")
+        parser.add_argument("--users", type=int, default=100_000, help="Distinct users.")
+        parser.add_argument("--instruments", type=int, default=2_000, help="Distinct (weapon, variant) instruments.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if np is None:
+            raise CommandError("Trade analytics require NumPy: pip install numpy")
+
+        rng = np.random.default_rng(options["seed"])
+        rows, users, instruments = options["rows"], options["users"], options["instruments"]
+
+        # Trade items: two lines per offer, one offered and one requested.
+        offer_ids = np.repeat(np.arange(rows // 2, dtype=np.int64), 2)
+        offered = np.tile(np.array([1, 0], dtype=np.int64), rows // 2)
+        items = rng.integers(0, instruments, len(offer_ids))
+        quantities = rng.integers(1, 10, len(offer_ids))
+        self._time("exchange-rates", len(offer_ids), options["python_rows"],
+                   lambda: TradeAnalyticsService.exchange_rates(offer_ids, offered, items, quantities),
+                   lambda n: self._python_exchange_rates(offer_ids[:n], offered[:n], items[:n], quantities[:n]))
+        del offer_ids, offered, items, quantities
+
+        senders, receivers = rng.integers(0, users, rows), rng.integers(0, users, rows)
+        quantities = rng.integers(1, 10, rows)
+        self._time("centrality", rows, None, lambda: TradeAnalyticsService.centrality(senders, receivers, quantities))
+        del senders, receivers, quantities
+
+        holdings = rng.integers(0, instruments, rows)
+        quantities = rng.zipf(2.0, rows).clip(max=1_000_000)
+        self._time("inventory", rows, options["python_rows"],
+                   lambda: TradeAnalyticsService.inventory_distribution(holdings, quantities),
+                   lambda n: self._python_inventory(holdings[:n], quantities[:n]))
+
+    def _time(self, name, rows, python_rows, kernel, baseline=None):
+        started = time.perf_counter()
+        kernel()
+        seconds = time.perf_counter() - started
+        line = f"{name}: {rows:,} rows in {seconds:.2f}s ({rows / seconds:,.0f} rows/s)"
+
+        if baseline and python_rows:
+            started = time.perf_counter()
+            baseline(python_rows)
+            python_rate = python_rows / (time.perf_counter() - started)
+            line += f", {rows / seconds / python_rate:,.0f}x the pure Python loop ({python_rate:,.0f} rows/s)"
+        self.stdout.write(line)
+
+    def _python_exchange_rates(self, offer_ids, offered, items, quantities):
+        lines = {}
+        for offer_id, is_offered, item, quantity in zip(offer_ids.tolist(), offered.tolist(), items.tolist(), quantities.tolist()):
+            lines.setdefault(offer_id, ([], []))[0 if is_offered else 1].append((item, quantity))
+        totals = {}
+        for gives, wants in lines.values():
+            if len(gives) == 1 and len(wants) == 1 and gives[0][0] != wants[0][0]:
+                for (base, base_quantity), (quote, quote_quantity) in ((gives[0], wants[0]), (wants[0], gives[0])):
+                    total = totals.setdefault((base, quote), [0, 0])
+                    total[0] += base_quantity
+                    total[1] += quote_quantity
+        return {pair: quote / base for pair, (base, quote) in totals.items()}
+
+    def _python_inventory(self, holdings, quantities):
+        groups = {}
+        for item, quantity in zip(holdings.tolist(), quantities.tolist()):
+            groups.setdefault(item, []).append(quantity)
+        distribution = {}
+        for item, values in groups.items():
+            values.sort()
+            total = sum(values)
+            weighted = sum(rank * value for rank, value in enumerate(values, 1))
+            distribution[item] = (
+                len(values), total, values[(len(values) - 1) // 2], values[-(-len(values) * 9 // 10) - 1],
+                2 * weighted / (len(values) * total) - (len(values) + 1) / len(values),
+            )
+        return distribution
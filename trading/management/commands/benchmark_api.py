@@ -0,0 +1,250 @@
+import http.client
+import json
+import random
+import statistics
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from trading.models import Inventory, Ledger, TradeOffer, User
+from trading.services.trade_service import TradeService
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the trading API end to end against a running server (e.g. on data from generate_data): "
+        "creating, accepting and rejecting offers, history pages by page size and history depth, and inventory "
+        "reads. Reports throughput, p50/p95/p99 latency and database queries per request, and writes the results "
+        "as JSON so runs on different commits can be compared with --compare. The server must use the same "
+        "database as this command; accept/reject fixtures are created here before the run."
+    )
+
+    SCENARIOS = ["create", "accept", "reject", "history", "inventory"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running server.")
+        parser.add_argument("--scenarios", nargs="+", choices=self.SCENARIOS, default=self.SCENARIOS)
+        parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent keep-alive connections.")
+        parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 200], help="History page sizes to benchmark.")
+        parser.add_argument("--query-samples", type=int, default=10, help="Requests per scenario run in-process to count queries.")
+        parser.add_argument("--output", default="benchmark.json", help="File the JSON results are written to.")
+        parser.add_argument("--compare", help="Earlier results file to report the change against.")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        parts = urlsplit(options["url"])
+        if parts.scheme != "http" or not parts.hostname:
+            raise CommandError(f"Only plain http:// URLs are supported: {options['url']}")
+
+        self.rng = random.Random(options["seed"])
+        self.client = Client(HTTP_HOST=parts.netloc)
+        count = options["requests"] + options["query_samples"]
+
+        scenarios = {}
+        for scenario in options["scenarios"]:
+            if scenario == "history":
+                for depth, user_ids in self._history_users().items():
+                    for page_size in options["page_sizes"]:
+                        scenarios[f"history/{depth}/page_size={page_size}"] = [
+                            ("GET", f"/trade-offer/history/?{urlencode({'user_id': self.rng.choice(user_ids), 'page_size': page_size})}", None)
+                            for _ in range(count)
+                        ]
+            else:
+                scenarios[scenario] = getattr(self, f"_{scenario}_requests")(count)
+
+        results = {}
+        for name, requests in scenarios.items():
+            if not requests:
+                self.stderr.write(f"{name}: skipped, the database has no data for it (run generate_data).")
+                continue
+
+            queries = self._count_queries(requests[:options["query_samples"]])
+            latencies, errors, seconds = self._run(parts, requests[options["query_samples"]:], options)
+            results[name] = self._summary(latencies, errors, seconds, queries)
+            self.stdout.write(self._format(name, results[name]))
+
+        report = {
+            "commit": self._commit(),
+            "created_at": now().isoformat(),
+            "url": options["url"],
+            "database": connection.vendor,
+            "concurrency": options["concurrency"],
+            "data": {"users": User.objects.count(), "trade_offers": TradeOffer.objects.count(), "ledger": Ledger.objects.count()},
+            "results": results,
+        }
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+        if options["compare"]:
+            with open(options["compare"]) as baseline:
+                self._compare(json.load(baseline), report)
+
+    def _trades(self, count):
+        """
+        Plans up to count one-for-one trades of a single unit that can all be accepted: each party owns
+        the item it gives and holds no other variant of the weapon it takes (one variant per weapon).
+        """
+        last_id = Inventory.objects.aggregate(Max("id"))["id__max"] or 0
+        sample = self.rng.sample(range(1, last_id + 1), min(20 * count, last_id))
+        rows = list(Inventory.objects.filter(id__in=sample, quantity__gt=0).order_by("id").values_list("user_id", "weapon_id", "variant_id", "quantity"))
+        holdings = defaultdict(dict)
+        remaining = {}
+        users = Inventory.objects.filter(user_id__in={row[0] for row in rows}).values_list("user_id", "weapon_id", "variant_id", "quantity")
+        for user_id, weapon_id, variant_id, quantity in users:
+            holdings[user_id][weapon_id] = variant_id
+            remaining[(user_id, weapon_id)] = quantity
+
+        trades = []
+        for _ in range(20 * count):
+            if len(trades) == count or len(rows) < 2:
+                break
+            (sender, offered, offered_variant, _), (receiver, requested, requested_variant, _) = self.rng.sample(rows, 2)
+            if (
+                sender == receiver or offered == requested
+                or not remaining[(sender, offered)] or not remaining[(receiver, requested)]
+                or holdings[receiver].get(offered, offered_variant) != offered_variant
+                or holdings[sender].get(requested, requested_variant) != requested_variant
+            ):
+                continue
+
+            remaining[(sender, offered)] -= 1
+            remaining[(receiver, requested)] -= 1
+            holdings[receiver][offered], holdings[sender][requested] = offered_variant, requested_variant
+            trades.append({
+                "sender_id": sender, "receiver_id": receiver,
+                "offered_items": [{"weapon_id": offered, "variant_id": offered_variant, "quantity": 1}],
+                "requested_items": [{"weapon_id": requested, "variant_id": requested_variant, "quantity": 1}],
+            })
+        return trades
+
+    def _create_requests(self, count):
+        return [("POST", "/trade-offer/", trade) for trade in self._trades(count)]
+
+    def _accept_requests(self, count, action="ACCEPT"):
+        trades = self._trades(count)
+        results = TradeService.create_trade_offers(trades) if trades else []
+        return [
+            ("PATCH", f"/trade-offer/{result['trade_offer_id']}/", {"receiver_id": trade["receiver_id"], "action": action})
+            for trade, result in zip(trades, results) if "trade_offer_id" in result
+        ]
+
+    def _reject_requests(self, count):
+        return self._accept_requests(count, "REJECT")
+
+    def _inventory_requests(self, count):
+        user_ids = list(Inventory.objects.order_by().values_list("user_id", flat=True).distinct()[:1000])
+        return [("GET", f"/inventory/{self.rng.choice(user_ids)}/", None) for _ in range(count)] if user_ids else []
+
+    def _history_users(self):
+        """
+        Groups users by how many offers they sent: the median user ("median") and the top 1% ("deep").
+        """
+        counts = sorted(TradeOffer.objects.order_by().values_list("sender_id").annotate(offers=Count("id")).values_list("offers", "sender_id"))
+        if not counts:
+            return {}
+        median = counts[len(counts) // 2][0]
+        return {
+            "median": [user_id for offers, user_id in counts if offers == median][:100],
+            "deep": [user_id for _, user_id in counts[-max(1, len(counts) // 100):]],
+        }
+
+    def _count_queries(self, requests):
+        """
+        Serves the requests in-process and returns the mean number of queries per request.
+        """
+        if not requests:
+            return None
+        with CaptureQueriesContext(connection) as queries:
+            for method, path, body in requests:
+                if body is None:
+                    self.client.generic(method, path)
+                else:
+                    self.client.generic(method, path, json.dumps(body), content_type="application/json")
+        return len(queries) / len(requests)
+
+    def _run(self, parts, requests, options):
+        remaining = iter(requests)
+        lock = threading.Lock()
+        latencies = []
+        errors = 0
+
+        def worker():
+            nonlocal errors
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=options["timeout"])
+            timings = []
+            failed = 0
+            while True:
+                with lock:
+                    request = next(remaining, None)
+                if request is None:
+                    break
+                method, path, body = request
+                started = time.perf_counter()
+                try:
+                    connection.request(method, path, body=json.dumps(body) if body else None, headers={"Content-Type": "application/json"} if body else {})
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 400:
+                        failed += 1
+                        continue
+                    timings.append((time.perf_counter() - started) * 1000)
+                except (OSError, http.client.HTTPException):
+                    failed += 1
+                    connection.close()
+            connection.close()
+
+            with lock:
+                latencies.extend(timings)
+                errors += failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            for _ in range(options["concurrency"]):
+                pool.submit(worker)
+        return latencies, errors, time.perf_counter() - started
+
+    def _summary(self, latencies, errors, seconds, queries):
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "throughput": round(len(latencies) / seconds, 1),
+            "p50_ms": round(percentiles[49], 2) if percentiles else None,
+            "p95_ms": round(percentiles[94], 2) if percentiles else None,
+            "p99_ms": round(percentiles[98], 2) if percentiles else None,
+            "queries_per_request": queries,
+        }
+
+    def _format(self, name, result):
+        return (
+            f"{name}: {result['throughput']:,.0f} req/s, p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms, "
+            f"{result['queries_per_request']} queries/request, {result['errors']} errors"
+        )
+
+    def _compare(self, baseline, report):
+        self.stdout.write(f"Change against {baseline.get('commit') or 'baseline'}:")
+        for name, result in report["results"].items():
+            before = baseline.get("results", {}).get(name)
+            if not before:
+                continue
+            changes = []
+            for metric in ("throughput", "p50_ms", "p95_ms", "p99_ms", "queries_per_request"):
+                if before.get(metric) and result.get(metric) is not None:
+                    changes.append(f"{metric} {(result[metric] - before[metric]) / before[metric]:+.1%}")
+            self.stdout.write(f"  {name}: {', '.join(changes)}")
+
+    def _commit(self):
+        try:
+            return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,89 @@
+import copy
+import statistics
+import time
+from importlib.util import find_spec
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+class Command(BaseCommand):
+    help = (
+        "Measures what connection reuse saves per request. Runs simulated request cycles (the connection "
+        "checks Django makes when a request starts and finishes, around a few queries) with a new connection "
+        "per request, with persistent health-checked connections, and with the psycopg connection pool "
+        "(PostgreSQL with psycopg[pool] only), and reports the latency of each."
+    )
+
+    MODES = ["per-request", "persistent", "pool"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias whose settings are benchmarked.")
+        parser.add_argument("--modes", nargs="+", choices=self.MODES, default=self.MODES)
+        parser.add_argument("--requests", type=int, default=500, help="Timed request cycles per mode.")
+        parser.add_argument("--queries", type=int, default=3, help="Queries per request.")
+        parser.add_argument("--warmup", type=int, default=10, help="Untimed request cycles per mode.")
+
+    def handle(self, *args, **options):
+        base = connections[options["database"]].settings_dict
+        results = {}
+        for mode in options["modes"]:
+            settings_dict = self._settings(base, mode)
+            if settings_dict is None:
+                self.stderr.write(f"{mode}: skipped, needs PostgreSQL with psycopg[pool] installed.")
+                continue
+
+            connection = load_backend(settings_dict["ENGINE"]).DatabaseWrapper(settings_dict, f"benchmark-{mode}")
+            try:
+                for _ in range(options["warmup"]):
+                    self._request(connection, options["queries"])
+                timings = []
+                for _ in range(options["requests"]):
+                    started = time.perf_counter()
+                    self._request(connection, options["queries"])
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+                if mode == "pool":
+                    connection.close_pool()
+
+            results[mode] = timings
+            percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+            self.stdout.write(
+                f"{mode}: mean={statistics.fmean(timings):.3f}ms p50={percentiles[49]:.3f}ms p99={percentiles[98]:.3f}ms per request"
+            )
+
+        if "per-request" in results:
+            baseline = statistics.fmean(results["per-request"])
+            for mode, timings in results.items():
+                if mode != "per-request":
+                    saved = baseline - statistics.fmean(timings)
+                    self.stdout.write(self.style.SUCCESS(f"{mode} saves {saved:.3f}ms per request ({saved / baseline:.0%})"))
+
+    def _settings(self, base, mode):
+        """
+        Returns a copy of the alias' settings configured for the mode, or None if it is unavailable.
+        """
+        settings_dict = copy.deepcopy(base)
+        settings_dict["OPTIONS"].pop("pool", None)
+        if mode == "per-request":
+            settings_dict.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)
+        elif mode == "persistent":
+            settings_dict.update(CONN_MAX_AGE=base["CONN_MAX_AGE"] or settings.DATABASE_CONN_MAX_AGE or None, CONN_HEALTH_CHECKS=True)
+        else:
+            if settings_dict["ENGINE"] != "django.db.backends.postgresql" or find_spec("psycopg_pool") is None:
+                return None
+            settings_dict["OPTIONS"]["pool"] = {
+                "min_size": settings.DATABASE_POOL_MIN_SIZE, "max_size": settings.DATABASE_POOL_MAX_SIZE, "timeout": settings.DATABASE_POOL_TIMEOUT,
+            }
+            settings_dict.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)
+        return settings_dict
+
+    def _request(self, connection, queries):
+        # What request_started and request_finished do (close_old_connections) around the view.
+        connection.close_if_unusable_or_obsolete()
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        connection.close_if_unusable_or_obsolete()
@@ -0,0 +1,54 @@
+import random
+import statistics
+import time
+from collections import Counter
+from django.core.management.base import BaseCommand
+from trading.services.matching import Order, OrderBook
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the in-memory order book: fills it with --offers random open offers, then reports "
+        "the latency of matching --probes more against it. No database access."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--offers", type=int, default=100_000, help="Open offers to load into the book.")
+        parser.add_argument("--probes", type=int, default=10_000, help="Offers whose match latency is measured.")
+        parser.add_argument("--users", type=int, default=10_000, help="Distinct users placing offers.")
+        parser.add_argument("--assets", type=int, default=20_000, help="Distinct (weapon, variant) lines traded.")
+        parser.add_argument("--max-cycle-length", type=int, default=4, help="Longest ring of offers to search for.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        book = OrderBook(options["max_cycle_length"])
+        next_id = iter(range(1, options["offers"] + options["probes"] + 1))
+
+        def random_order():
+            gives, wants = rng.sample(range(options["assets"]), 2)
+            return Order(next(next_id), rng.randrange(options["users"]), (gives, None, 1), (wants, None, 1))
+
+        started = time.perf_counter()
+        loaded = Counter(len(ring) for ring in (book.add(random_order()) for _ in range(options["offers"])) if ring)
+        load_seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"Loaded {options['offers']} offers in {load_seconds:.2f}s ({options['offers'] / load_seconds:,.0f}/s): "
+            f"{len(book)} open, matches by ring length {dict(sorted(loaded.items()))}"
+        )
+
+        latencies = []
+        matched = Counter()
+        for _ in range(options["probes"]):
+            order = random_order()
+            started = time.perf_counter()
+            ring = book.add(order)
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+            if ring:
+                matched[len(ring)] += 1
+
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"Matched {options['probes']} offers against a book of {len(book)}: "
+            f"p50={percentiles[49]:.1f}us p95={percentiles[94]:.1f}us p99={percentiles[98]:.1f}us max={max(latencies):.1f}us, "
+            f"matches by ring length {dict(sorted(matched.items()))}"
+        )
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from trading.exceptions import TradeValidationError
+from trading.services.export_service import TradeExportService
+from trading.services.history_service import TradeHistoryService
+
+class Command(BaseCommand):
+    help = "Streams trade history, one row per trade item, as NDJSON or CSV to a file or stdout in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(TradeExportService.FORMATS), default=TradeExportService.NDJSON, dest="file_format")
+        parser.add_argument("--output", help="File to write (default: stdout).")
+        parser.add_argument("--user", type=int, help="Only export the offers of this user id.")
+        parser.add_argument("--type", choices=["sent", "received"], help="With --user, only sent or received offers.")
+        parser.add_argument("--status", type=int, help="Only offers with this status.")
+        parser.add_argument("--start-date", help="Start date (YYYY-MM-DD, inclusive).")
+        parser.add_argument("--end-date", help="End date (YYYY-MM-DD, inclusive).")
+        parser.add_argument("--chunk-size", type=int, default=settings.TRADE_EXPORT_CHUNK_SIZE, help="Rows fetched per round trip from the server-side cursor.")
+
+    def handle(self, *args, **options):
+        if options["type"] and options["user"] is None:
+            raise CommandError("--type requires --user.")
+
+        params = {key: options[key] for key in ("type", "status", "start_date", "end_date") if options[key] is not None}
+        try:
+            direction, filters = TradeHistoryService.parse_filters(params)
+        except TradeValidationError as e:
+            raise CommandError(str(e))
+
+        rows = TradeExportService.rows(options["user"], direction, filters, options["chunk_size"])
+        lines = TradeExportService.encode(rows, options["file_format"])
+
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as output:
+            output.writelines(lines)
@@ -0,0 +1,51 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from trading.services.data_generator import DataGenerator
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with a reproducible synthetic dataset for load tests: users, weapons and variants, "
+        "inventory and a history of trade offers with their items and ledger movements. Existing trading data is "
+        "deleted first unless --append is given. Afterwards run rebuild_trade_stats and rollup_market to build "
+        "the derived tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--weapons", type=int, default=30)
+        parser.add_argument("--variants-per-weapon", type=int, default=3)
+        parser.add_argument("--inventory-density", type=float, default=0.3, help="Fraction of the weapons each user holds.")
+        parser.add_argument("--offers", type=int, default=10_000, help="Historical trade offers.")
+        parser.add_argument("--max-items-per-offer", type=int, default=3, help="Most lines on each side of an offer.")
+        parser.add_argument("--days", type=int, default=365, help="Days of history the offers are spread over.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT or COPY.")
+        parser.add_argument("--copy", action="store_true", help="Load with COPY instead of batched INSERTs (PostgreSQL only).")
+        parser.add_argument("--append", action="store_true", help="Keep the existing data and add the new rows after it.")
+
+    def handle(self, *args, **options):
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy requires PostgreSQL.")
+        if options["weapons"] < 2 or options["max_items_per_offer"] < 1:
+            raise CommandError("At least 2 weapons and 1 item per offer are needed.")
+        # Checked before the reset deletes anything; generate() raises the same error.
+        if options["users"] < 2 * max(1, options["variants_per_weapon"]):
+            raise CommandError("At least two users per variant are needed, so every user has a trading partner.")
+        if not 0 <= options["inventory_density"] <= 1:
+            raise CommandError("--inventory-density must be between 0 and 1.")
+
+        started = time.perf_counter()
+        if not options["append"]:
+            DataGenerator.reset()
+
+        generator = DataGenerator(options["seed"], options["batch_size"], options["copy"])
+        counts = generator.generate(
+            options["users"], options["weapons"], options["variants_per_weapon"], options["inventory_density"],
+            options["offers"], options["max_items_per_offer"], options["days"],
+        )
+
+        seconds = time.perf_counter() - started
+        rows = sum(counts.values())
+        self.stdout.write(", ".join(f"{count} {model}" for model, count in counts.items()))
+        self.stdout.write(self.style.SUCCESS(f"Generated {rows} rows in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)."))
@@ -0,0 +1,77 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests running API servers, e.g. the WSGI (gunicorn) and ASGI (uvicorn) deployments of the "
+        "same endpoint: fires --requests GETs at each --url from --concurrency keep-alive connections and "
+        "reports throughput and latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", action="append", required=True, help="URL to load-test; repeat to compare several.")
+        parser.add_argument("--concurrency", type=int, default=200, help="Concurrent connections.")
+        parser.add_argument("--requests", type=int, default=10_000, help="Requests per URL.")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+
+    def handle(self, *args, **options):
+        for url in options["url"]:
+            parts = urlsplit(url)
+            if parts.scheme != "http" or not parts.hostname:
+                raise CommandError(f"Only plain http:// URLs are supported: {url}")
+
+            latencies, errors, seconds = self._run(parts, options)
+            if not latencies:
+                raise CommandError(f"All {errors} requests to {url} failed.")
+
+            percentiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{url}: {len(latencies) / seconds:,.0f} req/s over {options['concurrency']} connections, "
+                f"p50={percentiles[49]:.1f}ms p95={percentiles[94]:.1f}ms p99={percentiles[98]:.1f}ms "
+                f"max={max(latencies):.1f}ms, {errors} errors"
+            )
+
+    def _run(self, parts, options):
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        remaining = iter(range(options["requests"]))
+        lock = threading.Lock()
+        latencies = []
+        errors = 0
+
+        def worker():
+            nonlocal errors
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=options["timeout"])
+            timings = []
+            failed = 0
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                started = time.perf_counter()
+                try:
+                    connection.request("GET", path)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 400:
+                        failed += 1
+                        continue
+                    timings.append((time.perf_counter() - started) * 1000)
+                except (OSError, http.client.HTTPException):
+                    failed += 1
+                    connection.close()
+            connection.close()
+
+            with lock:
+                latencies.extend(timings)
+                errors += failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            for _ in range(options["concurrency"]):
+                pool.submit(worker)
+        return latencies, errors, time.perf_counter() - started
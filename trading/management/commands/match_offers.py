@@ -0,0 +1,34 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from trading.services.matching import MatchingEngine
+
+class Command(BaseCommand):
+    help = (
+        "Runs the matching engine: rebuilds the order book from open trade offers, then keeps matching "
+        "newly created open offers, including rings of up to --max-cycle-length offers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-cycle-length", type=int, default=settings.TRADE_MATCHING_MAX_CYCLE_LENGTH, help="Longest ring of offers to search for.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls for new open offers.")
+        parser.add_argument("--once", action="store_true", help="Match the open offers once and exit.")
+
+    def handle(self, *args, **options):
+        engine = MatchingEngine(options["max_cycle_length"])
+
+        started = time.perf_counter()
+        rings = engine.poll()
+        self.stdout.write(
+            f"Order book rebuilt in {time.perf_counter() - started:.2f}s: {len(rings)} matches settled, {len(engine.book)} open offers."
+        )
+
+        try:
+            while not options["once"]:
+                time.sleep(options["poll_interval"])
+                for ring in engine.poll():
+                    self.stdout.write(f"Matched trade offers {ring}")
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"{len(engine.book)} open offers left in the book."))
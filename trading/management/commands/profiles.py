@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now, timedelta
+from trading.models import RequestProfile
+from trading.services.profiling_service import ProfilingService
+
+class Command(BaseCommand):
+    help = (
+        "Lists captured request profiles, or sums their collapsed stacks (--aggregate) into one file for "
+        "flamegraph.pl, inferno or speedscope, optionally printing the frames with the most self time (--top)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", help='Only profiles of this endpoint, e.g. "GET /trade-offer/history/".')
+        parser.add_argument("--ids", type=int, nargs="+", help="Only these profiles.")
+        parser.add_argument("--since-hours", type=float, help="Only profiles captured in the last N hours.")
+        parser.add_argument("--min-ms", type=float, help="Only profiles of requests that took at least this long.")
+        parser.add_argument("--limit", type=int, default=20, help="Profiles listed (default 20, most recent first).")
+        parser.add_argument("--aggregate", action="store_true", help="Sum the stacks of all selected profiles.")
+        parser.add_argument("--output", help="File the aggregated collapsed stacks are written to (default: stdout).")
+        parser.add_argument("--top", type=int, default=0, help="With --aggregate, print the N frames with the most self time.")
+        parser.add_argument("--prune", action="store_true", help="Delete profiles older than PROFILING_RETENTION_DAYS.")
+
+    def handle(self, *args, **options):
+        if options["prune"]:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {ProfilingService.prune()} profiles."))
+            return
+
+        profiles = RequestProfile.objects.order_by("-id")
+        if options["endpoint"]:
+            profiles = profiles.filter(endpoint=options["endpoint"])
+        if options["ids"]:
+            profiles = profiles.filter(id__in=options["ids"])
+        if options["since_hours"]:
+            profiles = profiles.filter(created_at__gte=now() - timedelta(hours=options["since_hours"]))
+        if options["min_ms"]:
+            profiles = profiles.filter(duration_ms__gte=options["min_ms"])
+
+        if not options["aggregate"]:
+            for profile in profiles.defer("stacks")[:options["limit"]]:
+                self.stdout.write(
+                    f"{profile.id}\t{profile.created_at:%Y-%m-%d %H:%M:%S}\t{profile.endpoint}\t{profile.status_code}\t"
+                    f"{profile.duration_ms:.1f}ms\t{profile.queries} queries\t{profile.get_reason_display()}"
+                )
+            return
+
+        stacks = ProfilingService.aggregate(profiles)
+        collapsed = "\n".join(f"{stack} {microseconds}" for stack, microseconds in sorted(stacks.items()))
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(collapsed + "\n")
+            self.stderr.write(f"Wrote {len(stacks)} stacks from {profiles.count()} profiles to {options['output']}")
+        elif not options["top"]:
+            self.stdout.write(collapsed)
+
+        total = sum(stacks.values()) or 1
+        for frame, microseconds in ProfilingService.top_frames(stacks, options["top"]):
+            self.stdout.write(f"{microseconds / 1000:10.1f}ms {microseconds / total:6.1%}  {frame}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from trading.services.ledger_service import LedgerReplayService
+from trading.services.stats_service import TradeStatsService
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the per-user trade statistics from TradeOffer and the Ledger, e.g. to backfill them "
+        "for existing data. Each batch of users is rebuilt in its own transaction; run it while trading is "
+        "paused, as trades committing during a batch's rebuild may be miscounted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, nargs="+", help="Only rebuild these user ids (default: all users).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Users rebuilt per batch.")
+
+    def handle(self, *args, **options):
+        users = 0
+        for user_ids in LedgerReplayService.user_batches(options["users"], options["batch_size"]):
+            TradeStatsService.rebuild(user_ids)
+            users += len(user_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt trade statistics of {users} users."))
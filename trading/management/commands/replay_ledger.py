@@ -0,0 +1,94 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from django.utils.timezone import make_aware
+from trading.checks import process_local_caches
+from trading.services.ledger_service import LedgerReplayService
+
+class Command(BaseCommand):
+    help = (
+        "Replays the ledger to rebuild inventory balances and reports drift against live Inventory. "
+        "With --since/--until only the net movement within the date range is reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, nargs="+", help="Only replay these user ids (default: all users).")
+        parser.add_argument("--since", help="Start date (YYYY-MM-DD, inclusive) of the movements to report.")
+        parser.add_argument("--until", help="End date (YYYY-MM-DD, inclusive) of the movements to report.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Users replayed per batch.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows fetched per round trip from the server-side cursor.")
+        parser.add_argument("--max-lines", type=int, default=100, help="Maximum number of drift lines to print.")
+
+        fix = parser.add_mutually_exclusive_group()
+        fix.add_argument("--rebuild", action="store_true", help="Rewrite drifted Inventory rows to the ledger balances.")
+        fix.add_argument("--adopt-live", action="store_true", help="Append ledger adjustments so the ledger matches live Inventory.")
+
+    def _parse_date(self, value, end_of_day=False):
+        if not value:
+            return None
+        date = parse_date(value)
+        if not date:
+            raise CommandError(f"Invalid date: {value}")
+        return make_aware(datetime.combine(date, datetime.max.time() if end_of_day else datetime.min.time()))
+
+    def handle(self, *args, **options):
+        since = self._parse_date(options["since"])
+        until = self._parse_date(options["until"], end_of_day=True)
+        batches = LedgerReplayService.user_batches(options["users"], options["batch_size"])
+
+        if since or until:
+            if options["rebuild"] or options["adopt_live"]:
+                raise CommandError("--rebuild and --adopt-live replay the whole ledger and cannot be combined with --since/--until.")
+            self._report_movements(batches, since, until, options)
+        else:
+            self._reconcile(batches, options)
+
+    def _report_movements(self, batches, since, until, options):
+        printed = keys = 0
+        for user_ids in batches:
+            movements = LedgerReplayService.fold(user_ids, since, until, options["chunk_size"])
+            for (user_id, weapon_id, variant_id), quantity in sorted(movements.items(), key=lambda entry: (entry[0][0], entry[0][1], entry[0][2] or 0)):
+                if not quantity:
+                    continue
+                keys += 1
+                if printed < options["max_lines"]:
+                    self.stdout.write(f"user={user_id} weapon={weapon_id} variant={variant_id} net={quantity:+d}")
+                    printed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{keys} inventory positions changed in the selected range."))
+
+    def _reconcile(self, batches, options):
+        fix = None
+        if options["rebuild"]:
+            fix = LedgerReplayService.REBUILD_INVENTORY
+            if process_local_caches():
+                self.stderr.write(self.style.WARNING(
+                    "The inventory cache is process-local: running servers keep serving their cached snapshots "
+                    "of rebuilt users for up to INVENTORY_CACHE_TIMEOUT seconds."
+                ))
+        elif options["adopt_live"]:
+            fix = LedgerReplayService.ADOPT_LIVE
+
+        printed = drifted = negative = users = 0
+        for user_ids in batches:
+            users += len(user_ids)
+            for (user_id, weapon_id, variant_id), ledger_quantity, live_quantity in LedgerReplayService.reconcile(user_ids, fix, options["chunk_size"]):
+                drifted += 1
+                negative += ledger_quantity < 0
+                if printed < options["max_lines"]:
+                    self.stdout.write(
+                        f"user={user_id} weapon={weapon_id} variant={variant_id} "
+                        f"ledger={ledger_quantity} live={live_quantity} drift={live_quantity - ledger_quantity:+d}"
+                    )
+                    printed += 1
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f"Inventory of {users} users matches the ledger."))
+            return
+
+        summary = f"{drifted} inventory positions of {users} users drift from the ledger ({negative} with a negative ledger balance)."
+        if fix == LedgerReplayService.REBUILD_INVENTORY:
+            summary += " Inventory rebuilt from the ledger, negative balances skipped."
+        elif fix == LedgerReplayService.ADOPT_LIVE:
+            summary += " Ledger adjusted to live inventory."
+        self.stdout.write(self.style.WARNING(summary))
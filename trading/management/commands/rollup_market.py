@@ -0,0 +1,28 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from trading.services.market_service import MarketRollupService
+
+class Command(BaseCommand):
+    help = (
+        "Folds new ledger rows into the market volume and exchange-ratio rollups, starting from the stored "
+        "watermark, and prunes expired minute buckets. Safe to run from cron or as a long-running poller; "
+        "concurrent runs serialize on the watermark row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.MARKET_ROLLUP_BATCH_SIZE, help="Ledger rows folded per transaction.")
+        parser.add_argument("--lag", type=int, default=settings.MARKET_ROLLUP_LAG_SECONDS, help="Seconds a ledger row must be old before it is folded.")
+        parser.add_argument("--poll-interval", type=float, default=0, help="Keep polling with this many seconds between runs (default: run once).")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                rows = MarketRollupService.run(options["batch_size"], options["lag"])
+                pruned = MarketRollupService.prune()
+                self.stdout.write(self.style.SUCCESS(f"Rolled up {rows} ledger rows, pruned {pruned} minute buckets."))
+                if not options["poll_interval"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
@@ -1,24 +1,12 @@
 from django.core.management.base import BaseCommand
-from django.db import connection
-from trading.models import User, Weapon, WeaponVariant, Inventory, TradeOffer
+from trading.models import User, Weapon, WeaponVariant, Inventory, Ledger
+from trading.services.data_generator import DataGenerator
 
 class Command(BaseCommand):
     help = "Seeds the database with sample users, weapons, and inventory."
 
     def handle(self, *args, **kwargs):
-        Inventory.objects.all().delete()
-        WeaponVariant.objects.all().delete()
-        Weapon.objects.all().delete()
-        User.objects.all().delete()
-        TradeOffer.objects.all().delete()
-
-        with connection.cursor() as cursor:
-            cursor.execute("ALTER SEQUENCE trading_user_id_seq RESTART WITH 1;")
-            cursor.execute("ALTER SEQUENCE trading_weapon_id_seq RESTART WITH 1;")
-            cursor.execute("ALTER SEQUENCE trading_weaponvariant_id_seq RESTART WITH 1;")
-            cursor.execute("ALTER SEQUENCE trading_inventory_id_seq RESTART WITH 1;")
-            cursor.execute("ALTER SEQUENCE trading_tradeoffer_id_seq RESTART WITH 1;")
-            cursor.execute("ALTER SEQUENCE trading_tradeitem_id_seq RESTART WITH 1;")
+        DataGenerator.reset()
 
         # Create Users
         elf = User.objects.create(username="soumya", user_type=User.ELF, email="soumya@gmail.com")
@@ -42,8 +30,13 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"Weapon Variants Created: {red_sword}, {blue_staff}, {green_axe}"))
 
         # Assign Inventory
-        Inventory.objects.create(user=elf, weapon=sword, variant=red_sword, quantity=3)
-        Inventory.objects.create(user=wizard, weapon=staff, variant=blue_staff, quantity=2)
-        Inventory.objects.create(user=dwarf, weapon=axe, variant=green_axe, quantity=4)
+        inventory = [
+            Inventory.objects.create(user=elf, weapon=sword, variant=red_sword, quantity=3),
+            Inventory.objects.create(user=wizard, weapon=staff, variant=blue_staff, quantity=2),
+            Inventory.objects.create(user=dwarf, weapon=axe, variant=green_axe, quantity=4),
+        ]
+
+        # Record the starting balances so the ledger replays to the seeded inventory
+        Ledger.objects.bulk_create(Ledger.adjustment(row.user_id, row.weapon_id, row.variant_id, row.quantity) for row in inventory)
 
         self.stdout.write(self.style.SUCCESS("Sample Inventory Populated Successfully!"))
@@ -0,0 +1,41 @@
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from trading.services.settlement_service import SettlementService
+
+class Command(BaseCommand):
+    help = (
+        "Runs the settlement worker pool for offers accepted in async settlement mode (TRADE_ASYNC_SETTLEMENT). "
+        "Several workers can run side by side; each claims its own batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.TRADE_SETTLEMENT_WORKERS, help="Threads settling disjoint offers in parallel.")
+        parser.add_argument("--batch-size", type=int, default=settings.TRADE_SETTLEMENT_BATCH_SIZE, help="Jobs claimed per batch.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling forever.")
+
+    def handle(self, *args, **options):
+        total = Counter()
+        try:
+            while True:
+                outcomes = SettlementService.run_batch(options["batch_size"], options["workers"])
+                total.update(outcomes)
+
+                if outcomes:
+                    self.stdout.write(self._summary(outcomes))
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {self._summary(total)}"))
+
+    def _summary(self, outcomes):
+        return ", ".join(
+            f"{outcomes[outcome]} {outcome}"
+            for outcome in (SettlementService.SETTLED, SettlementService.FAILED, SettlementService.REQUEUED)
+        )
@@ -0,0 +1,26 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from trading.services.analytics_service import TradeAnalyticsService
+
+class Command(BaseCommand):
+    help = (
+        "Computes an offline trade analytics metric with NumPy and prints it as JSON: exchange-rates between "
+        "weapon variants, trader centrality, or the distribution of inventory holdings. With --store the result "
+        "also replaces the one served by /analytics/<metric>/; run it from cron to keep the endpoint fresh."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("metric", choices=TradeAnalyticsService.METRICS)
+        parser.add_argument("--limit", type=int, default=settings.ANALYTICS_RESULT_LIMIT, help="Rows to output, largest first.")
+        parser.add_argument("--store", action="store_true", help="Store the top ANALYTICS_RESULT_LIMIT rows for the endpoint.")
+
+    def handle(self, *args, **options):
+        if not TradeAnalyticsService.available():
+            raise CommandError("Trade analytics require NumPy: pip install numpy")
+
+        if options["store"]:
+            data = TradeAnalyticsService.store(options["metric"]).results[:options["limit"]]
+        else:
+            data = TradeAnalyticsService.compute(options["metric"], options["limit"])
+        self.stdout.write(json.dumps(data, indent=2))
@@ -0,0 +1,41 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from trading.services.metrics import Metrics
+
+
+class QueryMetricsMiddleware:
+    """
+    Records the wall time, database queries, DB time and response rendering time of sampled
+    requests per endpoint ("<METHOD> <route>"). Place it first in MIDDLEWARE so the wall time
+    covers the other middleware too. Works for both sync and async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with Metrics.track(Metrics.ENDPOINT, lambda: Metrics.endpoint(request)) as scope:
+            request.metrics_scope = scope
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with Metrics.track(Metrics.ENDPOINT, lambda: Metrics.endpoint(request)) as scope:
+            request.metrics_scope = scope
+            return await self.get_response(request)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time it with a post-render callback.
+        if getattr(request, "metrics_scope", None) is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda _: Metrics.ENDPOINT["render_seconds"].observe(Metrics.endpoint(request), time.perf_counter() - started)
+            )
+        return response
+
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0005_alter_tradeoffer_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tradeoffer',
+            index=models.Index(fields=['sender', 'created_at', 'id'], name='tradeoffer_sender_created'),
+        ),
+        migrations.AddIndex(
+            model_name='tradeoffer',
+            index=models.Index(fields=['receiver', 'created_at', 'id'], name='tradeoffer_receiver_created'),
+        ),
+        migrations.AddIndex(
+            model_name='tradeoffer',
+            index=models.Index(fields=['status'], name='tradeoffer_status'),
+        ),
+    ]
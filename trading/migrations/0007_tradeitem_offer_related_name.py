@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0006_tradeoffer_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tradeitem',
+            name='offer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='trading.tradeoffer'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0007_tradeitem_offer_related_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ledger',
+            index=models.Index(fields=['sender', 'created_at'], name='ledger_sender_created'),
+        ),
+        migrations.AddIndex(
+            model_name='ledger',
+            index=models.Index(fields=['receiver', 'created_at'], name='ledger_receiver_created'),
+        ),
+    ]
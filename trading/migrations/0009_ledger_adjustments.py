@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0008_ledger_audit_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ledger',
+            name='receiver',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_receiver', to='trading.user'),
+        ),
+        migrations.AlterField(
+            model_name='ledger',
+            name='sender',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_sender', to='trading.user'),
+        ),
+        migrations.AlterField(
+            model_name='ledger',
+            name='trade_offer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='trading.tradeoffer'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0009_ledger_adjustments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ledger',
+            name='reversal_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reversals', to='trading.ledger'),
+        ),
+        migrations.AlterField(
+            model_name='tradeoffer',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'Accepted'), (3, 'Rejected'), (4, 'Reversed')], default=1),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0010_trade_reversal'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tradeoffer',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'Accepted'), (3, 'Rejected'), (4, 'Reversed'), (5, 'Settling')], default=1),
+        ),
+        migrations.CreateModel(
+            name='SettlementJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Queued'), (2, 'Running'), (3, 'Done'), (4, 'Failed')], default=1)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('trade_offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='settlement', to='trading.tradeoffer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='settlementjob_status')],
+            },
+        ),
+    ]
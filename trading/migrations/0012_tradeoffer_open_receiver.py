@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0011_trade_settlement_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tradeoffer',
+            name='receiver',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='received_offers', to='trading.user'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0012_tradeoffer_open_receiver'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTradeStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trade_stats', serialize=False, to='trading.user')),
+                ('sent_count', models.IntegerField(default=0)),
+                ('received_count', models.IntegerField(default=0)),
+                ('accepted_count', models.IntegerField(default=0)),
+                ('rejected_count', models.IntegerField(default=0)),
+                ('reversed_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserWeaponVolume',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weapon_type', models.PositiveSmallIntegerField(choices=[(1, 'Sword'), (2, 'Staff'), (3, 'Axe')])),
+                ('sent_quantity', models.IntegerField(default=0)),
+                ('received_quantity', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weapon_volumes', to='trading.user')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'weapon_type'), name='userweaponvolume_user_weapon_type')],
+            },
+        ),
+    ]
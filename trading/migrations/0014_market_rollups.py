@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0013_user_trade_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MarketPairRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveSmallIntegerField(choices=[(1, 'Minute'), (2, 'Hour'), (3, 'Day')])),
+                ('base_weapon_id', models.PositiveIntegerField()),
+                ('base_variant_id', models.PositiveIntegerField(default=0)),
+                ('quote_weapon_id', models.PositiveIntegerField()),
+                ('quote_variant_id', models.PositiveIntegerField(default=0)),
+                ('bucket_start', models.DateTimeField()),
+                ('base_quantity', models.PositiveBigIntegerField(default=0)),
+                ('quote_quantity', models.PositiveBigIntegerField(default=0)),
+                ('trades', models.PositiveIntegerField(default=0)),
+                ('low_ratio', models.FloatField()),
+                ('high_ratio', models.FloatField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('base_weapon_id', 'base_variant_id', 'quote_weapon_id', 'quote_variant_id', 'resolution', 'bucket_start'), name='marketpair_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MarketVolumeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveSmallIntegerField(choices=[(1, 'Minute'), (2, 'Hour'), (3, 'Day')])),
+                ('weapon_id', models.PositiveIntegerField()),
+                ('variant_id', models.PositiveIntegerField(default=0)),
+                ('bucket_start', models.DateTimeField()),
+                ('quantity', models.PositiveBigIntegerField(default=0)),
+                ('trades', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('weapon_id', 'variant_id', 'resolution', 'bucket_start'), name='marketvolume_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0014_market_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=255)),
+                ('reason', models.PositiveSmallIntegerField(choices=[(1, 'Header'), (2, 'Sampled')])),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('queries', models.PositiveIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('stacks', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['endpoint', 'created_at'], name='requestprofile_endpoint')],
+            },
+        ),
+    ]
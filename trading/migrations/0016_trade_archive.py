@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0015_request_profile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ledger',
+            name='trade_offer',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='trading.tradeoffer'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedTradeOffer',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'Accepted'), (3, 'Rejected'), (4, 'Reversed'), (5, 'Settling')])),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('receiver', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_received_offers', to='trading.user')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_sent_offers', to='trading.user')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTradeItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField()),
+                ('is_offered_by_sender', models.BooleanField(default=True)),
+                ('variant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='trading.weaponvariant')),
+                ('weapon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trading.weapon')),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='trading.archivedtradeoffer')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedtradeoffer',
+            index=models.Index(fields=['sender', 'created_at', 'id'], name='archivedoffer_sender_created'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtradeoffer',
+            index=models.Index(fields=['receiver', 'created_at', 'id'], name='archivedoffer_receiver_created'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0016_trade_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsResult',
+            fields=[
+                ('metric', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('results', models.JSONField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
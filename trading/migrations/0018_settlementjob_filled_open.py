@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0017_analytics_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='settlementjob',
+            name='filled_open',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -2,4 +2,10 @@ from .user import User
 from .weapon import Weapon, WeaponVariant
 from .inventory import Inventory
 from .trade import TradeOffer, TradeItem
-from .ledger import Ledger
\ No newline at end of file
+from .ledger import Ledger
+from .settlement import SettlementJob
+from .stats import UserTradeStats, UserWeaponVolume
+from .market import MarketVolumeRollup, MarketPairRollup, RollupWatermark
+from .profile import RequestProfile
+from .archive import ArchivedTradeOffer, ArchivedTradeItem
+from .analytics import AnalyticsResult
\ No newline at end of file
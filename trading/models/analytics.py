@@ -0,0 +1,8 @@
+from django.db import models
+
+class AnalyticsResult(models.Model):
+    # Latest result of an offline analytics metric, written by `manage.py trade_analytics --store`
+    # and served by /analytics/<metric>/. results holds the top ANALYTICS_RESULT_LIMIT rows.
+    metric = models.CharField(max_length=50, primary_key=True)
+    results = models.JSONField()
+    computed_at = models.DateTimeField(auto_now=True)
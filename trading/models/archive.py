@@ -0,0 +1,31 @@
+from django.db import models
+from .trade import TradeOffer
+from .user import User
+from .weapon import Weapon, WeaponVariant
+
+# Settled trade offers moved out of the live tables by `manage.py archive_trades`. Rows keep their
+# original ids, so ledger entries and history cursors still refer to them, and the fields mirror
+# TradeOffer and TradeItem so the same serializers and history queries work on both.
+
+class ArchivedTradeOffer(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_sent_offers")
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_received_offers", null=True, blank=True)
+    status = models.PositiveSmallIntegerField(choices=TradeOffer.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["sender", "created_at", "id"], name="archivedoffer_sender_created"),
+            models.Index(fields=["receiver", "created_at", "id"], name="archivedoffer_receiver_created"),
+        ]
+
+
+class ArchivedTradeItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    offer = models.ForeignKey(ArchivedTradeOffer, on_delete=models.CASCADE, related_name="items")
+    weapon = models.ForeignKey(Weapon, on_delete=models.CASCADE, related_name="+")
+    variant = models.ForeignKey(WeaponVariant, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    quantity = models.PositiveIntegerField()
+    is_offered_by_sender = models.BooleanField(default=True)
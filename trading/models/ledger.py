@@ -4,11 +4,43 @@ from .user import User
 from .weapon import Weapon, WeaponVariant
 
 class Ledger(models.Model):
-    trade_offer = models.ForeignKey(TradeOffer, on_delete=models.CASCADE)
-    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ledger_sender")
-    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ledger_receiver")
+    # Trade movements carry the offer and both users. Adjustments outside of trades (seeding,
+    # admin edits) have no offer: a missing sender mints into the receiver's inventory and a
+    # missing receiver burns from the sender's, so replaying the ledger rebuilds Inventory.
+    # The offer may have been moved to ArchivedTradeOffer (same id), so the column has no constraint.
+    trade_offer = models.ForeignKey(TradeOffer, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True)
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ledger_sender", null=True, blank=True)
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ledger_receiver", null=True, blank=True)
     weapon = models.ForeignKey(Weapon, on_delete=models.CASCADE)
     variant = models.ForeignKey(WeaponVariant, on_delete=models.SET_NULL, null=True, blank=True)
     quantity = models.PositiveIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
-    reversed = models.BooleanField(default=False)  # Marks if a trade was reversed
\ No newline at end of file
+    reversed = models.BooleanField(default=False)  # Marks if a trade was reversed
+    reversal_of = models.ForeignKey("self", on_delete=models.CASCADE, null=True, blank=True, related_name="reversals")  # Set on compensating entries
+
+    class Meta:
+        indexes = [
+            # Back per-user audit scans in either direction.
+            models.Index(fields=["sender", "created_at"], name="ledger_sender_created"),
+            models.Index(fields=["receiver", "created_at"], name="ledger_receiver_created"),
+        ]
+
+    @classmethod
+    def adjustment(cls, user_id, weapon_id, variant_id, delta):
+        """
+        Builds an unsaved entry minting (delta > 0) or burning (delta < 0) inventory outside of a trade.
+        """
+        return cls(
+            sender_id=None if delta > 0 else user_id,
+            receiver_id=user_id if delta > 0 else None,
+            weapon_id=weapon_id, variant_id=variant_id, quantity=abs(delta),
+        )
+
+    def save(self, *args, **kwargs):
+        # The ledger is append-only: entries are written once and never edited.
+        if not self._state.adding:
+            raise ValueError("Ledger entries are append-only and cannot be modified.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ledger entries are append-only and cannot be deleted.")
\ No newline at end of file
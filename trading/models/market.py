@@ -0,0 +1,63 @@
+from django.db import models
+
+# Rollup rows identify an instrument by weapon and variant id. They are derived data, so the ids
+# are plain integers instead of foreign keys, and items without a variant use variant_id 0 so the
+# key never contains NULL and stays unique.
+
+class MarketVolumeRollup(models.Model):
+    MINUTE = 1
+    HOUR = 2
+    DAY = 3
+
+    RESOLUTIONS = [
+        (MINUTE, "Minute"),
+        (HOUR, "Hour"),
+        (DAY, "Day"),
+    ]
+
+    resolution = models.PositiveSmallIntegerField(choices=RESOLUTIONS)
+    weapon_id = models.PositiveIntegerField()
+    variant_id = models.PositiveIntegerField(default=0)
+    bucket_start = models.DateTimeField()
+    quantity = models.PositiveBigIntegerField(default=0)  # Units of the instrument that changed hands
+    trades = models.PositiveIntegerField(default=0)  # Trade offers that moved the instrument
+
+    class Meta:
+        constraints = [
+            # Also serves the chart scans: one instrument and resolution over a bucket_start range.
+            models.UniqueConstraint(fields=["weapon_id", "variant_id", "resolution", "bucket_start"], name="marketvolume_bucket"),
+        ]
+
+
+class MarketPairRollup(models.Model):
+    """
+    Implied exchange ratio between two instruments, from accepted offers trading one line of the
+    base instrument for one line of the quote instrument. Each pair is stored once, with the lower
+    (weapon_id, variant_id) as base; the ratio the other way round is the inverse.
+    """
+    resolution = models.PositiveSmallIntegerField(choices=MarketVolumeRollup.RESOLUTIONS)
+    base_weapon_id = models.PositiveIntegerField()
+    base_variant_id = models.PositiveIntegerField(default=0)
+    quote_weapon_id = models.PositiveIntegerField()
+    quote_variant_id = models.PositiveIntegerField(default=0)
+    bucket_start = models.DateTimeField()
+    base_quantity = models.PositiveBigIntegerField(default=0)
+    quote_quantity = models.PositiveBigIntegerField(default=0)
+    trades = models.PositiveIntegerField(default=0)
+    low_ratio = models.FloatField()  # Quote units per base unit
+    high_ratio = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["base_weapon_id", "base_variant_id", "quote_weapon_id", "quote_variant_id", "resolution", "bucket_start"],
+                name="marketpair_bucket",
+            ),
+        ]
+
+
+class RollupWatermark(models.Model):
+    # Highest source row id an incremental pipeline has folded in, keyed by pipeline name.
+    name = models.CharField(max_length=50, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,26 @@
+from django.db import models
+
+class RequestProfile(models.Model):
+    # Profile of one API request, captured on demand (X-Profile header from an admin) or by sampling.
+    # stacks holds collapsed stacks ("frame;frame;frame microseconds" per line) as read by
+    # flamegraph.pl, inferno or speedscope; weights are self time in microseconds.
+    HEADER = 1
+    SAMPLED = 2
+
+    REASONS = [
+        (HEADER, "Header"),
+        (SAMPLED, "Sampled"),
+    ]
+
+    endpoint = models.CharField(max_length=255)
+    reason = models.PositiveSmallIntegerField(choices=REASONS)
+    status_code = models.PositiveSmallIntegerField()
+    queries = models.PositiveIntegerField()
+    duration_ms = models.FloatField()
+    stacks = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["endpoint", "created_at"], name="requestprofile_endpoint"),
+        ]
@@ -0,0 +1,48 @@
+from django.utils import timezone
+from django.db import models
+from .trade import TradeOffer
+
+class SettlementJob(models.Model):
+    # Queue row for an accepted offer whose inventory transfer runs in the settle_trades worker
+    # instead of the request. Workers claim QUEUED rows in id order with SKIP LOCKED.
+    QUEUED = 1
+    RUNNING = 2
+    DONE = 3
+    FAILED = 4
+
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    trade_offer = models.OneToOneField(TradeOffer, on_delete=models.CASCADE, related_name="settlement")
+    status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # The offer was open and got its receiver from this accept; a failed settlement reopens it.
+    filled_open = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="settlementjob_status"),
+        ]
+
+    @classmethod
+    def enqueue(cls, trade_offer, filled_open=False):
+        """
+        Marks a pending offer as settling and queues it, resetting the job of an earlier failed
+        settlement. filled_open marks an open offer whose receiver was just set by the accept.
+        Runs in the transaction that holds the offer's row lock.
+        """
+        trade_offer.status = TradeOffer.SETTLING
+        trade_offer.save(update_fields=["status", "receiver"])
+        job, _ = cls.objects.update_or_create(
+            trade_offer=trade_offer,
+            defaults={"status": cls.QUEUED, "attempts": 0, "error": "", "filled_open": filled_open, "created_at": timezone.now(), "started_at": None, "finished_at": None},
+        )
+        return job
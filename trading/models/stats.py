@@ -0,0 +1,26 @@
+from django.db import models
+from .user import User
+from .weapon import Weapon
+
+class UserTradeStats(models.Model):
+    # Per-user counters maintained incrementally by TradeStatsService in the same transaction as
+    # the trade change they describe; rebuild_trade_stats recomputes them from scratch.
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="trade_stats")
+    sent_count = models.IntegerField(default=0)
+    received_count = models.IntegerField(default=0)
+    accepted_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    reversed_count = models.IntegerField(default=0)
+
+
+class UserWeaponVolume(models.Model):
+    # Quantity a user gave away and received through accepted (and not reversed) trades, per weapon type.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="weapon_volumes")
+    weapon_type = models.PositiveSmallIntegerField(choices=Weapon.WEAPON_TYPES)
+    sent_quantity = models.IntegerField(default=0)
+    received_quantity = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "weapon_type"], name="userweaponvolume_user_weapon_type"),
+        ]
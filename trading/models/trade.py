@@ -7,18 +7,31 @@ class TradeOffer(models.Model):
     PENDING = 1
     ACCEPTED = 2
     REJECTED = 3
+    REVERSED = 4
+    SETTLING = 5
 
     STATUS_CHOICES = [
         (PENDING, "Pending"),
         (ACCEPTED, "Accepted"),
         (REJECTED, "Rejected"),
+        (REVERSED, "Reversed"),
+        (SETTLING, "Settling"),
     ]
 
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sent_offers")
-    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name="received_offers")
+    # Open (standing) offers have no receiver until they are filled or matched.
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name="received_offers", null=True, blank=True)
     status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=PENDING)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Back the keyset-paginated history scans, newest first per user.
+            models.Index(fields=["sender", "created_at", "id"], name="tradeoffer_sender_created"),
+            models.Index(fields=["receiver", "created_at", "id"], name="tradeoffer_receiver_created"),
+            models.Index(fields=["status"], name="tradeoffer_status"),
+        ]
+
     def accept(self):
         self.status = self.ACCEPTED
         self.save()
@@ -29,7 +42,7 @@ class TradeOffer(models.Model):
 
 
 class TradeItem(models.Model):
-    offer = models.ForeignKey(TradeOffer, on_delete=models.CASCADE)
+    offer = models.ForeignKey(TradeOffer, on_delete=models.CASCADE, related_name="items")
     weapon = models.ForeignKey(Weapon, on_delete=models.CASCADE)
     variant = models.ForeignKey(WeaponVariant, on_delete=models.SET_NULL, null=True, blank=True)
     quantity = models.PositiveIntegerField()
@@ -0,0 +1,81 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from trading.models import Inventory
+
+class InventoryRepository:
+    @staticmethod
+    def get_quantities(user_ids, weapon_ids):
+        """
+        Returns the inventory quantities of the given users for the given weapons,
+        keyed by (user_id, weapon_id, variant_id), in a single query without locking.
+        """
+        rows = Inventory.objects.filter(user_id__in=user_ids, weapon_id__in=weapon_ids).values_list("user_id", "weapon_id", "variant_id", "quantity")
+        return {(user_id, weapon_id, variant_id): quantity for user_id, weapon_id, variant_id, quantity in rows}
+
+    @staticmethod
+    def get_inventory(user_ids):
+        """
+        Loads every inventory row of the given users without locking, keyed like lock_inventory().
+        """
+        rows = Inventory.objects.filter(user_id__in=user_ids).only("id", "user_id", "weapon_id", "variant_id", "quantity")
+        return {(row.user_id, row.weapon_id, row.variant_id): row for row in rows}
+
+    @staticmethod
+    def lock_inventory(user_ids, weapon_ids=None):
+        """
+        Loads and row-locks every inventory row of the given users for the given weapons
+        (all weapons if None) in a single query. Returns a dict keyed by (user_id, weapon_id, variant_id).
+        Rows are locked in primary key order so that concurrent transactions never wait on each other in a cycle.
+        """
+        rows = Inventory.objects.select_for_update().filter(user_id__in=user_ids)
+        if weapon_ids is not None:
+            rows = rows.filter(weapon_id__in=weapon_ids)
+        rows = rows.only("id", "user_id", "weapon_id", "variant_id", "quantity").order_by("id")
+        return {(row.user_id, row.weapon_id, row.variant_id): row for row in rows}
+
+    @staticmethod
+    def apply_deltas(inventory_rows, deltas, retry_conflicts=True):
+        """
+        Applies quantity deltas keyed by (user_id, weapon_id, variant_id).
+        Existing rows are changed with one `UPDATE ... SET quantity = quantity + delta`,
+        missing rows are inserted with one bulk INSERT. Returns the inserted rows.
+
+        A concurrent transaction may insert one of the missing rows first. The INSERT then fails
+        on the unique key after waiting for it to commit, so the rows are locked, added to
+        inventory_rows, and the deltas that were to be inserted are applied once more.
+        """
+        updates = {}
+        missing = []
+
+        for key, delta in deltas.items():
+            if not delta:
+                continue
+            row = inventory_rows.get(key)
+            if row is not None:
+                updates[row.id] = delta
+            else:
+                user_id, weapon_id, variant_id = key
+                missing.append(Inventory(user_id=user_id, weapon_id=weapon_id, variant_id=variant_id, quantity=delta))
+
+        if updates:
+            Inventory.objects.filter(id__in=updates.keys()).update(
+                quantity=F("quantity") + Case(
+                    *[When(id=row_id, then=Value(delta)) for row_id, delta in updates.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+
+        if missing:
+            try:
+                with transaction.atomic():
+                    Inventory.objects.bulk_create(missing)
+            except IntegrityError:
+                if not retry_conflicts:
+                    raise
+                inventory_rows.update(InventoryRepository.lock_inventory({row.user_id for row in missing}, {row.weapon_id for row in missing}))
+                return InventoryRepository.apply_deltas(
+                    inventory_rows, {(row.user_id, row.weapon_id, row.variant_id): row.quantity for row in missing}, retry_conflicts=False,
+                )
+
+        return missing
@@ -8,3 +8,11 @@ class WeaponRepository:
     @staticmethod
     def get_variant_by_id(variant_id):
         return WeaponVariant.objects.filter(id=variant_id).first()
+
+    @staticmethod
+    def get_weapons_by_ids(weapon_ids):
+        return Weapon.objects.in_bulk(weapon_ids)
+
+    @staticmethod
+    def get_variants_by_ids(variant_ids):
+        return WeaponVariant.objects.in_bulk(variant_ids)
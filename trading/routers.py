@@ -0,0 +1,80 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+# Whether reads in the current request go to the replica; set by ReplicaReadMixin on read-only views.
+_replica_reads = ContextVar("trading_replica_reads", default=False)
+
+
+class ReplicaRouter:
+    """
+    Routes the reads of read-only endpoints to the REPLICA_DATABASE_ALIAS database, when one is
+    configured. Everything else, including every write and the reads of TradeService, uses default.
+
+    Read-your-writes: a write involving a user pins that user to the primary for
+    REPLICA_STICKY_SECONDS, so their own history and inventory reflect an accepted trade at once
+    even while the replica lags. Pins are kept in the default cache, which must be shared by all
+    server processes (e.g. Redis or Memcached) for the stickiness to hold across them.
+    """
+
+    def db_for_read(self, model, **hints):
+        return settings.REPLICA_DATABASE_ALIAS if _replica_reads.get() else None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    @staticmethod
+    def _pin_key(user_id):
+        return f"replica:pinned:{user_id}"
+
+    @staticmethod
+    def available():
+        return settings.REPLICA_DATABASE_ALIAS in connections.settings
+
+    @staticmethod
+    @contextmanager
+    def replica_reads(user_ids=()):
+        """
+        Sends the reads in the block to the replica, unless one of the users is pinned to the primary.
+        Yields whether the replica is used.
+        """
+        user_ids = [user_id for user_id in user_ids if user_id is not None]
+        use_replica = ReplicaRouter.available() and not (user_ids and cache.get_many([ReplicaRouter._pin_key(user_id) for user_id in user_ids]))
+        token = _replica_reads.set(use_replica)
+        try:
+            yield use_replica
+        finally:
+            _replica_reads.reset(token)
+
+    @staticmethod
+    @asynccontextmanager
+    async def areplica_reads(user_ids=()):
+        """
+        Async counterpart of replica_reads().
+        """
+        user_ids = [user_id for user_id in user_ids if user_id is not None]
+        use_replica = ReplicaRouter.available() and not (user_ids and await cache.aget_many([ReplicaRouter._pin_key(user_id) for user_id in user_ids]))
+        token = _replica_reads.set(use_replica)
+        try:
+            yield use_replica
+        finally:
+            _replica_reads.reset(token)
+
+    @staticmethod
+    def pin(user_ids):
+        cache.set_many({ReplicaRouter._pin_key(user_id): True for user_id in user_ids}, settings.REPLICA_STICKY_SECONDS)
+
+    @staticmethod
+    def pin_on_commit(user_ids):
+        """
+        Pins the users to the primary once the current transaction commits.
+        """
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if user_ids and ReplicaRouter.available():
+            transaction.on_commit(lambda: ReplicaRouter.pin(user_ids))
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from trading.models import Inventory
+from trading.services.metrics import MeasuredSerializerMixin
 
-class InventorySerializer(serializers.ModelSerializer):
+class InventorySerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     weapon_name = serializers.CharField(source="weapon.get_type_display")  # Get readable name
     variant = serializers.CharField(source="variant.variant_name", required=False, allow_null=True)  # Get variant name
 
@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
 from trading.models import TradeOffer, TradeItem, User, Inventory, Weapon, WeaponVariant
+from trading.services.metrics import MeasuredSerializerMixin
 
 class TradeItemSerializer(serializers.Serializer):
     weapon_id = serializers.IntegerField()
@@ -7,15 +9,76 @@ class TradeItemSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(min_value=1)
 
 
-class TradeOfferSerializer(serializers.ModelSerializer):
+class TradeOfferItemSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
+    weapon_id = serializers.IntegerField(read_only=True)
+    variant_id = serializers.IntegerField(read_only=True, allow_null=True)
+    weapon_name = serializers.CharField(source="weapon.get_type_display", read_only=True)
+    variant_name = serializers.CharField(source="variant.variant_name", read_only=True, allow_null=True)
+    direction = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TradeItem
+        fields = ["weapon_id", "weapon_name", "variant_id", "variant_name", "quantity", "direction"]
+
+    def get_direction(self, obj):
+        return "offered" if obj.is_offered_by_sender else "requested"
+
+
+class TradeOfferSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     sender_id = serializers.IntegerField(write_only=True)
-    receiver_id = serializers.IntegerField(write_only=True)
+    receiver_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
+    open = serializers.BooleanField(write_only=True, default=False)
+    offered_items = TradeItemSerializer(many=True, write_only=True, required=False)
+    requested_items = TradeItemSerializer(many=True, write_only=True, required=False)
 
     sender_username = serializers.CharField(source="sender.username", read_only=True)
-    receiver_username = serializers.CharField(source="receiver.username", read_only=True)
+    receiver_username = serializers.CharField(source="receiver.username", read_only=True, allow_null=True)
     status_display = serializers.CharField(source="get_status_display", read_only=True)
+    items = TradeOfferItemSerializer(many=True, read_only=True)
 
     class Meta:
         model = TradeOffer
-        fields = ["id", "sender_id", "sender_username", "receiver_id", "receiver_username", "status", "status_display", "created_at"]
+        fields = ["id", "sender_id", "sender_username", "receiver_id", "receiver_username", "open", "status", "status_display", "created_at", "items", "offered_items", "requested_items"]
+
+    def validate(self, attrs):
+        # Open offers must be asked for, so a forgotten receiver_id is not published to every user.
+        if attrs.get("open") and attrs.get("receiver_id") is not None:
+            raise serializers.ValidationError({"receiver_id": "Open offers cannot have a receiver."})
+        if not attrs.get("open") and attrs.get("receiver_id") is None:
+            raise serializers.ValidationError({"receiver_id": "This field is required unless open is true."})
+        return attrs
+
+
+class TradeOfferBulkCreateSerializer(serializers.Serializer):
+    offers = TradeOfferSerializer(many=True, allow_empty=False, max_length=settings.TRADE_BULK_MAX_OFFERS)
+
+
+class TradeOfferActionSerializer(serializers.Serializer):
+    trade_offer_id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=["ACCEPT", "REJECT"])
+
+
+class TradeOfferBatchProcessSerializer(serializers.Serializer):
+    receiver_id = serializers.IntegerField()
+    actions = TradeOfferActionSerializer(many=True, required=False, max_length=settings.TRADE_BULK_MAX_OFFERS)
+    reject_pending_from = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if not attrs.get("actions") and "reject_pending_from" not in attrs:
+            raise serializers.ValidationError("Provide actions or reject_pending_from.")
+
+        trade_offer_ids = [action["trade_offer_id"] for action in attrs.get("actions", [])]
+        if len(trade_offer_ids) != len(set(trade_offer_ids)):
+            raise serializers.ValidationError("Each trade offer may only be listed once.")
+        return attrs
+
+
+class TradeOfferReversalSerializer(serializers.Serializer):
+    trade_offer_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    user_id = serializers.IntegerField(required=False)
+    chunk_size = serializers.IntegerField(required=False, min_value=1)
 
+    def validate(self, attrs):
+        if ("trade_offer_ids" in attrs) == ("user_id" in attrs):
+            raise serializers.ValidationError("Provide either trade_offer_ids or user_id.")
+        return attrs
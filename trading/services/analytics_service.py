@@ -0,0 +1,229 @@
+from itertools import islice
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.functions import Coalesce
+from trading.models import TradeOffer, TradeItem, ArchivedTradeItem, Ledger, Inventory, AnalyticsResult
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only the analytics endpoint and commands need it.
+    np = None
+
+
+class TradeAnalyticsService:
+    """
+    Offline trade analytics computed with NumPy instead of model instances.
+
+    Columns are streamed from values_list() through a server-side cursor in chunks and packed into
+    int64 arrays. The metrics are computed by the array kernels (exchange_rates, centrality,
+    inventory_distribution), which take plain arrays and can be benchmarked on synthetic data
+    without a database. Instruments (weapon, variant) are numbered densely, and a missing variant
+    counts as variant 0.
+
+    Metrics are only computed offline (store()) and served from AnalyticsResult, so no request
+    ever triggers a scan of the trade history.
+    """
+
+    EXCHANGE_RATES = "exchange-rates"
+    CENTRALITY = "centrality"
+    INVENTORY = "inventory"
+    METRICS = (EXCHANGE_RATES, CENTRALITY, INVENTORY)
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    @staticmethod
+    def load_columns(queryset, fields, chunk_size=None):
+        """
+        Reads the given fields or expressions of every row into one int64 array per field.
+        """
+        chunk_size = chunk_size or settings.ANALYTICS_CHUNK_SIZE
+        rows = queryset.order_by().values_list(*fields).iterator(chunk_size=chunk_size)
+        chunks = []
+        while chunk := list(islice(rows, chunk_size)):
+            chunks.append(np.array(chunk, dtype=np.int64))
+        table = np.concatenate(chunks) if chunks else np.empty((0, len(fields)), dtype=np.int64)
+        return [table[:, index] for index in range(len(fields))]
+
+    @staticmethod
+    def instrument_ids(weapon_ids, variant_ids):
+        """
+        Numbers the (weapon, variant) instruments densely. Returns (ids, weapons, variants), where
+        weapons[id] and variants[id] map an id back to the instrument.
+        """
+        stride = int(variant_ids.max(initial=0)) + 1
+        codes, ids = np.unique(weapon_ids * stride + variant_ids, return_inverse=True)
+        return ids, codes // stride, codes % stride
+
+    @staticmethod
+    def exchange_rates(offer_ids, offered, instruments, quantities):
+        """
+        Volume-weighted exchange rates between instruments, implied by offers trading exactly one
+        offered line for one requested line. Every trade counts in both directions. Returns
+        (base, quote, ratio, trades) arrays with ratio in quote units per base unit.
+        """
+        offers, index = np.unique(offer_ids, return_inverse=True)
+        offered = offered.astype(bool)
+        simple = (np.bincount(index[offered], minlength=len(offers)) == 1) & (np.bincount(index[~offered], minlength=len(offers)) == 1)
+
+        lines = simple[index]
+        give, give_quantity = np.zeros(len(offers), np.int64), np.zeros(len(offers), np.int64)
+        want, want_quantity = np.zeros(len(offers), np.int64), np.zeros(len(offers), np.int64)
+        give[index[lines & offered]], give_quantity[index[lines & offered]] = instruments[lines & offered], quantities[lines & offered]
+        want[index[lines & ~offered]], want_quantity[index[lines & ~offered]] = instruments[lines & ~offered], quantities[lines & ~offered]
+
+        trades = simple & (give != want)
+        base = np.concatenate([give[trades], want[trades]])
+        quote = np.concatenate([want[trades], give[trades]])
+        base_quantity = np.concatenate([give_quantity[trades], want_quantity[trades]])
+        quote_quantity = np.concatenate([want_quantity[trades], give_quantity[trades]])
+
+        stride = int(instruments.max(initial=0)) + 1
+        pairs, pair_index = np.unique(base * stride + quote, return_inverse=True)
+        ratio = np.bincount(pair_index, weights=quote_quantity) / np.bincount(pair_index, weights=base_quantity)
+        return pairs // stride, pairs % stride, ratio, np.bincount(pair_index)
+
+    @staticmethod
+    def centrality(senders, receivers, quantities, damping=0.85, iterations=100, tolerance=1e-10):
+        """
+        Centrality of traders in the graph of trade movements (sender -> receiver, weighted by
+        quantity). Returns (users, pagerank, counterparties, sent, received) arrays; pagerank is
+        computed by power iteration with dangling users' rank spread evenly.
+        """
+        users, index = np.unique(np.concatenate([senders, receivers]), return_inverse=True)
+        count = len(users)
+        if not count:
+            return users, np.empty(0), np.empty(0, np.int64), np.empty(0), np.empty(0)
+        source, target = index[:len(senders)], index[len(senders):]
+
+        sent = np.bincount(source, weights=quantities, minlength=count)
+        received = np.bincount(target, weights=quantities, minlength=count)
+
+        edges = np.unique(np.minimum(source, target) * count + np.maximum(source, target))
+        counterparties = np.bincount(edges // count, minlength=count) + np.bincount(edges % count, minlength=count)
+
+        rank = np.full(count, 1 / count)
+        share = quantities / sent[source]
+        dangling = sent == 0
+        for _ in range(iterations):
+            updated = damping * (np.bincount(target, weights=rank[source] * share, minlength=count) + rank[dangling].sum() / count)
+            updated += (1 - damping) / count
+            converged = np.abs(updated - rank).sum() < tolerance
+            rank = updated
+            if converged:
+                break
+        return users, rank, counterparties, sent, received
+
+    @staticmethod
+    def inventory_distribution(instruments, quantities):
+        """
+        Distribution of holdings per instrument. Returns (instruments, holders, total, mean, p50,
+        p90, max, gini) arrays; percentiles are nearest-rank.
+        """
+        # One sort of a packed (instrument, quantity) key orders holdings by instrument, then quantity.
+        stride = int(quantities.max(initial=0)) + 1
+        keys = np.sort(instruments * stride + quantities)
+        instruments, quantities = keys // stride, (keys % stride).astype(np.float64)
+
+        starts = np.flatnonzero(np.r_[True, instruments[1:] != instruments[:-1]]) if len(instruments) else np.empty(0, np.int64)
+        holders = np.diff(np.r_[starts, len(instruments)])
+        if not len(starts):
+            return (np.empty(0, np.int64),) + (np.empty(0),) * 7
+
+        total = np.add.reduceat(quantities, starts)
+        rank = np.arange(len(quantities)) - np.repeat(starts, holders) + 1
+        weighted = np.add.reduceat(rank * quantities, starts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gini = np.where(total > 0, 2 * weighted / (holders * total) - (holders + 1) / holders, 0.0)
+
+        def percentile(fraction):
+            return quantities[starts + np.ceil(fraction * holders).astype(np.int64) - 1]
+
+        return instruments[starts], holders, total, total / holders, percentile(0.5), percentile(0.9), quantities[starts + holders - 1], gini
+
+    @staticmethod
+    def compute(metric, limit=None):
+        """
+        Loads the columns a metric needs and returns it as JSON-serializable rows, largest first.
+        """
+        limit = limit or settings.ANALYTICS_RESULT_LIMIT
+        service = TradeAnalyticsService
+
+        def instrument(weapons, variants, index, prefix=""):
+            return {f"{prefix}weapon_id": int(weapons[index]), f"{prefix}variant_id": int(variants[index]) or None}
+
+        if metric == service.EXCHANGE_RATES:
+            # Accepted offers live in TradeItem until they are archived.
+            fields = ["offer_id", "is_offered_by_sender", "weapon_id", Coalesce("variant_id", 0), "quantity"]
+            columns = zip(*(
+                service.load_columns(model.objects.filter(offer__status=TradeOffer.ACCEPTED), fields)
+                for model in (TradeItem, ArchivedTradeItem)
+            ))
+            offer_ids, offered, weapon_ids, variant_ids, quantities = [np.concatenate(column) for column in columns]
+            ids, weapons, variants = service.instrument_ids(weapon_ids, variant_ids)
+            base, quote, ratio, trades = service.exchange_rates(offer_ids, offered, ids, quantities)
+            top = np.argsort(-trades, kind="stable")[:limit]
+            return [
+                {**instrument(weapons, variants, base[i], "base_"), **instrument(weapons, variants, quote[i], "quote_"), "ratio": float(ratio[i]), "trades": int(trades[i])}
+                for i in top
+            ]
+
+        if metric == service.CENTRALITY:
+            senders, receivers, quantities = service.load_columns(
+                Ledger.objects.filter(trade_offer__isnull=False, reversed=False, reversal_of__isnull=True),
+                ["sender_id", "receiver_id", "quantity"],
+            )
+            users, rank, counterparties, sent, received = service.centrality(senders, receivers, quantities)
+            top = np.argsort(-rank, kind="stable")[:limit]
+            return [
+                {"user_id": int(users[i]), "pagerank": float(rank[i]), "counterparties": int(counterparties[i]), "sent_quantity": int(sent[i]), "received_quantity": int(received[i])}
+                for i in top
+            ]
+
+        if metric == service.INVENTORY:
+            weapon_ids, variant_ids, quantities = service.load_columns(
+                Inventory.objects.filter(quantity__gt=0), ["weapon_id", Coalesce("variant_id", 0), "quantity"],
+            )
+            ids, weapons, variants = service.instrument_ids(weapon_ids, variant_ids)
+            ids, holders, total, mean, p50, p90, largest, gini = service.inventory_distribution(ids, quantities)
+            top = np.argsort(-total, kind="stable")[:limit]
+            return [
+                {
+                    **instrument(weapons, variants, ids[i]), "holders": int(holders[i]), "total_quantity": int(total[i]), "mean": float(mean[i]),
+                    "p50": int(p50[i]), "p90": int(p90[i]), "max": int(largest[i]), "gini": float(gini[i]),
+                }
+                for i in top
+            ]
+
+        raise ValueError(f"Unknown metric {metric}")
+
+    @staticmethod
+    def _cache_key(metric):
+        return f"analytics:{metric}"
+
+    @staticmethod
+    def store(metric):
+        """
+        Computes the top ANALYTICS_RESULT_LIMIT rows of the metric and replaces its stored result.
+        """
+        data = TradeAnalyticsService.compute(metric, settings.ANALYTICS_RESULT_LIMIT)
+        result, _ = AnalyticsResult.objects.update_or_create(metric=metric, defaults={"results": data})
+        cache.delete(TradeAnalyticsService._cache_key(metric))
+        return result
+
+    @staticmethod
+    def get_stored(metric, limit=None):
+        """
+        Returns {"results": [...], "computed_at": ...} of the last stored result, or None if the
+        metric was never stored. The row is cached for ANALYTICS_CACHE_TIMEOUT seconds, which
+        bounds how long other processes keep serving a replaced result.
+        """
+        key = TradeAnalyticsService._cache_key(metric)
+        stored = cache.get(key)
+        if stored is None:
+            stored = AnalyticsResult.objects.filter(metric=metric).values("results", "computed_at").first()
+            if stored is None:
+                return None
+            cache.set(key, stored, settings.ANALYTICS_CACHE_TIMEOUT)
+        return {"results": stored["results"][:limit or settings.ANALYTICS_RESULT_LIMIT], "computed_at": stored["computed_at"]}
@@ -0,0 +1,88 @@
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now, timedelta
+from trading.models import TradeOffer, TradeItem, SettlementJob, ArchivedTradeOffer, ArchivedTradeItem
+
+logger = logging.getLogger(__name__)
+
+class TradeArchiveService:
+    """
+    Moves settled trade offers older than TRADE_ARCHIVE_AFTER_DAYS, with their items, from the live
+    tables into ArchivedTradeOffer and ArchivedTradeItem.
+
+    Every archived offer is settled and older than the archive horizon (now minus the retention),
+    so history queries starting after the horizon never need the archive. Archived offers can no
+    longer be reversed.
+    """
+
+    STATUSES = [TradeOffer.ACCEPTED, TradeOffer.REJECTED, TradeOffer.REVERSED]
+
+    @staticmethod
+    def horizon():
+        return now() - timedelta(days=settings.TRADE_ARCHIVE_AFTER_DAYS)
+
+    @staticmethod
+    def may_contain(filters):
+        """
+        Returns whether archived offers can match the history filters (TradeHistoryService.parse_filters()).
+        """
+        if "status" in filters and str(filters["status"]) not in {str(status) for status in TradeArchiveService.STATUSES}:
+            return False
+        start = filters.get("created_at__gte")
+        return start is None or start < TradeArchiveService.horizon()
+
+    @staticmethod
+    def archive_batch(cutoff, batch_size):
+        """
+        Archives up to batch_size settled offers created before cutoff, oldest id first, in one short
+        transaction. Offers locked by a concurrent reversal are skipped until the next batch.
+        Returns the number of offers archived.
+        """
+        with transaction.atomic():
+            offers = list(
+                TradeOffer.objects.select_for_update(skip_locked=True)
+                .filter(status__in=TradeArchiveService.STATUSES, created_at__lt=cutoff)
+                .order_by("id")[:batch_size]
+            )
+            if not offers:
+                return 0
+
+            offer_ids = [offer.id for offer in offers]
+            ArchivedTradeOffer.objects.bulk_create([
+                ArchivedTradeOffer(id=offer.id, sender_id=offer.sender_id, receiver_id=offer.receiver_id, status=offer.status, created_at=offer.created_at)
+                for offer in offers
+            ])
+            ArchivedTradeItem.objects.bulk_create([
+                ArchivedTradeItem(
+                    id=item.id, offer_id=item.offer_id, weapon_id=item.weapon_id, variant_id=item.variant_id,
+                    quantity=item.quantity, is_offered_by_sender=item.is_offered_by_sender,
+                )
+                for item in TradeItem.objects.filter(offer_id__in=offer_ids)
+            ])
+
+            SettlementJob.objects.filter(trade_offer_id__in=offer_ids).delete()
+            TradeItem.objects.filter(offer_id__in=offer_ids).delete()
+            TradeOffer.objects.filter(id__in=offer_ids).delete()
+
+        return len(offers)
+
+    @staticmethod
+    def run(batch_size=None, max_batches=None):
+        """
+        Archives every settled offer older than the horizon, batch by batch. Returns the number archived.
+        """
+        batch_size = batch_size or settings.TRADE_ARCHIVE_BATCH_SIZE
+        cutoff = TradeArchiveService.horizon()
+
+        archived = batches = 0
+        while max_batches is None or batches < max_batches:
+            count = TradeArchiveService.archive_batch(cutoff, batch_size)
+            if not count:
+                break
+            archived += count
+            batches += 1
+
+        if archived:
+            logger.info(f"Archived {archived} trade offers created before {cutoff.isoformat()}")
+        return archived
@@ -0,0 +1,62 @@
+import logging
+import random
+import time
+from functools import wraps
+from django.conf import settings
+from django.db import OperationalError, transaction
+from trading.exceptions import TradeConflictError
+
+logger = logging.getLogger(__name__)
+
+# Lock order of trade transactions: TradeOffer rows, then Inventory rows, then the UserTradeStats and
+# UserWeaponVolume rows of TradeStatsService, each in primary key / user id order. Taking locks in this
+# one order keeps deadlocks rare; retry_on_conflict absorbs the ones left.
+
+# SQLSTATE codes Postgres uses for serialization failures and detected deadlocks.
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+RETRYABLE_SQLITE_MESSAGES = ("database is locked", "database table is locked")
+
+
+def is_retryable_conflict(exc):
+    """
+    Returns True if the database error was caused by lock contention and the
+    whole transaction can safely be retried.
+    """
+    cause = exc.__cause__
+    sqlstate = getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+    if sqlstate in RETRYABLE_SQLSTATES:
+        return True
+    return any(message in str(exc) for message in RETRYABLE_SQLITE_MESSAGES)
+
+
+def retry_on_conflict(func):
+    """
+    Runs the wrapped function in its own transaction and retries it with bounded,
+    jittered exponential backoff when it fails with a serialization failure or deadlock.
+
+    Retrying is only possible when the call owns the outermost transaction; inside
+    an existing atomic block the error is re-raised for the caller to handle.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if transaction.get_connection().in_atomic_block:
+            with transaction.atomic():
+                return func(*args, **kwargs)
+
+        max_retries = settings.TRADE_CONFLICT_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as e:
+                if not is_retryable_conflict(e):
+                    raise
+                if attempt == max_retries:
+                    logger.warning(f"{func.__qualname__} gave up after {attempt + 1} attempts: {e}")
+                    raise TradeConflictError() from e
+
+                backoff = min(settings.TRADE_CONFLICT_BACKOFF_SECONDS * (2 ** attempt), settings.TRADE_CONFLICT_MAX_BACKOFF_SECONDS)
+                time.sleep(random.uniform(0, backoff))
+
+    return wrapper
@@ -0,0 +1,207 @@
+import csv
+import io
+import random
+from collections import Counter, defaultdict
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils.timezone import now, timedelta
+from trading.models import User, Weapon, WeaponVariant, Inventory, TradeOffer, TradeItem, Ledger
+from trading.services.inventory_cache import InventoryCache
+
+class DataGenerator:
+    """
+    Generates a reproducible synthetic dataset of users, weapons, variants, inventory and trade
+    history for load tests. The same seed and parameters always give the same rows.
+
+    Ids are assigned up front, so related rows can be written without reading anything back.
+    Rows are built as plain lists in column order, without model instances or the ORM's insert
+    compiler. They are written in batches with executemany(), or with COPY on PostgreSQL.
+    Buffers are flushed in dependency order, and sequences are reset afterwards.
+
+    The ledger replays to the generated inventory:
+    - every (user, weapon) holding opens with a mint at the start of the history, covering its
+      base quantity plus everything the user gives away later;
+    - accepted offers carry their item movements, timestamped like the offer.
+    Inventory allows one variant per user and weapon. Each user is therefore assigned one
+    variant of every weapon (by their position modulo the number of variants), and offers are
+    only made between users with the same assignment.
+    """
+
+    VARIANT_NAMES = ["Red", "Blue", "Green", "Golden", "Shadow", "Frost", "Flame", "Storm"]
+    STATUS_WEIGHTS = {TradeOffer.ACCEPTED: 5, TradeOffer.REJECTED: 2, TradeOffer.PENDING: 3}
+    WRITE_ORDER = [User, Weapon, WeaponVariant, TradeOffer, TradeItem, Ledger, Inventory]
+
+    def __init__(self, seed=42, batch_size=5000, use_copy=False):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.buffers = defaultdict(list)
+        self.counts = Counter()
+        self.next_ids = {}
+        self.columns = {}
+        self.adapt_datetime = connection.ops.adapt_datetimefield_value
+
+    @staticmethod
+    def reset():
+        """
+        Empties every table of the trading app and restarts its id sequences, on any database.
+        The restarted user ids are handed out again, so the cached inventories of the current
+        users are dropped first.
+        """
+        last_user_id = User.objects.aggregate(Max("id"))["id__max"] or 0
+        for start in range(1, last_user_id + 1, 1000):
+            InventoryCache.forget(range(start, min(start + 1000, last_user_id + 1)))
+
+        tables = [model._meta.db_table for model in apps.get_app_config("trading").get_models(include_auto_created=True)]
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True))
+
+    @transaction.atomic
+    def generate(self, users, weapons, variants_per_weapon, inventory_density, offers, max_items_per_offer, days=365):
+        """
+        Appends the dataset to the existing rows and returns the number of rows written per model.
+        Raises ValueError if some user would have no trading partner.
+        """
+        if offers and users < 2 * max(1, variants_per_weapon):
+            raise ValueError("At least two users per variant are needed, so every user has a trading partner.")
+
+        ended_at = now()
+        started_at = ended_at - timedelta(days=days)
+
+        user_ids = [
+            self._add(User, id=user_id, username=f"user{user_id}", user_type=self.rng.choice(User.USER_TYPES)[0], password="!")
+            for user_id in (self._id(User) for _ in range(users))
+        ]
+        weapon_ids = [self._add(Weapon, id=self._id(Weapon), type=self.rng.choice(Weapon.WEAPON_TYPES)[0]) for _ in range(weapons)]
+        variant_ids = [
+            [
+                self._add(WeaponVariant, id=self._id(WeaponVariant), weapon_id=weapon_id, variant_name=f"{self.VARIANT_NAMES[index % len(self.VARIANT_NAMES)]} {index + 1}")
+                for index in range(variants_per_weapon)
+            ] or [None]
+            for weapon_id in weapon_ids
+        ]
+
+        def variant_of(user, weapon):
+            return variant_ids[weapon][(user + weapon) % len(variant_ids[weapon])]
+
+        # flows[user][weapon] = [given, received] through accepted offers.
+        flows = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        statuses, weights = zip(*self.STATUS_WEIGHTS.items())
+        span = ended_at - started_at
+        for index in range(offers):
+            sender, receiver = self._counterparties(users, len(variant_ids[0]))
+            status = self.rng.choices(statuses, weights)[0]
+            created_at = started_at + span * ((index + self.rng.random()) / offers)
+            trade_offer = self._add(
+                TradeOffer, id=self._id(TradeOffer), sender_id=user_ids[sender], receiver_id=user_ids[receiver], status=status, created_at=created_at,
+            )
+
+            offered, requested = self.rng.randint(1, max_items_per_offer), self.rng.randint(1, max_items_per_offer)
+            lines = self.rng.sample(range(weapons), min(offered + requested, weapons))
+            for position, weapon in enumerate(lines):
+                giver, taker = (sender, receiver) if position < max(1, len(lines) - requested) else (receiver, sender)
+                item = {"weapon_id": weapon_ids[weapon], "variant_id": variant_of(sender, weapon), "quantity": self.rng.randint(1, 5)}
+                self._add(TradeItem, id=self._id(TradeItem), offer_id=trade_offer, is_offered_by_sender=giver == sender, **item)
+                if status == TradeOffer.ACCEPTED:
+                    self._add(
+                        Ledger, id=self._id(Ledger), trade_offer_id=trade_offer, sender_id=user_ids[giver], receiver_id=user_ids[taker],
+                        created_at=created_at, **item,
+                    )
+                    flows[giver][weapon][0] += item["quantity"]
+                    flows[taker][weapon][1] += item["quantity"]
+
+        for user in range(users):
+            held = self.rng.sample(range(weapons), min(weapons, int(inventory_density * weapons + self.rng.random())))
+            user_flows = flows.pop(user, {})
+            for weapon in sorted(set(held) | user_flows.keys()):
+                base = self.rng.randint(1, 10) if weapon in held else 0
+                given, received = user_flows.get(weapon, (0, 0))
+                holding = {"weapon_id": weapon_ids[weapon], "variant_id": variant_of(user, weapon)}
+                if base + given:
+                    self._add(Ledger, id=self._id(Ledger), receiver_id=user_ids[user], quantity=base + given, created_at=started_at, **holding)
+                if base + received:
+                    self._add(Inventory, id=self._id(Inventory), user_id=user_ids[user], quantity=base + received, **holding)
+
+        self._flush()
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), self.WRITE_ORDER):
+                cursor.execute(sql)
+        return dict(self.counts)
+
+    def _counterparties(self, users, variants):
+        """
+        Picks a random sender and a different receiver that was assigned the same variants.
+        Every group needs two members, which generate() checks up front.
+        """
+        sender = self.rng.randrange(users)
+        group = sender % variants
+        members = (users - group + variants - 1) // variants
+        position = self.rng.randrange(members - 1)
+        position += position >= sender // variants
+        return sender, group + position * variants
+
+    def _id(self, model):
+        if model not in self.next_ids:
+            self.next_ids[model] = (model.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+        self.next_ids[model] += 1
+        return self.next_ids[model] - 1
+
+    def _model_columns(self, model):
+        """
+        Returns ([(attname, default)], datetime column positions) for the model's concrete fields.
+        Defaults are evaluated once, so e.g. every generated user shares one date_joined.
+        """
+        if model not in self.columns:
+            fields = model._meta.concrete_fields
+            self.columns[model] = (
+                [(field.attname, field.get_default()) for field in fields],
+                [index for index, field in enumerate(fields) if isinstance(field, models.DateTimeField)],
+            )
+        return self.columns[model]
+
+    def _add(self, model, **values):
+        columns, datetimes = self._model_columns(model)
+        row = [values.get(attname, default) for attname, default in columns]
+        for index in datetimes:
+            if row[index] is not None:
+                row[index] = self.adapt_datetime(row[index])
+
+        self.buffers[model].append(row)
+        if len(self.buffers[model]) >= self.batch_size:
+            self._flush()
+        return values["id"]
+
+    def _flush(self):
+        # Referenced rows are written before the rows pointing at them.
+        for model in self.WRITE_ORDER:
+            rows, self.buffers[model] = self.buffers[model], []
+            if not rows:
+                continue
+
+            table = connection.ops.quote_name(model._meta.db_table)
+            columns = ", ".join(connection.ops.quote_name(field.column) for field in model._meta.concrete_fields)
+            if self.use_copy:
+                self._copy(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", rows)
+            else:
+                placeholders = ", ".join(["%s"] * len(model._meta.concrete_fields))
+                with connection.cursor() as cursor:
+                    cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+            self.counts[model.__name__] += len(rows)
+
+    def _copy(self, sql, rows):
+        """
+        Streams the rows as CSV into COPY FROM STDIN (PostgreSQL, psycopg 3 or psycopg2).
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["\\N" if value is None else value for value in row])
+
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, "copy"):
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+            else:
+                buffer.seek(0)
+                cursor.cursor.copy_expert(sql, buffer)
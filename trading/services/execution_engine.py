@@ -0,0 +1,92 @@
+from collections import defaultdict
+from trading.exceptions import TradeValidationError
+from trading.models import Ledger, User
+from trading.repositories.inventory_repository import InventoryRepository
+from trading.services.inventory_cache import InventoryCache
+from trading.services.stats_service import TradeStatsService
+
+class TradeExecutionEngine:
+    """
+    Set-based inventory transfer for accepted trade offers.
+
+    Inventory rows of all participants are loaded and locked in one query, every
+    debit and credit is staged in memory and `flush()` writes them back, together with
+    one Ledger entry per item movement, with a constant number of statements,
+    independent of the number of trade items.
+    """
+
+    def __init__(self, user_ids, weapon_ids):
+        self.inventory = InventoryRepository.lock_inventory(user_ids, weapon_ids)
+        self.deltas = defaultdict(int)
+        self.ledger_entries = []
+
+    def available(self, key):
+        row = self.inventory.get(key)
+        return (row.quantity if row else 0) + self.deltas[key]
+
+    def stage(self, trade_offer, trade_items):
+        """
+        Validates that both parties own what they give and stages the transfer.
+        Nothing is staged if validation fails. Expects trade_items with weapon and variant loaded.
+        """
+        sender_items = [item for item in trade_items if item.is_offered_by_sender]
+        receiver_items = [item for item in trade_items if not item.is_offered_by_sender]
+
+        self.stage_movements([
+            Ledger(trade_offer_id=trade_offer.id, sender_id=giver_id, receiver_id=taker_id, weapon=item.weapon, variant=item.variant, quantity=item.quantity)
+            for giver_id, taker_id, items in (
+                (trade_offer.sender_id, trade_offer.receiver_id, sender_items),
+                (trade_offer.receiver_id, trade_offer.sender_id, receiver_items),
+            )
+            for item in items
+        ])
+
+    def stage_reversal(self, ledger_entries):
+        """
+        Stages compensating movements that give every item of the entries back to its sender,
+        validated like a trade: the original receivers must still own what they return.
+        Expects ledger_entries with weapon and variant loaded.
+        """
+        self.stage_movements([
+            Ledger(
+                trade_offer_id=entry.trade_offer_id, sender_id=entry.receiver_id, receiver_id=entry.sender_id,
+                weapon=entry.weapon, variant=entry.variant, quantity=entry.quantity, reversal_of_id=entry.id,
+            )
+            for entry in ledger_entries
+        ])
+
+    def stage_movements(self, movements):
+        """
+        Validates and stages unsaved Ledger entries, each moving quantity from sender to receiver.
+        Givers are checked against their locked balance plus everything staged so far; nothing
+        is staged if any of them falls short.
+        """
+        debits = defaultdict(int)
+        for movement in movements:
+            key = (movement.sender_id, movement.weapon_id, movement.variant_id)
+            debits[key] += movement.quantity
+
+            if self.available(key) < debits[key]:
+                giver = User.objects.only("username").get(id=movement.sender_id)
+                raise TradeValidationError(f"User {giver.username} does not have enough {movement.weapon.get_type_display()} {movement.variant.variant_name if movement.variant else 'No Variant'}.")
+
+        for movement in movements:
+            self.deltas[(movement.sender_id, movement.weapon_id, movement.variant_id)] -= movement.quantity
+            self.deltas[(movement.receiver_id, movement.weapon_id, movement.variant_id)] += movement.quantity
+            self.ledger_entries.append(movement)
+
+    def flush(self):
+        created = InventoryRepository.apply_deltas(self.inventory, self.deltas)
+        InventoryCache.invalidate_on_commit({user_id for user_id, _, _ in self.deltas})
+        Ledger.objects.bulk_create(self.ledger_entries)
+        TradeStatsService.record_movements(self.ledger_entries)
+
+        # Keep the in-memory snapshot in sync so the engine can keep staging after a flush.
+        for key, delta in self.deltas.items():
+            if key in self.inventory:
+                self.inventory[key].quantity += delta
+        for row in created:
+            self.inventory[(row.user_id, row.weapon_id, row.variant_id)] = row
+
+        self.deltas.clear()
+        self.ledger_entries = []
@@ -0,0 +1,111 @@
+import csv
+import heapq
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import Q
+from trading.models import TradeOffer, ArchivedTradeOffer, Weapon
+from trading.services.archive_service import TradeArchiveService
+
+class TradeExportService:
+    """
+    Streams trade history as one row per trade item (offers without items get one row with
+    empty item columns), encoded as NDJSON or CSV.
+
+    Rows are read with values() over a single LEFT JOIN of TradeOffer and TradeItem and fetched
+    in chunks through a server-side cursor, so memory stays constant however many rows match.
+    Archived offers are read the same way and merged in by id when the filters can reach them.
+    """
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+    FORMATS = {NDJSON: "application/x-ndjson", CSV: "text/csv"}
+
+    COLUMNS = {
+        "trade_offer_id": "id",
+        "created_at": "created_at",
+        "status": "status",
+        "sender_id": "sender_id",
+        "sender_username": "sender__username",
+        "receiver_id": "receiver_id",
+        "receiver_username": "receiver__username",
+        "weapon_id": "items__weapon_id",
+        "weapon_type": "items__weapon__type",
+        "variant_id": "items__variant_id",
+        "variant_name": "items__variant__variant_name",
+        "quantity": "items__quantity",
+        "is_offered_by_sender": "items__is_offered_by_sender",
+    }
+
+    @staticmethod
+    def rows(user_id=None, direction=None, filters=None, chunk_size=None, using=None):
+        """
+        Yields export rows as dictionaries in (trade_offer_id, item id) order, for all offers or
+        the offers of one user, narrowed by TradeHistoryService.parse_filters() output. `using`
+        selects the database alias instead of the router.
+
+        When archived offers are included, both streams are read in one transaction, from a
+        REPEATABLE READ snapshot on PostgreSQL (SQLite transactions always read a snapshot), so an
+        offer that archive_trades moves while the export runs is neither lost nor exported twice.
+        """
+        filters = filters or {}
+        if not TradeArchiveService.may_contain(filters):
+            yield from TradeExportService._merged([TradeOffer], user_id, direction, filters, chunk_size, using)
+            return
+
+        using = using or router.db_for_read(TradeOffer)
+        connection = connections[using]
+        snapshot = connection.vendor == "postgresql" and not connection.in_atomic_block
+        with transaction.atomic(using=using):
+            if snapshot:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            yield from TradeExportService._merged([TradeOffer, ArchivedTradeOffer], user_id, direction, filters, chunk_size, using)
+
+    @staticmethod
+    def _merged(models, user_id, direction, filters, chunk_size, using):
+        streams = []
+        for model in models:
+            queryset = model.objects.using(using).filter(**filters)
+            if user_id is not None:
+                sent, received = Q(sender_id=user_id), Q(receiver_id=user_id)
+                queryset = queryset.filter({"sent": sent, "received": received}.get(direction, sent | received))
+            values = queryset.order_by("id", "items__id").values_list(*TradeExportService.COLUMNS.values())
+            streams.append(values.iterator(chunk_size=chunk_size or settings.TRADE_EXPORT_CHUNK_SIZE))
+
+        statuses = dict(TradeOffer.STATUS_CHOICES)
+        weapon_types = dict(Weapon.WEAPON_TYPES)
+
+        # Archived offers keep their ids, so both streams merge into one id order.
+        for values_row in heapq.merge(*streams, key=lambda values_row: values_row[0]):
+            row = dict(zip(TradeExportService.COLUMNS, values_row))
+            row["status"] = statuses.get(row["status"])
+            row["weapon_type"] = weapon_types.get(row["weapon_type"])
+            is_offered_by_sender = row.pop("is_offered_by_sender")
+            row["direction"] = None if is_offered_by_sender is None else ("offered" if is_offered_by_sender else "requested")
+            yield row
+
+    @staticmethod
+    def encode(rows, file_format):
+        """
+        Lazily encodes rows into NDJSON lines or CSV lines (with a header).
+        """
+        if file_format == TradeExportService.CSV:
+            return TradeExportService._csv(rows)
+        return (json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in rows)
+
+    @staticmethod
+    def _csv(rows):
+        class Echo:
+            def write(self, value):
+                return value
+
+        writer = csv.writer(Echo())
+        yield writer.writerow(TradeExportService.header())
+        for row in rows:
+            yield writer.writerow(row.values())
+
+    @staticmethod
+    def header():
+        return [column for column in TradeExportService.COLUMNS if column != "is_offered_by_sender"] + ["direction"]
@@ -0,0 +1,183 @@
+import base64
+import binascii
+from datetime import datetime
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Prefetch, Q, Value
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import make_aware
+from trading.exceptions import TradeValidationError
+from trading.models import TradeOffer, TradeItem, ArchivedTradeOffer, ArchivedTradeItem
+from trading.services.archive_service import TradeArchiveService
+
+class TradeHistoryService:
+    """
+    Keyset-paginated trade history, newest first, ordered by (created_at, id).
+    Archived offers are merged in when the filters reach back past the archive horizon.
+    """
+
+    @staticmethod
+    def parse_filters(params):
+        """
+        Converts history query parameters into TradeOffer filter kwargs.
+        Returns (direction, filters) where direction is None, "sent" or "received".
+        """
+        direction = params.get("type")
+        if direction:
+            direction = direction.lower()
+            if direction not in ("sent", "received"):
+                raise TradeValidationError("Invalid type parameter")
+
+        filters = {}
+
+        if params.get("status"):
+            filters["status"] = params["status"]
+
+        start_date = parse_date(params["start_date"]) if params.get("start_date") else None
+        if start_date:
+            filters["created_at__gte"] = make_aware(datetime.combine(start_date, datetime.min.time()))
+
+        end_date = parse_date(params["end_date"]) if params.get("end_date") else None
+        if end_date:
+            filters["created_at__lte"] = make_aware(datetime.combine(end_date, datetime.max.time()))
+
+        return direction or None, filters
+
+    @staticmethod
+    def parse_page_size(value):
+        if not value:
+            return settings.TRADE_HISTORY_PAGE_SIZE
+        try:
+            page_size = int(value)
+        except ValueError:
+            raise TradeValidationError("Invalid page_size parameter")
+        if page_size < 1:
+            raise TradeValidationError("Invalid page_size parameter")
+        return min(page_size, settings.TRADE_HISTORY_MAX_PAGE_SIZE)
+
+    @staticmethod
+    def encode_cursor(created_at, offer_id):
+        raw = f"{created_at.isoformat()}|{offer_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            created_at, offer_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            created_at = parse_datetime(created_at)
+            offer_id = int(offer_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise TradeValidationError("Invalid cursor")
+        if created_at is None:
+            raise TradeValidationError("Invalid cursor")
+        return created_at, offer_id
+
+    @staticmethod
+    def _page_ids(user_id, direction, filters, cursor, limit):
+        return list(TradeHistoryService._page_query(user_id, direction, filters, cursor, limit))
+
+    @staticmethod
+    def _page_query(user_id, direction, filters, cursor, limit):
+        """
+        Builds the query for the (id, created_at, archived) of the next `limit` offers after the cursor.
+        Sent and received offers are fetched as two separate index range scans on
+        (sender, created_at, id) and (receiver, created_at, id) and combined with a UNION,
+        instead of one OR that forces the database to scan every row of the user. The same
+        scans of the archive table join the UNION only when archived offers can match.
+        """
+        after_cursor = Q()
+        if cursor:
+            created_at, offer_id = cursor
+            after_cursor = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=offer_id)
+
+        models = [TradeOffer, ArchivedTradeOffer] if TradeArchiveService.may_contain(filters) else [TradeOffer]
+        arms = []
+        for model in models:
+            offers = model.objects.annotate(archived=Value(model is ArchivedTradeOffer, output_field=BooleanField()))
+            if direction in (None, "sent"):
+                arms.append(offers.filter(after_cursor, sender_id=user_id, **filters))
+            if direction in (None, "received"):
+                arms.append(offers.filter(after_cursor, receiver_id=user_id, **filters))
+
+        arms = [arm.values_list("id", "created_at", "archived") for arm in arms]
+
+        if len(arms) == 1:
+            return arms[0].order_by("-created_at", "-id")[:limit]
+
+        # Limiting each arm keeps both scans bounded; not every backend allows it inside a UNION.
+        if connection.features.supports_slicing_ordering_in_compound:
+            arms = [arm.order_by("-created_at", "-id")[:limit] for arm in arms]
+
+        return arms[0].union(*arms[1:]).order_by("-created_at", "-id")[:limit]
+
+    @staticmethod
+    def with_related(queryset):
+        """
+        Loads everything TradeOfferSerializer reads (usernames and line items with their
+        weapon and variant) in two extra queries for the whole page. Works for live and archived offers.
+        """
+        item_model = ArchivedTradeItem if queryset.model is ArchivedTradeOffer else TradeItem
+        return queryset.select_related("sender", "receiver").prefetch_related(
+            Prefetch("items", queryset=item_model.objects.select_related("weapon", "variant").order_by("id"))
+        )
+
+    @staticmethod
+    def _split(page):
+        """
+        Splits [(id, created_at, archived)] into the ids of live and of archived offers.
+        """
+        return [offer_id for offer_id, _, archived in page if not archived], [offer_id for offer_id, _, archived in page if archived]
+
+    @staticmethod
+    def _moved(live_ids, offers_by_id):
+        """
+        Returns the live ids missing from offers_by_id. archive_trades can commit between the page
+        query and the offer lookup; moved offers keep their ids and are looked up in the archive.
+        """
+        return [offer_id for offer_id in live_ids if offer_id not in offers_by_id]
+
+    @staticmethod
+    def _page_result(page, offers_by_id, has_next):
+        # Offers gone from both tables are dropped; the cursor still continues after the page.
+        trade_offers = [offers_by_id[offer_id] for offer_id, _, _ in page if offer_id in offers_by_id]
+        next_cursor = TradeHistoryService.encode_cursor(page[-1][1], page[-1][0]) if has_next else None
+        return trade_offers, next_cursor
+
+    @staticmethod
+    def get_page(user_id, direction=None, filters=None, cursor=None, page_size=None):
+        """
+        Returns (trade_offers, next_cursor) for one page of a user's trade history.
+        next_cursor is None on the last page.
+        """
+        page_size = page_size or settings.TRADE_HISTORY_PAGE_SIZE
+        cursor = TradeHistoryService.decode_cursor(cursor) if cursor else None
+
+        page = TradeHistoryService._page_ids(user_id, direction, filters or {}, cursor, page_size + 1)
+        has_next = len(page) > page_size
+        page = page[:page_size]
+
+        live_ids, archived_ids = TradeHistoryService._split(page)
+        offers_by_id = TradeHistoryService.with_related(TradeOffer.objects.all()).in_bulk(live_ids)
+        archived_ids += TradeHistoryService._moved(live_ids, offers_by_id)
+        offers_by_id.update(TradeHistoryService.with_related(ArchivedTradeOffer.objects.all()).in_bulk(archived_ids))
+        return TradeHistoryService._page_result(page, offers_by_id, has_next)
+
+    @staticmethod
+    async def aget_page(user_id, direction=None, filters=None, cursor=None, page_size=None):
+        """
+        Async counterpart of get_page() for ASGI views: runs the same queries through the
+        async ORM, so no worker thread is held while the page is fetched.
+        """
+        page_size = page_size or settings.TRADE_HISTORY_PAGE_SIZE
+        cursor = TradeHistoryService.decode_cursor(cursor) if cursor else None
+
+        query = TradeHistoryService._page_query(user_id, direction, filters or {}, cursor, page_size + 1)
+        page = [row async for row in query]
+        has_next = len(page) > page_size
+        page = page[:page_size]
+
+        live_ids, archived_ids = TradeHistoryService._split(page)
+        offers_by_id = await TradeHistoryService.with_related(TradeOffer.objects.all()).ain_bulk(live_ids)
+        archived_ids += TradeHistoryService._moved(live_ids, offers_by_id)
+        offers_by_id.update(await TradeHistoryService.with_related(ArchivedTradeOffer.objects.all()).ain_bulk(archived_ids))
+        return TradeHistoryService._page_result(page, offers_by_id, has_next)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from trading.routers import ReplicaRouter
+
+class InventoryCache:
+    """
+    Read-through cache of per-user inventory snapshots.
+
+    Snapshots are stored under a per-user version token. Invalidation swaps the token
+    instead of deleting the snapshot, so a reader that loaded rows before a write committed
+    can only store its result under the old token, which is never read again.
+    """
+
+    @staticmethod
+    def _cache():
+        return caches[settings.INVENTORY_CACHE_ALIAS]
+
+    @staticmethod
+    def _version_key(user_id):
+        return f"inventory:{user_id}:version"
+
+    @staticmethod
+    def _snapshot_key(user_id, version):
+        return f"inventory:{user_id}:{version}"
+
+    @staticmethod
+    def get_snapshot(user_id, build):
+        """
+        Returns {"etag": ..., "data": [...]} for the user's inventory, calling build()
+        to produce the serialized rows on a cache miss.
+        """
+        cache = InventoryCache._cache()
+        version = cache.get_or_set(InventoryCache._version_key(user_id), lambda: uuid4().hex, None)
+        key = InventoryCache._snapshot_key(user_id, version)
+
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = InventoryCache._snapshot(build())
+            cache.set(key, snapshot, settings.INVENTORY_CACHE_TIMEOUT)
+
+        return snapshot
+
+    @staticmethod
+    async def aget_snapshot(user_id, build):
+        """
+        Async counterpart of get_snapshot(); build is a coroutine function returning the rows.
+        """
+        cache = InventoryCache._cache()
+        version = await cache.aget_or_set(InventoryCache._version_key(user_id), lambda: uuid4().hex, None)
+        key = InventoryCache._snapshot_key(user_id, version)
+
+        snapshot = await cache.aget(key)
+        if snapshot is None:
+            snapshot = InventoryCache._snapshot(await build())
+            await cache.aset(key, snapshot, settings.INVENTORY_CACHE_TIMEOUT)
+
+        return snapshot
+
+    @staticmethod
+    def _snapshot(rows):
+        data = [dict(row) for row in rows]
+        etag = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+        return {"etag": etag, "data": data}
+
+    @staticmethod
+    def invalidate(user_ids):
+        InventoryCache._cache().set_many({InventoryCache._version_key(user_id): uuid4().hex for user_id in user_ids}, None)
+
+    @staticmethod
+    def forget(user_ids):
+        """
+        Deletes the users' version tokens, e.g. before their ids are reused by new users. Their
+        snapshots can no longer be reached and expire after INVENTORY_CACHE_TIMEOUT.
+        """
+        InventoryCache._cache().delete_many([InventoryCache._version_key(user_id) for user_id in user_ids])
+
+    @staticmethod
+    def invalidate_on_commit(user_ids):
+        """
+        Invalidates the users' snapshots once the current transaction commits.
+
+        The users are pinned to the primary first: a read routed to a lagging replica right after
+        the new version token is set would cache the old rows under it until INVENTORY_CACHE_TIMEOUT.
+        """
+        user_ids = set(user_ids)
+        ReplicaRouter.pin_on_commit(user_ids)
+        transaction.on_commit(lambda: InventoryCache.invalidate(user_ids))
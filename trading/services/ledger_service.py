@@ -0,0 +1,104 @@
+from collections import defaultdict
+from django.db import connection, transaction
+from trading.models import Ledger, User
+from trading.repositories.inventory_repository import InventoryRepository
+from trading.services.inventory_cache import InventoryCache
+
+class LedgerReplayService:
+    """
+    Rebuilds inventory balances by replaying the ledger.
+
+    Users are processed in batches and ledger rows are streamed with server-side cursors,
+    so memory stays bounded by the inventory of one batch, not by the size of the ledger.
+    """
+
+    REBUILD_INVENTORY = "inventory"
+    ADOPT_LIVE = "ledger"
+
+    @staticmethod
+    def user_batches(user_ids=None, batch_size=1000):
+        """
+        Yields lists of user ids in primary key order, streamed from the database unless given.
+        """
+        if user_ids is None:
+            user_ids = User.objects.order_by("id").values_list("id", flat=True).iterator(chunk_size=batch_size)
+
+        batch = []
+        for user_id in user_ids:
+            batch.append(user_id)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def fold(user_ids, since=None, until=None, chunk_size=5000):
+        """
+        Streams every ledger row touching the users and folds them into net quantities keyed
+        by (user_id, weapon_id, variant_id). Outgoing and incoming rows are read as two scans
+        on the (sender, created_at) and (receiver, created_at) indexes.
+        """
+        window = {}
+        if since:
+            window["created_at__gte"] = since
+        if until:
+            window["created_at__lt"] = until
+
+        balances = defaultdict(int)
+        columns = ("weapon_id", "variant_id", "quantity")
+
+        outgoing = Ledger.objects.filter(sender_id__in=user_ids, **window).values_list("sender_id", *columns)
+        for user_id, weapon_id, variant_id, quantity in outgoing.iterator(chunk_size=chunk_size):
+            balances[(user_id, weapon_id, variant_id)] -= quantity
+
+        incoming = Ledger.objects.filter(receiver_id__in=user_ids, **window).values_list("receiver_id", *columns)
+        for user_id, weapon_id, variant_id, quantity in incoming.iterator(chunk_size=chunk_size):
+            balances[(user_id, weapon_id, variant_id)] += quantity
+
+        return balances
+
+    @staticmethod
+    def reconcile(user_ids, fix=None, chunk_size=5000):
+        """
+        Diffs ledger balances against live inventory for the users and returns the drift as a
+        sorted list of (key, ledger_quantity, live_quantity).
+
+        fix=REBUILD_INVENTORY rewrites inventory to the ledger balances (negative balances are
+        reported but never written); fix=ADOPT_LIVE appends adjustment entries so the ledger
+        matches live inventory, e.g. to bootstrap the ledger for data that predates it.
+        When fixing, inventory rows are locked before the ledger is read, so no trade of these users
+        can commit in between. A report only reads both from one REPEATABLE READ snapshot on
+        PostgreSQL (SQLite transactions always read a snapshot), so live trades are never blocked.
+        """
+        snapshot = fix is None and connection.vendor == "postgresql" and not connection.in_atomic_block
+        with transaction.atomic():
+            if snapshot:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            if fix is None:
+                inventory = InventoryRepository.get_inventory(user_ids)
+            else:
+                inventory = InventoryRepository.lock_inventory(user_ids)
+            ledger = LedgerReplayService.fold(user_ids, chunk_size=chunk_size)
+
+            drift = []
+            for key in ledger.keys() | inventory.keys():
+                live_quantity = inventory[key].quantity if key in inventory else 0
+                if ledger.get(key, 0) != live_quantity:
+                    drift.append((key, ledger.get(key, 0), live_quantity))
+            drift.sort(key=lambda entry: (entry[0][0], entry[0][1], entry[0][2] or 0))
+
+            if fix == LedgerReplayService.REBUILD_INVENTORY:
+                InventoryRepository.apply_deltas(inventory, {
+                    key: ledger_quantity - live_quantity
+                    for key, ledger_quantity, live_quantity in drift if ledger_quantity >= 0
+                })
+                InventoryCache.invalidate_on_commit({key[0] for key, _, _ in drift})
+
+            elif fix == LedgerReplayService.ADOPT_LIVE:
+                Ledger.objects.bulk_create(
+                    Ledger.adjustment(*key, live_quantity - ledger_quantity) for key, ledger_quantity, live_quantity in drift
+                )
+
+        return drift
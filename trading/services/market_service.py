@@ -0,0 +1,263 @@
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_date
+from django.utils.timezone import make_aware, now, timedelta
+from trading.exceptions import TradeValidationError
+from trading.models import Ledger, TradeItem, ArchivedTradeItem, MarketVolumeRollup, MarketPairRollup, RollupWatermark
+
+class MarketRollupService:
+    """
+    Folds trade movements from the Ledger into per-instrument (weapon, variant) volume buckets and
+    pairwise exchange-ratio buckets at minute, hour and day resolution.
+
+    The pipeline is incremental. A watermark keeps the highest ledger id already folded in, and
+    each run reads only the rows after it. Rows younger than MARKET_ROLLUP_LAG_SECONDS are left
+    for the next run, because a transaction still in flight can commit a lower id than rows that
+    are already visible. A reversal is taken off the buckets of the trade it reverses. Minute
+    buckets are pruned after MARKET_ROLLUP_MINUTE_RETENTION_DAYS, so a year of chart data is a
+    few hundred hour/day rows per instrument read from the unique index.
+    """
+
+    WATERMARK = "market"
+
+    RESOLUTION_NAMES = {name.lower(): resolution for resolution, name in MarketVolumeRollup.RESOLUTIONS}
+
+    @staticmethod
+    def bucket_start(moment, resolution):
+        moment = moment.astimezone(dt_timezone.utc).replace(second=0, microsecond=0)
+        if resolution in (MarketVolumeRollup.HOUR, MarketVolumeRollup.DAY):
+            moment = moment.replace(minute=0)
+        if resolution == MarketVolumeRollup.DAY:
+            moment = moment.replace(hour=0)
+        return moment
+
+    @staticmethod
+    def run(batch_size=None, lag_seconds=None):
+        """
+        Rolls up ledger rows in batches until it reaches the lag cutoff. Returns the number of
+        ledger rows read.
+        """
+        rows = 0
+        while True:
+            count = MarketRollupService.roll_up_batch(batch_size, lag_seconds)
+            if not count:
+                return rows
+            rows += count
+
+    @staticmethod
+    @transaction.atomic
+    def roll_up_batch(batch_size=None, lag_seconds=None):
+        """
+        Folds the next batch of ledger rows into the rollups and advances the watermark in the
+        same transaction. The locked watermark row keeps concurrent runs from folding rows twice.
+        """
+        batch_size = batch_size or settings.MARKET_ROLLUP_BATCH_SIZE
+        lag_seconds = settings.MARKET_ROLLUP_LAG_SECONDS if lag_seconds is None else lag_seconds
+
+        RollupWatermark.objects.get_or_create(name=MarketRollupService.WATERMARK)
+        watermark = RollupWatermark.objects.select_for_update().get(name=MarketRollupService.WATERMARK)
+
+        cutoff = now() - timedelta(seconds=lag_seconds)
+        rows = list(
+            Ledger.objects.filter(id__gt=watermark.position).order_by("id")
+            .values_list("id", "trade_offer_id", "reversal_of_id", "weapon_id", "variant_id", "quantity", "created_at")[:batch_size]
+        )
+        rows = rows[:next((index for index, row in enumerate(rows) if row[6] > cutoff), len(rows))]
+
+        # An offer's movements are written by one bulk insert and have consecutive ids, so when the
+        # batch is full its last offer may continue in the next batch and is left for that one.
+        if len(rows) == batch_size and rows[-1][1] is not None:
+            complete = [row for row in rows if row[1] != rows[-1][1]]
+            rows = complete or rows
+        if not rows:
+            return 0
+
+        MarketRollupService._fold(rows)
+        watermark.position = rows[-1][0]
+        watermark.save(update_fields=["position", "updated_at"])
+        return len(rows)
+
+    @staticmethod
+    def _fold(rows):
+        reversed_at = dict(
+            Ledger.objects.filter(id__in={row[2] for row in rows if row[1] is not None and row[2] is not None})
+            .values_list("id", "created_at")
+        )
+
+        # Trades count +1 in the buckets of their settlement time; reversals count -1 in the
+        # buckets of the trade they reverse.
+        volume_quantity = defaultdict(int)
+        volume_offers = defaultdict(lambda: {1: set(), -1: set()})
+        events = {}
+        for _, offer_id, reversal_of_id, weapon_id, variant_id, quantity, created_at in rows:
+            if offer_id is None:
+                continue
+            sign = -1 if reversal_of_id else 1
+            traded_at = reversed_at[reversal_of_id] if reversal_of_id else created_at
+            events[(offer_id, sign)] = traded_at
+            for resolution, _ in MarketVolumeRollup.RESOLUTIONS:
+                key = (weapon_id, variant_id or 0, resolution, MarketRollupService.bucket_start(traded_at, resolution))
+                volume_quantity[key] += sign * quantity
+                volume_offers[key][sign].add(offer_id)
+
+        volumes = {
+            key: {"quantity": quantity, "trades": len(volume_offers[key][1]) - len(volume_offers[key][-1])}
+            for key, quantity in volume_quantity.items()
+        }
+        MarketRollupService._merge_volumes(volumes)
+        MarketRollupService._merge_pairs(MarketRollupService._pair_deltas(events))
+
+    @staticmethod
+    def _pair_deltas(events):
+        """
+        Builds pair bucket deltas from the terms of the offers in events {(offer_id, sign): time}.
+        Only offers with exactly one offered and one requested line imply a ratio. Offers archived
+        before their ledger rows were rolled up keep their terms in ArchivedTradeItem.
+        """
+        lines = defaultdict(lambda: ([], []))
+        for model in (TradeItem, ArchivedTradeItem):
+            items = model.objects.filter(offer_id__in={offer_id for offer_id, _ in events}).order_by()
+            for offer_id, is_offered_by_sender, weapon_id, variant_id, quantity in items.values_list(
+                "offer_id", "is_offered_by_sender", "weapon_id", "variant_id", "quantity"
+            ):
+                lines[offer_id][0 if is_offered_by_sender else 1].append(((weapon_id, variant_id or 0), quantity))
+
+        pairs = {}
+        for (offer_id, sign), traded_at in events.items():
+            offered, requested = lines.get(offer_id, ((), ()))
+            if len(offered) != 1 or len(requested) != 1 or offered[0][0] == requested[0][0]:
+                continue
+
+            (base, base_quantity), (quote, quote_quantity) = sorted([offered[0], requested[0]])
+            ratio = quote_quantity / base_quantity
+            for resolution, _ in MarketVolumeRollup.RESOLUTIONS:
+                key = (*base, *quote, resolution, MarketRollupService.bucket_start(traded_at, resolution))
+                delta = pairs.setdefault(key, {"base_quantity": 0, "quote_quantity": 0, "trades": 0, "low_ratio": None, "high_ratio": None})
+                delta["base_quantity"] += sign * base_quantity
+                delta["quote_quantity"] += sign * quote_quantity
+                delta["trades"] += sign
+                # A reversal cannot narrow the range again, so only trades move low and high.
+                if sign > 0:
+                    delta["low_ratio"] = min(ratio, delta["low_ratio"] or ratio)
+                    delta["high_ratio"] = max(ratio, delta["high_ratio"] or ratio)
+        return pairs
+
+    @staticmethod
+    def _merge_volumes(deltas):
+        key_fields = ("weapon_id", "variant_id", "resolution", "bucket_start")
+        existing = MarketRollupService._existing(MarketVolumeRollup, key_fields, deltas)
+
+        created, updated = [], []
+        for key, delta in deltas.items():
+            row = existing.get(key)
+            if row is None:
+                created.append(MarketVolumeRollup(**dict(zip(key_fields, key)), **delta))
+                continue
+            row.quantity += delta["quantity"]
+            row.trades += delta["trades"]
+            updated.append(row)
+
+        MarketVolumeRollup.objects.bulk_create(created)
+        MarketVolumeRollup.objects.bulk_update(updated, ["quantity", "trades"])
+
+    @staticmethod
+    def _merge_pairs(deltas):
+        key_fields = ("base_weapon_id", "base_variant_id", "quote_weapon_id", "quote_variant_id", "resolution", "bucket_start")
+        existing = MarketRollupService._existing(MarketPairRollup, key_fields, deltas)
+
+        created, updated = [], []
+        for key, delta in deltas.items():
+            row = existing.get(key)
+            if row is None:
+                if delta["low_ratio"] is not None:
+                    created.append(MarketPairRollup(**dict(zip(key_fields, key)), **delta))
+                continue
+            for field in ("base_quantity", "quote_quantity", "trades"):
+                setattr(row, field, getattr(row, field) + delta[field])
+            if delta["low_ratio"] is not None:
+                row.low_ratio = min(row.low_ratio, delta["low_ratio"])
+                row.high_ratio = max(row.high_ratio, delta["high_ratio"])
+            updated.append(row)
+
+        MarketPairRollup.objects.bulk_create(created)
+        MarketPairRollup.objects.bulk_update(updated, ["base_quantity", "quote_quantity", "trades", "low_ratio", "high_ratio"])
+
+    @staticmethod
+    def _existing(model, key_fields, deltas):
+        """
+        Loads the rollup rows for the delta keys with one query over the key columns' values.
+        """
+        if not deltas:
+            return {}
+        lookups = {f"{field}__in": {key[index] for key in deltas} for index, field in enumerate(key_fields)}
+        rows = model.objects.filter(**lookups)
+        return {key: row for row in rows if (key := tuple(getattr(row, field) for field in key_fields)) in deltas}
+
+    @staticmethod
+    def prune(retention_days=None):
+        """
+        Deletes minute buckets older than the retention period. Returns the number of rows deleted.
+        """
+        retention_days = settings.MARKET_ROLLUP_MINUTE_RETENTION_DAYS if retention_days is None else retention_days
+        before = now() - timedelta(days=retention_days)
+        deleted = 0
+        for model in (MarketVolumeRollup, MarketPairRollup):
+            deleted += model.objects.filter(resolution=MarketVolumeRollup.MINUTE, bucket_start__lt=before).delete()[0]
+        return deleted
+
+    @staticmethod
+    def parse_params(params):
+        """
+        Converts chart query parameters into (resolution, start, end). Raises TradeValidationError.
+        """
+        resolution = MarketRollupService.RESOLUTION_NAMES.get(params.get("resolution", "day").lower())
+        if resolution is None:
+            raise TradeValidationError("Invalid resolution parameter")
+
+        bounds = []
+        for param, time in (("start_date", datetime.min.time()), ("end_date", datetime.max.time())):
+            value = parse_date(params[param]) if params.get(param) else None
+            bounds.append(make_aware(datetime.combine(value, time)) if value else None)
+        return resolution, *bounds
+
+    @staticmethod
+    def _range(queryset, start, end):
+        if start:
+            queryset = queryset.filter(bucket_start__gte=start)
+        if end:
+            queryset = queryset.filter(bucket_start__lte=end)
+        return queryset.order_by("bucket_start")
+
+    @staticmethod
+    def get_volume(weapon_id, variant_id, resolution, start=None, end=None):
+        buckets = MarketVolumeRollup.objects.filter(weapon_id=weapon_id, variant_id=variant_id or 0, resolution=resolution)
+        return [
+            {"bucket_start": bucket_start, "quantity": quantity, "trades": trades}
+            for bucket_start, quantity, trades in MarketRollupService._range(buckets, start, end).values_list("bucket_start", "quantity", "trades")
+            if trades
+        ]
+
+    @staticmethod
+    def get_ratios(instrument, other, resolution, start=None, end=None):
+        """
+        Returns the volume-weighted, low and high price of instrument in units of other per bucket.
+        """
+        instrument, other = (instrument[0], instrument[1] or 0), (other[0], other[1] or 0)
+        inverted = other < instrument
+        base, quote = (other, instrument) if inverted else (instrument, other)
+
+        buckets = MarketPairRollup.objects.filter(
+            base_weapon_id=base[0], base_variant_id=base[1], quote_weapon_id=quote[0], quote_variant_id=quote[1], resolution=resolution,
+        )
+        series = []
+        for bucket_start, base_quantity, quote_quantity, trades, low, high in MarketRollupService._range(buckets, start, end).values_list(
+            "bucket_start", "base_quantity", "quote_quantity", "trades", "low_ratio", "high_ratio"
+        ):
+            if not trades:
+                continue
+            if inverted:
+                base_quantity, quote_quantity, low, high = quote_quantity, base_quantity, 1 / high, 1 / low
+            series.append({"bucket_start": bucket_start, "ratio": quote_quantity / base_quantity, "low": low, "high": high, "trades": trades})
+        return series
@@ -0,0 +1,192 @@
+import logging
+from collections import defaultdict, namedtuple
+from django.conf import settings
+from django.utils.timezone import now, timedelta
+from trading.models import TradeOffer, TradeItem
+from trading.services.trade_service import TradeService
+
+logger = logging.getLogger(__name__)
+
+# An open offer with exactly one offered and one requested line. gives and wants are
+# (weapon_id, variant_id, quantity) tuples; orders only match on exactly equal lines.
+Order = namedtuple("Order", ["trade_offer_id", "user_id", "gives", "wants"])
+
+
+class OrderBook:
+    """
+    In-memory index of open orders for the matching engine.
+
+    Orders are queued first come, first served per (gives, wants) pair, and every asset keeps
+    the set of assets it is currently exchanged for. Matching an incoming order is a bounded
+    search over that asset graph: a complementary order closes a pair, and longer rings
+    (A -> B -> C -> A) are tried up to max_cycle_length orders, shortest first.
+    """
+
+    def __init__(self, max_cycle_length=None):
+        self.max_cycle_length = max_cycle_length or settings.TRADE_MATCHING_MAX_CYCLE_LENGTH
+        self.orders = {}
+        self.queues = defaultdict(dict)
+        self.wants_by_gives = defaultdict(set)
+
+    def __len__(self):
+        return len(self.orders)
+
+    def add(self, order):
+        """
+        Matches the order against the book. Returns the matched ring, starting with the order and
+        removed from the book, where each order's wanted line is given by the next one; or None
+        after queueing the order.
+        """
+        ring = self.find_ring(order)
+        if ring:
+            for matched in ring[1:]:
+                self.remove(matched.trade_offer_id)
+            return ring
+
+        self.orders[order.trade_offer_id] = order
+        self.queues[(order.gives, order.wants)][order.trade_offer_id] = order
+        self.wants_by_gives[order.gives].add(order.wants)
+        return None
+
+    def remove(self, trade_offer_id):
+        order = self.orders.pop(trade_offer_id, None)
+        if not order:
+            return None
+
+        queue = self.queues[(order.gives, order.wants)]
+        del queue[trade_offer_id]
+        if not queue:
+            del self.queues[(order.gives, order.wants)]
+            self.wants_by_gives[order.gives].discard(order.wants)
+        return order
+
+    def find_ring(self, order):
+        for length in range(2, self.max_cycle_length + 1):
+            rest = self._search(order.wants, order.gives, length - 1, {order.user_id}, {order.wants})
+            if rest:
+                return [order] + rest
+        return None
+
+    def _search(self, asset, target, remaining, users, visited):
+        """
+        Depth-first search for `remaining` orders of distinct users chaining from an order giving
+        `asset` to one wanting `target`. Only the oldest eligible order of each queue is tried.
+        """
+        if remaining == 1:
+            order = self._oldest(asset, target, users)
+            return [order] if order else None
+
+        for wants in list(self.wants_by_gives.get(asset, ())):
+            if wants == target or wants in visited:
+                continue
+
+            order = self._oldest(asset, wants, users)
+            if not order:
+                continue
+
+            rest = self._search(wants, target, remaining - 1, users | {order.user_id}, visited | {wants})
+            if rest:
+                return [order] + rest
+
+        return None
+
+    def _oldest(self, gives, wants, users):
+        for order in self.queues.get((gives, wants), {}).values():
+            if order.user_id not in users:
+                return order
+        return None
+
+
+class MatchingEngine:
+    """
+    Matches open trade offers automatically and settles the matches through TradeService.
+
+    The order book lives in memory and is rebuilt from the database when the engine starts;
+    afterwards each poll() picks up open offers created since the last one seen. Meant to run
+    as a single process (manage.py match_offers); offers filled or cancelled elsewhere are
+    dropped from the book when a match involving them fails to settle.
+
+    An offer committing late can have a lower id than offers already polled, so the watermark
+    only moves past offers older than lag_seconds; newer ones are re-scanned on every poll and
+    submitted once, like the market rollups hold back their watermark.
+    """
+
+    def __init__(self, max_cycle_length=None, lag_seconds=None):
+        self.book = OrderBook(max_cycle_length)
+        self.lag_seconds = settings.TRADE_MATCHING_LAG_SECONDS if lag_seconds is None else lag_seconds
+        self.last_offer_id = 0
+        self.seen_ids = set()  # offers above the watermark already submitted
+
+    @staticmethod
+    def open_orders(after_id=0, chunk_size=5000):
+        """
+        Streams (trade_offer_id, created_at, order) for pending open offers with an id above
+        after_id, in id order. order is None for offers the engine cannot match (more than one
+        line per side).
+        """
+        items = (
+            TradeItem.objects.filter(offer_id__gt=after_id, offer__status=TradeOffer.PENDING, offer__receiver__isnull=True)
+            .order_by("offer_id", "-is_offered_by_sender", "id")
+            .values_list("offer_id", "offer__created_at", "offer__sender_id", "is_offered_by_sender", "weapon_id", "variant_id", "quantity")
+        )
+
+        current_id, current_created_at, lines = None, None, []
+        for offer_id, created_at, sender_id, is_offered_by_sender, weapon_id, variant_id, quantity in items.iterator(chunk_size=chunk_size):
+            if offer_id != current_id:
+                if lines:
+                    yield current_id, current_created_at, MatchingEngine._to_order(current_id, lines)
+                current_id, current_created_at, lines = offer_id, created_at, []
+            lines.append((sender_id, is_offered_by_sender, (weapon_id, variant_id, quantity)))
+
+        if lines:
+            yield current_id, current_created_at, MatchingEngine._to_order(current_id, lines)
+
+    @staticmethod
+    def _to_order(trade_offer_id, lines):
+        if len(lines) != 2 or not lines[0][1] or lines[1][1]:
+            return None
+        return Order(trade_offer_id, lines[0][0], lines[0][2], lines[1][2])
+
+    def poll(self):
+        """
+        Adds open offers created since the last poll to the book, matching and settling each on
+        arrival. Returns the settled rings as lists of trade offer ids.
+        """
+        cutoff = now() - timedelta(seconds=self.lag_seconds)
+        settled = []
+        advancing = True
+        for trade_offer_id, created_at, order in self.open_orders(self.last_offer_id):
+            # The watermark stops at the first offer young enough for lower ids to still commit.
+            advancing = advancing and created_at <= cutoff
+            if advancing:
+                self.last_offer_id = trade_offer_id
+
+            if trade_offer_id in self.seen_ids:
+                continue
+            self.seen_ids.add(trade_offer_id)
+            if order:
+                settled += self.submit(order)
+
+        self.seen_ids = {trade_offer_id for trade_offer_id in self.seen_ids if trade_offer_id > self.last_offer_id}
+        return settled
+
+    def submit(self, order):
+        ring = self.book.add(order)
+        if not ring:
+            return []
+
+        trade_offer_ids = [matched.trade_offer_id for matched in ring]
+        failed = TradeService.settle_match(trade_offer_ids)
+        if not failed:
+            return [trade_offer_ids]
+
+        # Offers that no longer validate leave the book; the rest go back in and may match again.
+        failed_ids = {trade_offer_id for trade_offer_id, _ in failed}
+        for trade_offer_id, error in failed:
+            logger.info(f"Dropped trade offer {trade_offer_id} from the order book: {error}")
+
+        settled = []
+        for matched in ring:
+            if matched.trade_offer_id not in failed_ids:
+                settled += self.submit(matched)
+        return settled
@@ -0,0 +1,213 @@
+import bisect
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+
+# Scopes (endpoint, service method) measuring the current request or call: a tuple of open scopes,
+# False inside a call that was not sampled, None outside any measured call.
+_scopes = ContextVar("trading_metrics_scopes", default=None)
+# Whether a measured serializer is already running, so nested serializers are not counted twice.
+_serializing = ContextVar("trading_metrics_serializing", default=False)
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Histogram:
+    """
+    A Prometheus histogram with one label, accumulated in process memory.
+    """
+
+    def __init__(self, name, documentation, label, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                series = self.series[label_value] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = sorted((label_value, list(counts), total) for label_value, (counts, total) in self.series.items())
+
+        for label_value, counts, total in series:
+            label = f'{self.label}="{_escape(label_value)}"'
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Scope:
+    __slots__ = ("queries", "db_seconds", "serialize_seconds", "started")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.started = time.perf_counter()
+
+
+class MeasuredSerializerMixin:
+    """
+    Serializer mixin adding the time spent in to_representation() (including the queries it
+    triggers) to the open scopes, for the serialize_seconds histogram of the endpoint.
+    """
+
+    def to_representation(self, instance):
+        scopes = _scopes.get()
+        if not scopes or _serializing.get():
+            return super().to_representation(instance)
+
+        token = _serializing.set(True)
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            _serializing.reset(token)
+            elapsed = time.perf_counter() - started
+            for scope in scopes:
+                scope.serialize_seconds += elapsed
+
+
+class Metrics:
+    """
+    Per-endpoint and per-service-method query counts, DB time and wall time, plus the time
+    endpoints spend in response serializers (MeasuredSerializerMixin) and in the renderer.
+
+    A request (or a service call made outside one, e.g. from a management command) is sampled
+    with probability METRICS_SAMPLE_RATE; calls nested in it follow its decision. Unsampled calls
+    cost a random() and a context variable lookup per query. Every connection counts its queries
+    into all open scopes, so the numbers of a service method are included in those of its endpoint.
+    Histograms live in the process: each worker process exposes its own at /metrics/.
+    """
+
+    ENDPOINT = {
+        "seconds": Histogram("trading_endpoint_duration_seconds", "Wall time of sampled requests.", "endpoint", SECONDS_BUCKETS),
+        "db_seconds": Histogram("trading_endpoint_db_seconds", "Time spent in database queries per sampled request.", "endpoint", SECONDS_BUCKETS),
+        "queries": Histogram("trading_endpoint_queries", "Database queries per sampled request.", "endpoint", QUERY_BUCKETS),
+        "serialize_seconds": Histogram(
+            "trading_endpoint_serialize_seconds", "Time spent in response serializers per sampled request.", "endpoint", SECONDS_BUCKETS,
+        ),
+        # Only the renderer (e.g. JSON encoding) of the serialized data.
+        "render_seconds": Histogram(
+            "trading_endpoint_render_seconds", "Time spent rendering the response body of sampled requests.", "endpoint", SECONDS_BUCKETS,
+        ),
+    }
+    SERVICE = {
+        "seconds": Histogram("trading_service_duration_seconds", "Wall time of sampled service calls.", "method", SECONDS_BUCKETS),
+        "db_seconds": Histogram("trading_service_db_seconds", "Time spent in database queries per sampled service call.", "method", SECONDS_BUCKETS),
+        "queries": Histogram("trading_service_queries", "Database queries per sampled service call.", "method", QUERY_BUCKETS),
+    }
+
+    @staticmethod
+    @contextmanager
+    def track(histograms, name):
+        """
+        Measures the enclosed block into the histograms (ENDPOINT or SERVICE) under the label name,
+        which may be a callable evaluated at the end (e.g. once the URL has been resolved).
+        Yields the scope, or None when the block is not sampled.
+        """
+        scopes = _scopes.get()
+        if scopes is None and not (settings.METRICS_ENABLED and random.random() < settings.METRICS_SAMPLE_RATE):
+            scopes = False
+        if scopes is False:
+            token = _scopes.set(False)
+            try:
+                yield None
+            finally:
+                _scopes.reset(token)
+            return
+
+        scope = _Scope()
+        token = _scopes.set((*scopes, scope) if scopes else (scope,))
+        try:
+            yield scope
+        finally:
+            _scopes.reset(token)
+            label = name() if callable(name) else name
+            histograms["seconds"].observe(label, time.perf_counter() - scope.started)
+            histograms["db_seconds"].observe(label, scope.db_seconds)
+            histograms["queries"].observe(label, scope.queries)
+            if "serialize_seconds" in histograms:
+                histograms["serialize_seconds"].observe(label, scope.serialize_seconds)
+
+    @staticmethod
+    def endpoint(request):
+        """
+        Returns the endpoint label of a request: its method and URL pattern, once resolved.
+        """
+        match = getattr(request, "resolver_match", None)
+        return f"{request.method} /{match.route}" if match else f"{request.method} unmatched"
+
+    @staticmethod
+    def record_query(execute, sql, params, many, context):
+        """
+        Database execute wrapper (installed on every connection) adding each query to the open scopes.
+        """
+        scopes = _scopes.get()
+        if not scopes:
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            for scope in scopes:
+                scope.queries += 1
+                scope.db_seconds += elapsed
+
+    @staticmethod
+    def instrument(cls):
+        """
+        Class decorator measuring every static method of a service as "<Class>.<method>".
+        """
+        for name, attribute in list(vars(cls).items()):
+            if isinstance(attribute, staticmethod) and not name.startswith("__"):
+                setattr(cls, name, staticmethod(Metrics._timed(f"{cls.__name__}.{name}", attribute.__func__)))
+        return cls
+
+    @staticmethod
+    def _timed(name, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Metrics.track(Metrics.SERVICE, name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    @staticmethod
+    def render():
+        """
+        Returns all histograms in the Prometheus text exposition format.
+        """
+        return "\n".join(histogram.render() for histogram in (*Metrics.ENDPOINT.values(), *Metrics.SERVICE.values())) + "\n"
+
+    @staticmethod
+    def reset():
+        for histogram in (*Metrics.ENDPOINT.values(), *Metrics.SERVICE.values()):
+            histogram.reset()
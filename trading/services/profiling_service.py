@@ -0,0 +1,143 @@
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from django.utils.timezone import now, timedelta
+from trading.models import RequestProfile
+
+
+class StackProfiler:
+    """
+    Deterministic profiler recording the self time of every call stack, for flame graphs.
+
+    It is driven by the same sys.setprofile() call/return events as cProfile, but keeps the whole
+    stack of each call instead of only caller/callee pairs, which is what collapsed-stack output
+    needs. Only the calling thread is profiled, and the overhead is large: use it per request.
+    """
+
+    def __init__(self):
+        self.stacks = Counter()  # (frame, ...) -> self time in nanoseconds
+        self.frames = []
+        self.entries = []  # [started_ns, children_ns] per open call
+        self.labels = {}
+        self.root = f"{settings.BASE_DIR}/"
+
+    def __enter__(self):
+        sys.setprofile(self._event)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.setprofile(None)
+
+    def _label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if "/site-packages/" in filename:
+                filename = filename.split("/site-packages/", 1)[1]
+            elif filename.startswith(self.root):
+                filename = filename[len(self.root):]
+            # Collapsed stacks separate frames with ";" and the weight with a space (e.g. "<frozen os>").
+            label = self.labels[code] = f"{filename}:{code.co_qualname}".replace(" ", "_").replace(";", "_")
+        return label
+
+    def _event(self, frame, event, arg):
+        timestamp = time.perf_counter_ns()
+        if event == "call":
+            self.frames.append(self._label(frame.f_code))
+            self.entries.append([timestamp, 0])
+        elif event == "c_call":
+            self.frames.append(f"{getattr(arg, '__module__', None) or 'builtins'}.{getattr(arg, '__qualname__', arg.__name__)}")
+            self.entries.append([timestamp, 0])
+        elif self.entries:
+            # return, c_return or c_exception; returns of frames entered before profiling have no entry.
+            started, children = self.entries.pop()
+            elapsed = timestamp - started
+            self.stacks[tuple(self.frames)] += elapsed - children
+            self.frames.pop()
+            if self.entries:
+                self.entries[-1][1] += elapsed
+
+    def collapsed(self):
+        """
+        Returns the stacks in collapsed format, one "frame;frame;frame microseconds" line each.
+        """
+        return "\n".join(
+            f"{';'.join(stack)} {nanoseconds // 1000}" for stack, nanoseconds in sorted(self.stacks.items()) if nanoseconds >= 1000
+        )
+
+
+class ProfilingService:
+    HEADER = "X-Profile"
+
+    @staticmethod
+    def reason(request, is_admin):
+        """
+        Returns why the request should be profiled (RequestProfile.HEADER or SAMPLED), or None.
+        is_admin is only called when the profiling header is present.
+        """
+        if request.headers.get(ProfilingService.HEADER) == "1" and is_admin():
+            return RequestProfile.HEADER
+        if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return RequestProfile.SAMPLED
+        return None
+
+    @staticmethod
+    def profile(endpoint, reason, call):
+        """
+        Runs call() (a view dispatch) under the profiler, stores the profile tagged with the
+        endpoint, status code, query count and wall time, and returns the response.
+        """
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count))
+            with StackProfiler() as profiler:
+                response = call()
+
+        RequestProfile.objects.create(
+            endpoint=endpoint, reason=reason, status_code=response.status_code, queries=queries,
+            duration_ms=(time.perf_counter() - started) * 1000, stacks=profiler.collapsed(),
+        )
+        return response
+
+    @staticmethod
+    def aggregate(profiles):
+        """
+        Sums the collapsed stacks of the profiles into one Counter of stack -> microseconds.
+        """
+        stacks = Counter()
+        for collapsed in profiles.values_list("stacks", flat=True).iterator():
+            for line in collapsed.splitlines():
+                stack, _, microseconds = line.rpartition(" ")
+                stacks[stack] += int(microseconds)
+        return stacks
+
+    @staticmethod
+    def top_frames(stacks, limit):
+        """
+        Returns the [(frame, microseconds)] with the most self time across the stacks.
+        """
+        frames = Counter()
+        for stack, microseconds in stacks.items():
+            frames[stack.rpartition(";")[2]] += microseconds
+        return frames.most_common(limit)
+
+    @staticmethod
+    def prune(days=None):
+        """
+        Deletes profiles older than the retention and returns how many were deleted.
+        """
+        days = settings.PROFILING_RETENTION_DAYS if days is None else days
+        deleted, _ = RequestProfile.objects.filter(created_at__lt=now() - timedelta(days=days)).delete()
+        return deleted
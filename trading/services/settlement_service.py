@@ -0,0 +1,162 @@
+import logging
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+from trading.models import TradeOffer, SettlementJob
+from trading.exceptions import TradeValidationError
+from trading.routers import ReplicaRouter
+from trading.services.concurrency import retry_on_conflict
+from trading.services.stats_service import TradeStatsService
+from trading.services.trade_service import TradeService
+
+logger = logging.getLogger(__name__)
+
+class SettlementService:
+    """
+    Drains the SettlementJob queue filled by process_trade_offer in async settlement mode.
+
+    Each batch is split into groups of offers sharing no user. Groups lock disjoint inventory
+    rows and are settled in parallel threads; the offers within a group run one after another
+    in queue order, so conflicting offers settle serially and first come, first served.
+    """
+
+    SETTLED = "settled"
+    FAILED = "failed"
+    REQUEUED = "requeued"
+
+    @staticmethod
+    @retry_on_conflict
+    def claim_batch(batch_size):
+        """
+        Claims up to batch_size queued jobs, plus RUNNING jobs whose worker died, and marks them
+        RUNNING. SKIP LOCKED lets several worker processes claim batches side by side.
+        """
+        stale = timezone.now() - timedelta(seconds=settings.TRADE_SETTLEMENT_STALE_SECONDS)
+        jobs = list(
+            SettlementJob.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(Q(status=SettlementJob.QUEUED) | Q(status=SettlementJob.RUNNING, started_at__lt=stale))
+            .select_related("trade_offer")
+            .order_by("id")[:batch_size]
+        )
+
+        now = timezone.now()
+        SettlementJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=SettlementJob.RUNNING, attempts=F("attempts") + 1, started_at=now
+        )
+        for job in jobs:
+            job.status, job.attempts, job.started_at = SettlementJob.RUNNING, job.attempts + 1, now
+
+        return jobs
+
+    @staticmethod
+    def group_by_users(jobs):
+        """
+        Partitions jobs into groups with no user in common (union-find over sender and receiver),
+        keeping the queue order within each group.
+        """
+        parent = {}
+
+        def find(user_id):
+            parent.setdefault(user_id, user_id)
+            while parent[user_id] != user_id:
+                parent[user_id] = parent[parent[user_id]]
+                user_id = parent[user_id]
+            return user_id
+
+        for job in jobs:
+            parent[find(job.trade_offer.sender_id)] = find(job.trade_offer.receiver_id)
+
+        groups = defaultdict(list)
+        for job in jobs:
+            groups[find(job.trade_offer.sender_id)].append(job)
+        return list(groups.values())
+
+    @staticmethod
+    def run_batch(batch_size=None, workers=None):
+        """
+        Claims and settles one batch. Returns a Counter of settled, failed and requeued jobs.
+        """
+        batch_size = batch_size or settings.TRADE_SETTLEMENT_BATCH_SIZE
+        workers = workers or settings.TRADE_SETTLEMENT_WORKERS
+
+        groups = SettlementService.group_by_users(SettlementService.claim_batch(batch_size))
+
+        outcomes = Counter()
+        if workers <= 1 or len(groups) <= 1:
+            for group in groups:
+                outcomes.update(SettlementService.settle_group(group))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for group_outcomes in pool.map(SettlementService._settle_group_in_thread, groups):
+                    outcomes.update(group_outcomes)
+
+        return outcomes
+
+    @staticmethod
+    def settle_group(jobs):
+        return [SettlementService.settle(job) for job in jobs]
+
+    @staticmethod
+    def _settle_group_in_thread(jobs):
+        try:
+            return SettlementService.settle_group(jobs)
+        finally:
+            connections.close_all()
+
+    @staticmethod
+    def settle(job):
+        """
+        Settles one claimed job. Offers that no longer validate are returned to PENDING with the
+        error on the job, and open offers filled by the accept lose their receiver again;
+        unexpected failures are retried up to TRADE_SETTLEMENT_MAX_ATTEMPTS.
+        """
+        try:
+            SettlementService._execute(job)
+            return SettlementService.SETTLED
+        except TradeValidationError as e:
+            SettlementService._fail(job, str(e), retry=False)
+            return SettlementService.FAILED
+        except Exception as e:
+            logger.exception(f"Settlement of trade offer {job.trade_offer_id} failed on attempt {job.attempts}")
+            retry = job.attempts < settings.TRADE_SETTLEMENT_MAX_ATTEMPTS
+            SettlementService._fail(job, str(e), retry=retry)
+            return SettlementService.REQUEUED if retry else SettlementService.FAILED
+
+    @staticmethod
+    @retry_on_conflict
+    def _execute(job):
+        trade_offer = TradeOffer.objects.select_for_update().filter(id=job.trade_offer_id, status=TradeOffer.SETTLING).first()
+
+        # A stale job re-claimed after its worker died may already have been settled.
+        if trade_offer:
+            TradeService._execute_trade(trade_offer)
+            trade_offer.accept()
+            TradeStatsService.record_status([trade_offer], TradeOffer.ACCEPTED)
+            ReplicaRouter.pin_on_commit([trade_offer.sender_id, trade_offer.receiver_id])
+
+        SettlementJob.objects.filter(id=job.id).update(status=SettlementJob.DONE, error="", finished_at=timezone.now())
+
+    @staticmethod
+    @retry_on_conflict
+    def _fail(job, error, retry):
+        if retry:
+            SettlementJob.objects.filter(id=job.id).update(status=SettlementJob.QUEUED, error=error)
+            return
+
+        SettlementJob.objects.filter(id=job.id).update(status=SettlementJob.FAILED, error=error, finished_at=timezone.now())
+        trade_offer = TradeOffer.objects.select_for_update().filter(id=job.trade_offer_id, status=TradeOffer.SETTLING).first()
+        if not trade_offer:
+            return
+
+        # An open offer filled by this accept goes back on the market instead of staying bound
+        # to the user who tried to fill it.
+        if job.filled_open:
+            TradeStatsService.record_unfilled([trade_offer])
+            ReplicaRouter.pin_on_commit([trade_offer.receiver_id])
+            trade_offer.receiver = None
+        trade_offer.status = TradeOffer.PENDING
+        trade_offer.save(update_fields=["status", "receiver"])
@@ -0,0 +1,151 @@
+from collections import Counter, defaultdict
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from trading.models import TradeOffer, ArchivedTradeOffer, Ledger, UserTradeStats, UserWeaponVolume, Weapon
+
+class TradeStatsService:
+    """
+    Maintains the UserTradeStats and UserWeaponVolume summary tables.
+
+    Trade code records every change inside the transaction that makes it. Deltas are summed per
+    row and written as `counter = counter + delta` in a single UPDATE, so reading a user's
+    statistics never needs an aggregate over TradeOffer, TradeItem or Ledger.
+    """
+
+    STATUS_COUNTERS = {
+        TradeOffer.ACCEPTED: "accepted_count",
+        TradeOffer.REJECTED: "rejected_count",
+        TradeOffer.REVERSED: "reversed_count",
+    }
+
+    @staticmethod
+    def record_created(trade_offers):
+        deltas = defaultdict(Counter)
+        for trade_offer in trade_offers:
+            deltas[(trade_offer.sender_id,)]["sent_count"] += 1
+            if trade_offer.receiver_id is not None:
+                deltas[(trade_offer.receiver_id,)]["received_count"] += 1
+        TradeStatsService._apply(UserTradeStats, deltas)
+
+    @staticmethod
+    def record_filled(trade_offers):
+        """
+        Counts open offers that just got a receiver as received by that receiver.
+        """
+        TradeStatsService._apply(UserTradeStats, {(trade_offer.receiver_id,): Counter(received_count=1) for trade_offer in trade_offers})
+
+    @staticmethod
+    def record_unfilled(trade_offers):
+        """
+        Takes back record_filled() for open offers whose fill failed to settle, before their
+        receiver is cleared again.
+        """
+        TradeStatsService._apply(UserTradeStats, {(trade_offer.receiver_id,): Counter(received_count=-1) for trade_offer in trade_offers})
+
+    @staticmethod
+    def record_status(trade_offers, status):
+        """
+        Counts offers that moved to ACCEPTED, REJECTED or REVERSED for both parties (only the
+        sender of a cancelled open offer). A reversed offer no longer counts as accepted.
+        """
+        deltas = defaultdict(Counter)
+        for trade_offer in trade_offers:
+            for user_id in {trade_offer.sender_id, trade_offer.receiver_id} - {None}:
+                deltas[(user_id,)][TradeStatsService.STATUS_COUNTERS[status]] += 1
+                if status == TradeOffer.REVERSED:
+                    deltas[(user_id,)]["accepted_count"] -= 1
+        TradeStatsService._apply(UserTradeStats, deltas)
+
+    @staticmethod
+    def record_movements(movements):
+        """
+        Adds the ledger movements of trades to the weapon volumes of giver and taker, and takes
+        compensating movements of reversals off again. Expects movements with weapon loaded.
+        """
+        deltas = defaultdict(Counter)
+        for movement in movements:
+            if movement.trade_offer_id is None:
+                continue
+
+            sign = -1 if movement.reversal_of_id else 1
+            giver_id, taker_id = (movement.sender_id, movement.receiver_id) if sign > 0 else (movement.receiver_id, movement.sender_id)
+            deltas[(giver_id, movement.weapon.type)]["sent_quantity"] += sign * movement.quantity
+            deltas[(taker_id, movement.weapon.type)]["received_quantity"] += sign * movement.quantity
+        TradeStatsService._apply(UserWeaponVolume, deltas)
+
+    @staticmethod
+    def _apply(model, deltas):
+        """
+        Applies {(user_id, *other key fields): Counter(field=delta)} to the summary table with one
+        INSERT of missing rows and one UPDATE, however many rows change.
+
+        Where the database has row locks, the rows are first locked in (user_id, ...) order, so
+        concurrent trades between the same users (A -> B and B -> A) queue up instead of
+        deadlocking. Stats rows come last in the lock order (see trading.services.concurrency).
+        """
+        key_fields = ["user_id"] + (["weapon_type"] if model is UserWeaponVolume else [])
+        deltas = {key: {field: delta for field, delta in counter.items() if delta} for key, counter in deltas.items()}
+        deltas = {key: changes for key, changes in sorted(deltas.items()) if changes}
+        if not deltas:
+            return
+
+        model.objects.bulk_create([model(**dict(zip(key_fields, key))) for key in deltas], ignore_conflicts=True)
+
+        rows = {f"{field}__in": {key[index] for key in deltas} for index, field in enumerate(key_fields)}
+        if connection.features.has_select_for_update:
+            list(model.objects.select_for_update().filter(**rows).order_by(*key_fields).values_list("pk", flat=True))
+
+        fields = sorted({field for changes in deltas.values() for field in changes})
+        model.objects.filter(**rows).update(**{
+            field: F(field) + Case(
+                *[When(**dict(zip(key_fields, key)), then=Value(changes[field])) for key, changes in deltas.items() if field in changes],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            for field in fields
+        })
+
+    @staticmethod
+    def get_stats(user_id):
+        """
+        Reads a user's statistics with two primary key / index lookups.
+        """
+        stats = UserTradeStats.objects.filter(user_id=user_id).first() or UserTradeStats(user_id=user_id)
+        weapon_types = dict(Weapon.WEAPON_TYPES)
+        return {
+            "user_id": int(user_id),
+            **{field: getattr(stats, field) for field in ("sent_count", "received_count", "accepted_count", "rejected_count", "reversed_count")},
+            "volume": [
+                {"weapon_type": weapon_types.get(weapon_type), "sent_quantity": sent, "received_quantity": received}
+                for weapon_type, sent, received in UserWeaponVolume.objects.filter(user_id=user_id).order_by("weapon_type").values_list("weapon_type", "sent_quantity", "received_quantity")
+            ],
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(user_ids):
+        """
+        Recomputes the statistics of the users from TradeOffer, ArchivedTradeOffer and the Ledger
+        with GROUP BY aggregates, replacing their current rows.
+        """
+        counters = defaultdict(Counter)
+        for model in (TradeOffer, ArchivedTradeOffer):
+            for role, counter in (("sender_id", "sent_count"), ("receiver_id", "received_count")):
+                offers = model.objects.filter(**{f"{role}__in": user_ids}).order_by()
+                for user_id, count in offers.values_list(role).annotate(count=Count("id")):
+                    counters[user_id][counter] += count
+                for user_id, status, count in offers.filter(status__in=TradeStatsService.STATUS_COUNTERS).values_list(role, "status").annotate(count=Count("id")):
+                    counters[user_id][TradeStatsService.STATUS_COUNTERS[status]] += count
+
+        volumes = defaultdict(Counter)
+        movements = Ledger.objects.filter(trade_offer__isnull=False, reversed=False, reversal_of__isnull=True).order_by()
+        for role, field in (("sender_id", "sent_quantity"), ("receiver_id", "received_quantity")):
+            for user_id, weapon_type, quantity in movements.filter(**{f"{role}__in": user_ids}).values_list(role, "weapon__type").annotate(quantity=Sum("quantity")):
+                volumes[(user_id, weapon_type)][field] += quantity
+
+        UserTradeStats.objects.filter(user_id__in=user_ids).delete()
+        UserWeaponVolume.objects.filter(user_id__in=user_ids).delete()
+        UserTradeStats.objects.bulk_create(UserTradeStats(user_id=user_id, **counts) for user_id, counts in counters.items())
+        UserWeaponVolume.objects.bulk_create(
+            UserWeaponVolume(user_id=user_id, weapon_type=weapon_type, **quantities) for (user_id, weapon_type), quantities in volumes.items()
+        )
@@ -1,147 +1,480 @@
 import logging
+from collections import defaultdict
+from django.conf import settings
 from django.db import transaction
-from trading.models import TradeOffer, TradeItem, Inventory, Weapon, WeaponVariant, User
+from django.db.models import Q
+from trading.models import TradeOffer, TradeItem, User, Ledger, SettlementJob
 from trading.exceptions import TradeValidationError
+from trading.repositories.inventory_repository import InventoryRepository
+from trading.routers import ReplicaRouter
+from trading.repositories.weapon_repository import WeaponRepository
+from trading.services.concurrency import retry_on_conflict
+from trading.services.execution_engine import TradeExecutionEngine
+from trading.services.metrics import Metrics
+from trading.services.stats_service import TradeStatsService
 
 logger = logging.getLogger(__name__)
 
+@Metrics.instrument
 class TradeService:
     @staticmethod
-    def validate_trade_before_creation(sender_id, offered_items):
+    def prefetch_trade_references(sender_ids, item_lists):
         """
-        Ensures that the sender owns the weapons being offered BEFORE creating the trade.
-        Expects offered_items as a list of dictionaries (from API request).
+        Loads every weapon, variant and sender inventory row referenced by the given item lists
+        in a fixed number of queries, so any number of items (or offers) can be validated without
+        further lookups. Returns a (weapons, variants, inventory) tuple of dictionaries.
         """
-        sender = User.objects.get(id=sender_id)
+        weapon_ids = {item["weapon_id"] for items in item_lists for item in items}
+        variant_ids = {item["variant_id"] for items in item_lists for item in items if item.get("variant_id")}
 
-        if not offered_items:
-            raise TradeValidationError("At least one item must be offered.")
+        weapons = WeaponRepository.get_weapons_by_ids(weapon_ids)
+        variants = WeaponRepository.get_variants_by_ids(variant_ids) if variant_ids else {}
+        inventory = InventoryRepository.get_quantities(sender_ids, weapon_ids)
+        return weapons, variants, inventory
 
-        for item in offered_items:
+    @staticmethod
+    def resolve_trade_items(items, weapons, variants):
+        """
+        Maps request items to (weapon, variant, quantity) tuples using prefetched weapons and variants.
+        """
+        resolved = []
+
+        for item in items:
+            weapon = weapons.get(item["weapon_id"])
+            variant = variants.get(item["variant_id"]) if item.get("variant_id") else None
 
-            weapon = Weapon.objects.filter(id=item["weapon_id"]).first()
-            variant = WeaponVariant.objects.filter(id=item["variant_id"]).first() if item.get("variant_id") else None
-            
             if not weapon:
                 raise TradeValidationError(f"Weapon with ID {item['weapon_id']} does not exist.")
 
-            if variant and variant.weapon != weapon:
+            if item.get("variant_id") and not variant:
+                raise TradeValidationError(f"Variant with ID {item['variant_id']} does not exist.")
+
+            if variant and variant.weapon_id != weapon.id:
                 raise TradeValidationError(f"Variant {variant.variant_name} does not belong to Weapon {weapon}.")
 
-            inventory = Inventory.objects.filter(user=sender, weapon=weapon, variant=variant).first()
-            
-            if not inventory or inventory.quantity < item["quantity"]:
-                raise TradeValidationError(f"User {sender.username} does not have enough {weapon.get_type_display()} {variant.variant_name if variant else 'No Variant'}.")
+            resolved.append((weapon, variant, item["quantity"]))
+
+        return resolved
 
     @staticmethod
-    def validate_trade_during_execution(user_id, trade_items):
+    def validate_trade_before_creation(sender, offered_items, requested_items=(), prefetched=None):
         """
-        Ensures that the user has enough inventory to fulfill the trade when the trade is executed.
-        Expects trade_items as a QuerySet of TradeItem objects.
+        Ensures that the sender owns the weapons being offered BEFORE creating the trade.
+        Expects offered_items and requested_items as lists of dictionaries (from API request),
+        and optionally the result of prefetch_trade_references() when validating many offers.
+        Returns the resolved (weapon, variant, quantity) tuples for both lists.
         """
-        user = User.objects.get(id=user_id)
+        if not offered_items:
+            raise TradeValidationError("At least one item must be offered.")
 
-        inventory_items = Inventory.objects.filter(user=user).select_related("weapon", "variant")
-        
-        inventory_dict = {
-            (inv.weapon.id, inv.variant.id if inv.variant else None): inv.quantity
-            for inv in inventory_items
-        }
+        weapons, variants, inventory = prefetched or TradeService.prefetch_trade_references([sender.id], [offered_items, requested_items])
+
+        offered = TradeService.resolve_trade_items(offered_items, weapons, variants)
+        requested = TradeService.resolve_trade_items(requested_items, weapons, variants)
 
-        for item in trade_items:
-            key = (item.weapon.id, item.variant.id if item.variant else None)
-            available_quantity = inventory_dict.get(key, 0)
+        needed = defaultdict(int)
+        for weapon, variant, quantity in offered:
+            key = (sender.id, weapon.id, variant.id if variant else None)
+            needed[key] += quantity
 
-            if available_quantity < item.quantity:
-                raise TradeValidationError(f"User {user.username} does not have enough {item.weapon.get_type_display()} {item.variant.variant_name if item.variant else 'No Variant'}.")
+            if inventory.get(key, 0) < needed[key]:
+                raise TradeValidationError(f"User {sender.username} does not have enough {weapon.get_type_display()} {variant.variant_name if variant else 'No Variant'}.")
 
+        return offered, requested
 
     @staticmethod
     def create_trade_offer(sender_id, receiver_id, offered_items, requested_items):
+        """
+        Creates a trade offer. Without a receiver_id the offer is open: any user may fill it and
+        the matching engine may match it with complementary open offers.
+        """
         sender = User.objects.get(id=sender_id)
-        receiver = User.objects.get(id=receiver_id)
+        receiver = User.objects.get(id=receiver_id) if receiver_id is not None else None
+
+        offered, requested = TradeService.validate_trade_before_creation(sender, offered_items, requested_items)
+        trade_offer = TradeService._create(sender, receiver, offered, requested)
+        logger.info(f"Trade offer created with ID {trade_offer.id}")
+        return trade_offer
+
+    @staticmethod
+    @retry_on_conflict
+    def _create(sender, receiver, offered, requested):
+        # Updating the stats rows of both users can conflict with a concurrent offer between them.
+        trade_offer = TradeOffer.objects.create(sender=sender, receiver=receiver)
+        TradeItem.objects.bulk_create(TradeService.build_trade_items(trade_offer, offered, requested))
+        TradeStatsService.record_created([trade_offer])
+        ReplicaRouter.pin_on_commit([trade_offer.sender_id, trade_offer.receiver_id])
+        return trade_offer
+
+    @staticmethod
+    def create_trade_offers(offers):
+        """
+        Creates many trade offers at once. Every offer is validated against a single prefetch of
+        the users, senders' inventories and referenced weapons/variants, then all valid offers and
+        their items are written with two bulk INSERTs in one transaction.
+        Returns one result per offer, in input order, holding either its trade_offer_id or an error.
+        """
+        users = User.objects.in_bulk({offer[key] for offer in offers for key in ("sender_id", "receiver_id") if offer.get(key) is not None})
+        prefetched = TradeService.prefetch_trade_references(
+            {offer["sender_id"] for offer in offers},
+            [items for offer in offers for items in (offer.get("offered_items", []), offer.get("requested_items", []))],
+        )
 
-        TradeService.validate_trade_before_creation(sender_id, offered_items)
+        results = []
+        valid = []
+        for index, offer in enumerate(offers):
+            sender = users.get(offer["sender_id"])
+            receiver = users.get(offer.get("receiver_id"))
 
-        with transaction.atomic():
-            trade_offer = TradeOffer.objects.create(sender=sender, receiver=receiver)
-            logger.info(f"Trade offer created with ID {trade_offer.id}")
+            try:
+                if not sender:
+                    raise TradeValidationError(f"User with ID {offer['sender_id']} does not exist.")
+                if offer.get("receiver_id") is not None and not receiver:
+                    raise TradeValidationError(f"User with ID {offer['receiver_id']} does not exist.")
 
-            # assuming less trade items are created
-            trade_items = []
+                offered, requested = TradeService.validate_trade_before_creation(
+                    sender, offer.get("offered_items", []), offer.get("requested_items", []), prefetched
+                )
+            except TradeValidationError as e:
+                results.append({"index": index, "error": str(e)})
+                continue
 
-            for item in offered_items:
-                weapon = Weapon.objects.get(id=item["weapon_id"])
-                variant = WeaponVariant.objects.get(id=item["variant_id"]) if item.get("variant_id") else None
-                trade_items.append(TradeItem(
-                    offer=trade_offer, weapon=weapon, variant=variant, quantity=item["quantity"], is_offered_by_sender=True
-                ))
+            results.append({"index": index})
+            valid.append((results[-1], TradeOffer(sender=sender, receiver=receiver), offered, requested))
 
-            for item in requested_items:
-                weapon = Weapon.objects.get(id=item["weapon_id"])
-                variant = WeaponVariant.objects.get(id=item["variant_id"]) if item.get("variant_id") else None
-                trade_items.append(TradeItem(
-                    offer=trade_offer, weapon=weapon, variant=variant, quantity=item["quantity"], is_offered_by_sender=False
-                ))
+        TradeService._bulk_create(valid)
 
-            TradeItem.objects.bulk_create(trade_items)
+        for result, trade_offer, _, _ in valid:
+            result["trade_offer_id"] = trade_offer.id
 
-        return trade_offer
+        logger.info(f"Bulk created {len(valid)} of {len(offers)} trade offers")
+        return results
+
+    @staticmethod
+    @retry_on_conflict
+    def _bulk_create(valid):
+        # A retry inserts the same unsaved offers again, so clear the ids of a failed attempt.
+        trade_offers = [trade_offer for _, trade_offer, _, _ in valid]
+        for trade_offer in trade_offers:
+            trade_offer.pk = None
+        TradeOffer.objects.bulk_create(trade_offers)
+        TradeItem.objects.bulk_create([
+            trade_item
+            for _, trade_offer, offered, requested in valid
+            for trade_item in TradeService.build_trade_items(trade_offer, offered, requested)
+        ])
+        TradeStatsService.record_created(trade_offers)
+        ReplicaRouter.pin_on_commit(TradeService._participants(trade_offers))
+
+    @staticmethod
+    def build_trade_items(trade_offer, offered, requested):
+        """
+        Builds unsaved TradeItem rows from resolved (weapon, variant, quantity) tuples.
+        """
+        return [
+            TradeItem(offer=trade_offer, weapon=weapon, variant=variant, quantity=quantity, is_offered_by_sender=is_offered_by_sender)
+            for is_offered_by_sender, resolved in ((True, offered), (False, requested))
+            for weapon, variant, quantity in resolved
+        ]
     
     @staticmethod
+    @retry_on_conflict
     def process_trade_offer(trade_offer_id, receiver_id, action):
         """
         Accept or reject a trade offer.
+        The offer row is locked first and the inventory rows after it, always in primary key
+        order, so concurrent accepts touching the same users cannot deadlock each other.
+        With TRADE_ASYNC_SETTLEMENT an accepted offer is only queued and left SETTLING for the
+        settle_trades worker. The sender of an open offer may reject it to cancel it.
         """
-        trade_offer = TradeOffer.objects.filter(id=trade_offer_id, status=TradeOffer.PENDING).first()
+        trade_offer = TradeOffer.objects.select_for_update().filter(id=trade_offer_id, status=TradeOffer.PENDING).first()
 
         if not trade_offer:
             raise TradeValidationError(f"Trade offer {trade_offer_id} does not exist or is already processed.")
 
-        if trade_offer.receiver.id != receiver_id:
+        filling = TradeService._filling(trade_offer, receiver_id, action)
+        if filling:
+            trade_offer.receiver_id = receiver_id
+
+        if trade_offer.receiver_id != receiver_id and not TradeService._cancelling(trade_offer, receiver_id, action):
             raise TradeValidationError("Only the receiver can accept or reject this trade.")
 
-        if action.upper() == "ACCEPT":
+        if filling:
+            TradeStatsService.record_filled([trade_offer])
+        ReplicaRouter.pin_on_commit(TradeService._participants([trade_offer]))
+
+        if action.upper() == "ACCEPT" and settings.TRADE_ASYNC_SETTLEMENT:
+            SettlementJob.enqueue(trade_offer, filled_open=filling)
+
+        elif action.upper() == "ACCEPT":
             TradeService._execute_trade(trade_offer)
             trade_offer.accept()
+            TradeStatsService.record_status([trade_offer], TradeOffer.ACCEPTED)
 
         elif action.upper() == "REJECT":
             trade_offer.reject()
+            TradeStatsService.record_status([trade_offer], TradeOffer.REJECTED)
 
         return trade_offer
 
+    @staticmethod
+    @retry_on_conflict
+    def process_trade_offers(receiver_id, actions=(), reject_pending_from=None):
+        """
+        Accepts or rejects many of a receiver's offers in one transaction.
+        `actions` is a list of {"trade_offer_id", "action"} dictionaries; `reject_pending_from`
+        additionally rejects every pending offer the receiver got from that sender. Accepting an
+        open offer fills it with the receiver, as in process_trade_offer().
+
+        All affected offers and inventory rows are locked up front in primary key order, accepts
+        are applied oldest offer first against the locked balances, and the status changes are
+        written with one UPDATE for the accepted and one for the rejected offers.
+        With TRADE_ASYNC_SETTLEMENT accepted offers are queued for the settle_trades worker instead,
+        as in process_trade_offer().
+        Returns one {"trade_offer_id", "status"} or {"trade_offer_id", "error"} result per offer.
+        """
+        requested = {action["trade_offer_id"]: action["action"].upper() for action in actions}
+
+        offer_filter = Q(id__in=list(requested))
+        if reject_pending_from is not None:
+            offer_filter |= Q(sender_id=reject_pending_from, receiver_id=receiver_id, status=TradeOffer.PENDING)
+        offers = {offer.id: offer for offer in TradeOffer.objects.select_for_update().filter(offer_filter).order_by("id")}
+
+        for offer in offers.values():
+            requested.setdefault(offer.id, "REJECT")
+
+        outcomes = {}
+        accept_ids = []
+        reject_ids = []
+        filled_ids = set()
+        for trade_offer_id, action in sorted(requested.items()):
+            offer = offers.get(trade_offer_id)
+
+            if not offer or offer.status != TradeOffer.PENDING:
+                outcomes[trade_offer_id] = {"error": f"Trade offer {trade_offer_id} does not exist or is already processed."}
+            elif TradeService._filling(offer, receiver_id, action):
+                offer.receiver_id = receiver_id
+                filled_ids.add(trade_offer_id)
+                accept_ids.append(trade_offer_id)
+            elif offer.receiver_id != receiver_id and not TradeService._cancelling(offer, receiver_id, action):
+                outcomes[trade_offer_id] = {"error": "Only the receiver can accept or reject this trade."}
+            elif action == "ACCEPT":
+                accept_ids.append(trade_offer_id)
+            else:
+                reject_ids.append(trade_offer_id)
+
+        accepted_ids = []
+        queued_ids = []
+        if settings.TRADE_ASYNC_SETTLEMENT:
+            for trade_offer_id in accept_ids:
+                SettlementJob.enqueue(offers[trade_offer_id], filled_open=trade_offer_id in filled_ids)
+                queued_ids.append(trade_offer_id)
+        else:
+            accepted_ids = TradeService._settle_accepts([offers[trade_offer_id] for trade_offer_id in accept_ids], outcomes)
+            # Open offers that failed to settle stay open.
+            for trade_offer_id in filled_ids.difference(accepted_ids):
+                offers[trade_offer_id].receiver_id = None
+            TradeOffer.objects.bulk_update([offers[trade_offer_id] for trade_offer_id in filled_ids.intersection(accepted_ids)], ["receiver"])
+
+        TradeStatsService.record_filled([offers[trade_offer_id] for trade_offer_id in accepted_ids + queued_ids if trade_offer_id in filled_ids])
+        TradeOffer.objects.filter(id__in=accepted_ids).update(status=TradeOffer.ACCEPTED)
+        TradeOffer.objects.filter(id__in=reject_ids).update(status=TradeOffer.REJECTED)
+        TradeStatsService.record_status([offers[trade_offer_id] for trade_offer_id in accepted_ids], TradeOffer.ACCEPTED)
+        TradeStatsService.record_status([offers[trade_offer_id] for trade_offer_id in reject_ids], TradeOffer.REJECTED)
+        ReplicaRouter.pin_on_commit(TradeService._participants(offers[trade_offer_id] for trade_offer_id in accepted_ids + queued_ids + reject_ids))
+
+        status_display = dict(TradeOffer.STATUS_CHOICES)
+        for trade_offer_id in accepted_ids:
+            outcomes[trade_offer_id] = {"status": status_display[TradeOffer.ACCEPTED]}
+        for trade_offer_id in queued_ids:
+            outcomes[trade_offer_id] = {"status": status_display[TradeOffer.SETTLING]}
+        for trade_offer_id in reject_ids:
+            outcomes[trade_offer_id] = {"status": status_display[TradeOffer.REJECTED]}
+
+        return [{"trade_offer_id": trade_offer_id, **outcome} for trade_offer_id, outcome in sorted(outcomes.items())]
+
+    @staticmethod
+    def _settle_accepts(trade_offers, outcomes):
+        """
+        Applies the accepted offers oldest first against the locked balances and records the
+        error of each offer that no longer validates in outcomes. Returns the ids applied.
+        """
+        items_by_offer = defaultdict(list)
+        for item in TradeItem.objects.filter(offer_id__in=[trade_offer.id for trade_offer in trade_offers]).select_related("weapon", "variant"):
+            items_by_offer[item.offer_id].append(item)
+
+        engine = TradeExecutionEngine(
+            TradeService._participants(trade_offers),
+            {item.weapon_id for items in items_by_offer.values() for item in items},
+        )
+
+        accepted_ids = []
+        for trade_offer in trade_offers:
+            try:
+                engine.stage(trade_offer, items_by_offer[trade_offer.id])
+                accepted_ids.append(trade_offer.id)
+            except TradeValidationError as e:
+                outcomes[trade_offer.id] = {"error": str(e)}
+
+        engine.flush()
+        return accepted_ids
+
+    @staticmethod
+    @retry_on_conflict
+    def settle_match(trade_offer_ids):
+        """
+        Fills a ring of open offers matched by the matching engine, all together or not at all.
+        The offers are given in ring order: each one's requested item is offered by the next, so
+        each offer gives its offered item to the sender of the previous one and is filled with
+        that sender as receiver. A pair is a ring of two.
+        Returns the (trade_offer_id, error) of offers that no longer validate; empty if settled.
+        """
+        offers = {
+            offer.id: offer
+            for offer in TradeOffer.objects.select_for_update().filter(id__in=trade_offer_ids, status=TradeOffer.PENDING, receiver__isnull=True).order_by("id")
+        }
+        missing = [(trade_offer_id, f"Trade offer {trade_offer_id} does not exist or is already processed.") for trade_offer_id in trade_offer_ids if trade_offer_id not in offers]
+        if missing:
+            return missing
+
+        offered_items = defaultdict(list)
+        for item in TradeItem.objects.filter(offer_id__in=trade_offer_ids, is_offered_by_sender=True).select_related("weapon", "variant"):
+            offered_items[item.offer_id].append(item)
+
+        engine = TradeExecutionEngine(
+            {offer.sender_id for offer in offers.values()},
+            {item.weapon_id for items in offered_items.values() for item in items},
+        )
+
+        for index, trade_offer_id in enumerate(trade_offer_ids):
+            trade_offer = offers[trade_offer_id]
+            trade_offer.receiver_id = offers[trade_offer_ids[index - 1]].sender_id
+            trade_offer.status = TradeOffer.ACCEPTED
+            try:
+                engine.stage(trade_offer, offered_items[trade_offer_id])
+            except TradeValidationError as e:
+                return [(trade_offer_id, str(e))]
+
+        engine.flush()
+        TradeOffer.objects.bulk_update(offers.values(), ["receiver", "status"])
+        TradeStatsService.record_filled(offers.values())
+        TradeStatsService.record_status(offers.values(), TradeOffer.ACCEPTED)
+        ReplicaRouter.pin_on_commit(TradeService._participants(offers.values()))
+        logger.info(f"Settled matched trade offers {list(trade_offer_ids)}")
+        return []
+
+    @staticmethod
+    def _filling(trade_offer, user_id, action):
+        # Any other user may fill an open offer by accepting it.
+        return trade_offer.receiver_id is None and trade_offer.sender_id != user_id and action.upper() == "ACCEPT"
+
+    @staticmethod
+    def _cancelling(trade_offer, user_id, action):
+        # Open offers have no receiver yet; their sender rejects them to take them off the market.
+        return trade_offer.receiver_id is None and trade_offer.sender_id == user_id and action.upper() == "REJECT"
+
+    @staticmethod
+    def _participants(trade_offers):
+        return {user_id for trade_offer in trade_offers for user_id in (trade_offer.sender_id, trade_offer.receiver_id)}
+
     @staticmethod
     @transaction.atomic
     def _execute_trade(trade_offer):
         """
         Transfers inventory between sender and receiver when a trade is accepted.
+        Runs a constant number of queries regardless of how many items the offer has.
+        """
+        trade_items = list(TradeItem.objects.filter(offer=trade_offer).select_related("weapon", "variant"))
+
+        engine = TradeExecutionEngine(
+            [trade_offer.sender_id, trade_offer.receiver_id],
+            {item.weapon_id for item in trade_items},
+        )
+        engine.stage(trade_offer, trade_items)
+        engine.flush()
+
+    @staticmethod
+    def reverse_trade_offer(trade_offer_id):
         """
-        trade_items = TradeItem.objects.filter(offer=trade_offer)
-
-        # Validate that both users have enough inventory BEFORE executing the trade
-        TradeService.validate_trade_during_execution(trade_offer.sender.id, trade_items.filter(is_offered_by_sender=True))
-        TradeService.validate_trade_during_execution(trade_offer.receiver.id, trade_items.filter(is_offered_by_sender=False))
-
-        for item in trade_items.filter(is_offered_by_sender=True):
-            sender_inventory = Inventory.objects.get(user=trade_offer.sender, weapon=item.weapon, variant=item.variant)
-            sender_inventory.quantity -= item.quantity
-            sender_inventory.save()
-
-            receiver_inventory, created = Inventory.objects.get_or_create(
-                user=trade_offer.receiver, weapon=item.weapon, variant=item.variant,
-                defaults={"quantity": 0}
-            )
-            receiver_inventory.quantity += item.quantity
-            receiver_inventory.save()
-
-        for item in trade_items.filter(is_offered_by_sender=False):
-            receiver_inventory = Inventory.objects.get(user=trade_offer.receiver, weapon=item.weapon, variant=item.variant)
-            receiver_inventory.quantity -= item.quantity
-            receiver_inventory.save()
-
-            sender_inventory, created = Inventory.objects.get_or_create(
-                user=trade_offer.sender, weapon=item.weapon, variant=item.variant,
-                defaults={"quantity": 0}
-            )
-            sender_inventory.quantity += item.quantity
-            sender_inventory.save()
+        Reverses an accepted trade offer, giving every item back to its previous owner.
+        """
+        result = TradeService._reverse_chunk([trade_offer_id])
+
+        if result["failed"]:
+            raise TradeValidationError(result["failed"][0]["error"])
+
+        return TradeOffer.objects.get(id=trade_offer_id)
+
+    @staticmethod
+    def reverse_trade_offers(trade_offer_ids=None, user_id=None, chunk_size=None):
+        """
+        Reverses many accepted offers: the given ids, or every accepted offer the user took part in.
+        Each chunk is reversed in its own transaction; offers failing validation are reported and skipped.
+        Newer offers are reversed first, so items that changed hands several times can be unwound.
+        """
+        chunk_size = chunk_size or settings.TRADE_REVERSAL_CHUNK_SIZE
+
+        if user_id is not None:
+            offers = TradeOffer.objects.filter(Q(sender_id=user_id) | Q(receiver_id=user_id), status=TradeOffer.ACCEPTED)
+            trade_offer_ids = list(offers.order_by("-id").values_list("id", flat=True))
+        else:
+            trade_offer_ids = sorted(set(trade_offer_ids or []), reverse=True)
+
+        results = {"reversed": [], "failed": []}
+        for start in range(0, len(trade_offer_ids), chunk_size):
+            chunk_result = TradeService._reverse_chunk(trade_offer_ids[start:start + chunk_size])
+            results["reversed"] += chunk_result["reversed"]
+            results["failed"] += chunk_result["failed"]
+
+        return results
+
+    @staticmethod
+    @retry_on_conflict
+    def _reverse_chunk(trade_offer_ids):
+        """
+        Reverses a chunk of accepted offers in one transaction with the same locking and inventory
+        validation as acceptance: compensating deltas are applied in bulk, compensating ledger entries
+        appended, and the original entries and offers flagged with one UPDATE each.
+        """
+        offers = {
+            offer.id: offer
+            for offer in TradeOffer.objects.select_for_update().filter(id__in=trade_offer_ids, status=TradeOffer.ACCEPTED).order_by("id")
+        }
+
+        entries_by_offer = defaultdict(list)
+        entries = Ledger.objects.filter(trade_offer_id__in=offers.keys(), reversed=False, reversal_of__isnull=True).select_related("weapon", "variant")
+        for entry in entries:
+            entries_by_offer[entry.trade_offer_id].append(entry)
+
+        engine = TradeExecutionEngine(
+            {user_id for offer in offers.values() for user_id in (offer.sender_id, offer.receiver_id)},
+            {entry.weapon_id for offer_entries in entries_by_offer.values() for entry in offer_entries},
+        )
+
+        reversed_ids = []
+        failed = []
+        for trade_offer_id in sorted(trade_offer_ids, reverse=True):
+            if trade_offer_id not in offers:
+                failed.append({"trade_offer_id": trade_offer_id, "error": f"Trade offer {trade_offer_id} does not exist or is not accepted."})
+                continue
+
+            if not entries_by_offer[trade_offer_id]:
+                failed.append({"trade_offer_id": trade_offer_id, "error": f"Trade offer {trade_offer_id} has no ledger entries to reverse."})
+                continue
+
+            try:
+                engine.stage_reversal(entries_by_offer[trade_offer_id])
+                reversed_ids.append(trade_offer_id)
+            except TradeValidationError as e:
+                failed.append({"trade_offer_id": trade_offer_id, "error": str(e)})
+
+        engine.flush()
+        Ledger.objects.filter(trade_offer_id__in=reversed_ids, reversed=False, reversal_of__isnull=True).update(reversed=True)
+        TradeOffer.objects.filter(id__in=reversed_ids).update(status=TradeOffer.REVERSED)
+        TradeStatsService.record_status([offers[trade_offer_id] for trade_offer_id in reversed_ids], TradeOffer.REVERSED)
+        ReplicaRouter.pin_on_commit(TradeService._participants(offers[trade_offer_id] for trade_offer_id in reversed_ids))
+
+        if reversed_ids:
+            logger.info(f"Reversed trade offers {reversed_ids}")
+
+        return {"reversed": sorted(reversed_ids), "failed": failed}
@@ -0,0 +1,24 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from trading.models import Inventory
+from trading.services.inventory_cache import InventoryCache
+from trading.services.metrics import Metrics
+
+@receiver([post_save, post_delete], sender=Inventory)
+def invalidate_inventory_cache(sender, instance, **kwargs):
+    """
+    Keeps cached inventory snapshots in sync with row-level edits (e.g. from the admin).
+    Bulk writes from trade execution invalidate explicitly.
+    """
+    InventoryCache.invalidate_on_commit([instance.user_id])
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """
+    Counts every query on the connection into the request and service metrics. The signal fires
+    on every reconnect of the same wrapper; inserting first keeps execute_wrapper() blocks balanced.
+    """
+    if Metrics.record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, Metrics.record_query)
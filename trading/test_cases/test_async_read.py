@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now, timedelta
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory
+
+
+class AsyncReadViewTestCase(TestCase):
+    """Test cases for the async (ASGI) inventory and history endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up a user with inventory and five offers with items."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+        Inventory.objects.create(user=cls.sender, weapon=cls.sword, variant=cls.red_sword, quantity=3)
+
+        offers = TradeOffer.objects.bulk_create(
+            TradeOffer(sender=cls.sender, receiver=cls.receiver, created_at=now() - timedelta(minutes=i)) for i in range(5)
+        )
+        TradeItem.objects.bulk_create(
+            TradeItem(offer=offer, weapon=cls.sword, variant=cls.red_sword, quantity=1, is_offered_by_sender=True) for offer in offers
+        )
+
+    def setUp(self):
+        caches[settings.INVENTORY_CACHE_ALIAS].clear()
+
+    async def test_inventory_matches_sync_view(self):
+        """Test that the async inventory endpoint returns the same payload and honours the ETag."""
+        response = await self.async_client.get(reverse("async-inventory-view", args=[self.sender.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"weapon_name": "Sword", "variant": "Red", "quantity": 3}])
+
+        response = await self.async_client.get(reverse("async-inventory-view", args=[self.sender.id]), headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_inventory_shares_the_cache(self):
+        """Test that the sync and async endpoints serve the same cached snapshot."""
+        etag = self.client.get(reverse("inventory-view", args=[self.sender.id]))["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("async-inventory-view", args=[self.sender.id]))
+        self.assertEqual(response["ETag"], etag)
+
+    def test_history_matches_sync_view(self):
+        """Test that the async history endpoint returns the same pages as the sync one."""
+        params = {"user_id": self.receiver.id, "page_size": 3}
+
+        sync_response = self.client.get(reverse("trade-offer-history"), params)
+        async_response = self.client.get(reverse("async-trade-offer-history"), params)
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual(async_response["X-Next-Cursor"], sync_response["X-Next-Cursor"])
+
+        async_response = self.client.get(reverse("async-trade-offer-history"), {**params, "cursor": async_response["X-Next-Cursor"]})
+        self.assertEqual(len(async_response.json()), 2)
+        self.assertNotIn("X-Next-Cursor", async_response)
+
+    def test_history_query_count(self):
+        """Test that the async history page is built in the same three queries as the sync one."""
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("async-trade-offer-history"), {"user_id": self.receiver.id})
+        self.assertEqual(len(response.json()), 5)
+
+    async def test_history_validation(self):
+        """Test that invalid parameters are rejected like in the sync view."""
+        response = await self.async_client.get(reverse("async-trade-offer-history"))
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.get(reverse("async-trade-offer-history"), {"user_id": self.receiver.id, "cursor": "not-a-cursor"})
+        self.assertEqual(response.json(), {"error": "Invalid cursor"})
@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import LiveServerTestCase
+
+
+class BenchmarkApiTestCase(LiveServerTestCase):
+    """Test cases for the end-to-end API benchmark command."""
+
+    def setUp(self):
+        """Generate a small dataset and a temporary results file."""
+        call_command("generate_data", "--users", "20", "--weapons", "6", "--variants-per-weapon", "1", "--offers", "100", stdout=StringIO())
+        self.output = os.path.join(tempfile.mkdtemp(), "benchmark.json")
+
+    def _benchmark(self, *args):
+        out = StringIO()
+        call_command(
+            "benchmark_api", "--url", self.live_server_url, "--requests", "4", "--query-samples", "2", "--concurrency", "1",
+            "--page-sizes", "10", "--output", self.output, *args, stdout=out, stderr=StringIO(),
+        )
+        with open(self.output) as output:
+            return json.load(output), out.getvalue()
+
+    def test_writes_results_per_scenario(self):
+        """Test that every scenario is measured and written with latency percentiles and query counts."""
+        report, _ = self._benchmark()
+
+        self.assertEqual(set(report["results"]), {
+            "create", "accept", "reject", "history/median/page_size=10", "history/deep/page_size=10", "inventory",
+        })
+        for name in ("create", "reject", "history/deep/page_size=10", "inventory"):
+            result = report["results"][name]
+            self.assertEqual((result["requests"], result["errors"]), (4, 0))
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["queries_per_request"], 0)
+        self.assertEqual(report["data"]["users"], 20)
+
+    def test_compare_with_baseline(self):
+        """Test that a run reports its change against an earlier results file."""
+        self._benchmark("--scenarios", "inventory")
+        baseline = self.output + ".baseline"
+        os.replace(self.output, baseline)
+
+        _, out = self._benchmark("--scenarios", "inventory", "--compare", baseline)
+        self.assertIn("inventory: throughput", out)
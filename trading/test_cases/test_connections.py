@@ -0,0 +1,16 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class ConnectionBenchmarkTestCase(TestCase):
+    """Test cases for the connection reuse benchmark."""
+
+    def test_reports_savings_per_mode(self):
+        """Test that each available mode is timed and compared with a new connection per request."""
+        out, err = StringIO(), StringIO()
+        call_command("benchmark_connections", "--requests", "20", "--warmup", "2", stdout=out, stderr=err)
+
+        self.assertIn("per-request: mean=", out.getvalue())
+        self.assertIn("persistent saves", out.getvalue())
+        self.assertIn("pool: skipped", err.getvalue())
@@ -0,0 +1,91 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+from trading.models import TradeOffer, TradeItem, User, Inventory, Ledger
+from trading.services.data_generator import DataGenerator
+from trading.services.ledger_service import LedgerReplayService
+
+
+class DataGeneratorTestCase(TestCase):
+    """Test cases for the synthetic data generator and the portable seed_data reset."""
+
+    OPTIONS = ["--users", "40", "--weapons", "6", "--variants-per-weapon", "2", "--offers", "200", "--batch-size", "50"]
+
+    def _generate(self, *args):
+        call_command("generate_data", *self.OPTIONS, *args, stdout=StringIO())
+
+    def _items(self):
+        return list(TradeItem.objects.order_by("id").values_list("offer_id", "weapon_id", "variant_id", "quantity", "is_offered_by_sender"))
+
+    def test_generates_requested_volume(self):
+        """Test that the requested users and offers are created with items and inventory."""
+        self._generate()
+
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(TradeOffer.objects.count(), 200)
+        self.assertTrue(TradeOffer.objects.filter(status=TradeOffer.ACCEPTED).exists())
+        self.assertGreaterEqual(TradeItem.objects.count(), 400)
+        self.assertTrue(Inventory.objects.exists())
+
+    def test_same_seed_same_data(self):
+        """Test that regenerating with the same seed reproduces the rows and another seed does not."""
+        self._generate()
+        items = self._items()
+
+        self._generate()
+        self.assertEqual(self._items(), items)
+
+        self._generate("--seed", "7")
+        self.assertNotEqual(self._items(), items)
+
+    def test_ledger_replays_to_inventory(self):
+        """Test that the generated ledger rebuilds the generated inventory and is timestamped like the offers."""
+        self._generate()
+
+        self.assertEqual(LedgerReplayService.reconcile(list(User.objects.values_list("id", flat=True))), [])
+        trades = Ledger.objects.filter(trade_offer__isnull=False)
+        self.assertTrue(trades.exists())
+        self.assertFalse(trades.exclude(created_at=F("trade_offer__created_at")).exists())
+
+    def test_append_continues_ids(self):
+        """Test that --append keeps the existing rows and new ids follow them."""
+        self._generate()
+        last_offer_id = TradeOffer.objects.latest("id").id
+
+        self._generate("--append")
+        self.assertEqual(User.objects.count(), 80)
+        self.assertEqual(TradeOffer.objects.earliest("id").id, 1)
+        self.assertEqual(TradeOffer.objects.filter(id__gt=last_offer_id).count(), 200)
+        self.assertEqual(TradeOffer.objects.create(sender_id=1, receiver_id=2).id, last_offer_id + 201)
+
+    def test_invalid_options(self):
+        """Test that parameters that cannot produce trading partners are rejected."""
+        with self.assertRaises(CommandError):
+            call_command("generate_data", "--users", "3", "--variants-per-weapon", "2", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("generate_data", "--copy", stdout=StringIO())
+        with self.assertRaises(ValueError):
+            DataGenerator(seed=1).generate(users=3, weapons=2, variants_per_weapon=2, inventory_density=0.5, offers=10, max_items_per_offer=1)
+
+    def test_seed_data_resets_portably(self):
+        """Test that seed_data replaces existing data and restarts ids on any database."""
+        self._generate()
+        call_command("seed_data", stdout=StringIO())
+
+        self.assertEqual(list(User.objects.order_by("id").values_list("id", "username")), [(1, "soumya"), (2, "smruti"), (3, "shradha")])
+        self.assertEqual(LedgerReplayService.reconcile([1, 2, 3]), [])
+
+    def test_reset_drops_cached_inventories(self):
+        """Test that users reusing an id after a reset do not see the previous user's cached inventory."""
+        self._generate()
+        self.client.get(reverse("inventory-view", args=[1]))
+
+        self._generate("--seed", "7")
+        self.assertEqual(
+            self.client.get(reverse("inventory-view", args=[1])).json(),
+            [{"weapon_name": row.weapon.get_type_display(), "variant": row.variant.variant_name if row.variant else None, "quantity": row.quantity}
+             for row in Inventory.objects.filter(user_id=1).select_related("weapon", "variant").order_by("id")],
+        )
@@ -0,0 +1,78 @@
+from django.core.cache import caches
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory
+from trading.services.trade_service import TradeService
+
+
+class InventoryViewTestCase(TestCase):
+    """Test cases for the cached Inventory API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up two users owning one weapon each."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+        cls.blue_staff = WeaponVariant.objects.create(weapon=cls.staff, variant_name="Blue")
+
+        cls.sender_sword = Inventory.objects.create(user=cls.sender, weapon=cls.sword, variant=cls.red_sword, quantity=3)
+        Inventory.objects.create(user=cls.receiver, weapon=cls.staff, variant=cls.blue_staff, quantity=2)
+
+    def setUp(self):
+        caches[settings.INVENTORY_CACHE_ALIAS].clear()
+
+    def test_view_inventory(self):
+        """Test reading a user's inventory."""
+        response = self.client.get(reverse("inventory-view", args=[self.sender.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"weapon_name": "Sword", "variant": "Red", "quantity": 3}])
+        self.assertIn("ETag", response)
+
+    def test_repeated_reads_are_served_from_cache(self):
+        """Test that only the first read hits the database, in a single query."""
+        with self.assertNumQueries(1):
+            self.client.get(reverse("inventory-view", args=[self.sender.id]))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("inventory-view", args=[self.sender.id]))
+        self.assertEqual(response.json()[0]["quantity"], 3)
+
+    def test_unchanged_inventory_returns_not_modified(self):
+        """Test that a matching If-None-Match returns 304 without a body."""
+        etag = self.client.get(reverse("inventory-view", args=[self.sender.id]))["ETag"]
+
+        response = self.client.get(reverse("inventory-view", args=[self.sender.id]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_trade_invalidates_both_users(self):
+        """Test that accepting a trade refreshes the cached inventory of both parties."""
+        etag = self.client.get(reverse("inventory-view", args=[self.sender.id]))["ETag"]
+        self.client.get(reverse("inventory-view", args=[self.receiver.id]))
+
+        offer = TradeOffer.objects.create(sender=self.sender, receiver=self.receiver)
+        TradeItem.objects.create(offer=offer, weapon=self.sword, variant=self.red_sword, quantity=1, is_offered_by_sender=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            TradeService.process_trade_offer(offer.id, self.receiver.id, "ACCEPT")
+
+        response = self.client.get(reverse("inventory-view", args=[self.sender.id]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["quantity"], 2)
+
+        response = self.client.get(reverse("inventory-view", args=[self.receiver.id]))
+        self.assertEqual(len(response.json()), 2)
+
+    def test_row_edit_invalidates_cache(self):
+        """Test that saving an inventory row (as the admin does) refreshes the snapshot."""
+        self.client.get(reverse("inventory-view", args=[self.sender.id]))
+
+        self.sender_sword.quantity = 7
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sender_sword.save()
+
+        response = self.client.get(reverse("inventory-view", args=[self.sender.id]))
+        self.assertEqual(response.json()[0]["quantity"], 7)
@@ -0,0 +1,88 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory, Ledger
+from trading.repositories.inventory_repository import InventoryRepository
+from trading.services.ledger_service import LedgerReplayService
+from trading.services.trade_service import TradeService
+
+
+class LedgerReplayTestCase(TestCase):
+    """Test cases for rebuilding and verifying inventory from the ledger."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up two users whose starting inventory is recorded in the ledger."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+        cls.blue_staff = WeaponVariant.objects.create(weapon=cls.staff, variant_name="Blue")
+
+        inventory = [
+            Inventory.objects.create(user=cls.sender, weapon=cls.sword, variant=cls.red_sword, quantity=3),
+            Inventory.objects.create(user=cls.receiver, weapon=cls.staff, variant=cls.blue_staff, quantity=2),
+        ]
+        Ledger.objects.bulk_create(Ledger.adjustment(row.user_id, row.weapon_id, row.variant_id, row.quantity) for row in inventory)
+
+        offer = TradeOffer.objects.create(sender=cls.sender, receiver=cls.receiver)
+        TradeItem.objects.create(offer=offer, weapon=cls.sword, variant=cls.red_sword, quantity=1, is_offered_by_sender=True)
+        TradeItem.objects.create(offer=offer, weapon=cls.staff, variant=cls.blue_staff, quantity=1, is_offered_by_sender=False)
+        TradeService.process_trade_offer(offer.id, cls.receiver.id, "ACCEPT")
+
+    def _replay(self, *args):
+        out = StringIO()
+        call_command("replay_ledger", *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_replay_matches_inventory_after_trades(self):
+        """Test that replaying starting balances and trades reproduces live inventory."""
+        output = self._replay()
+        self.assertIn("Inventory of 2 users matches the ledger.", output)
+
+    def test_replay_reports_drift(self):
+        """Test that an inventory change outside the ledger is reported."""
+        Inventory.objects.filter(user=self.sender, weapon=self.sword).update(quantity=10)
+
+        output = self._replay("--batch-size", "1")
+        self.assertIn(f"user={self.sender.id} weapon={self.sword.id} variant={self.red_sword.id} ledger=2 live=10 drift=+8", output)
+        self.assertIn("1 inventory positions of 2 users drift", output)
+
+    def test_report_does_not_lock_inventory(self):
+        """Test that reporting drift reads inventory without row locks and fixing locks it."""
+        with mock.patch.object(InventoryRepository, "lock_inventory", wraps=InventoryRepository.lock_inventory) as lock_inventory:
+            self._replay()
+            lock_inventory.assert_not_called()
+
+            self._replay("--rebuild")
+            lock_inventory.assert_called()
+
+    def test_rebuild_restores_ledger_balances(self):
+        """Test that --rebuild rewrites and recreates drifted inventory rows."""
+        Inventory.objects.filter(user=self.sender, weapon=self.sword).update(quantity=10)
+        Inventory.objects.filter(user=self.receiver, weapon=self.sword).delete()
+
+        self._replay("--rebuild")
+
+        self.assertEqual(Inventory.objects.get(user=self.sender, weapon=self.sword).quantity, 2)
+        self.assertEqual(Inventory.objects.get(user=self.receiver, weapon=self.sword).quantity, 1)
+        self.assertEqual(LedgerReplayService.reconcile([self.sender.id, self.receiver.id]), [])
+
+    def test_adopt_live_bootstraps_ledger(self):
+        """Test that --adopt-live appends adjustments so the ledger matches inventory."""
+        Inventory.objects.filter(user=self.receiver, weapon=self.staff).update(quantity=0)
+
+        self._replay("--adopt-live")
+
+        burn = Ledger.objects.get(sender=self.receiver, receiver=None)
+        self.assertEqual(burn.quantity, 1)
+        self.assertIn("matches the ledger", self._replay())
+
+    def test_movements_within_date_range(self):
+        """Test reporting the net movement of a date range."""
+        output = self._replay("--users", str(self.sender.id), "--since", "2000-01-01")
+        self.assertIn(f"user={self.sender.id} weapon={self.sword.id} variant={self.red_sword.id} net=+2", output)
+        self.assertIn(f"user={self.sender.id} weapon={self.staff.id} variant={self.blue_staff.id} net=+1", output)
@@ -0,0 +1,131 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now, timedelta
+from trading.models import Ledger, TradeOffer, User, Weapon, WeaponVariant, Inventory, MarketVolumeRollup, MarketPairRollup, RollupWatermark
+from trading.services.archive_service import TradeArchiveService
+from trading.services.market_service import MarketRollupService
+from trading.services.trade_service import TradeService
+
+
+class MarketRollupTestCase(TestCase):
+    """Test cases for the incremental market volume and exchange-ratio rollups."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up a wizard owning red swords and a dwarf owning staffs."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+
+        Inventory.objects.create(user=cls.sender, weapon=cls.sword, variant=cls.red_sword, quantity=10)
+        Inventory.objects.create(user=cls.receiver, weapon=cls.staff, quantity=10)
+
+    def _trade(self, swords, staffs):
+        trade_offer = TradeService.create_trade_offer(
+            self.sender.id, self.receiver.id,
+            [{"weapon_id": self.sword.id, "variant_id": self.red_sword.id, "quantity": swords}],
+            [{"weapon_id": self.staff.id, "quantity": staffs}],
+        )
+        TradeService.process_trade_offer(trade_offer.id, self.receiver.id, "ACCEPT")
+        return trade_offer
+
+    def _volume(self, weapon, variant=None):
+        return MarketRollupService.get_volume(weapon.id, variant.id if variant else 0, MarketVolumeRollup.DAY)
+
+    def test_volume_and_ratios(self):
+        """Test that accepted trades add up per bucket and imply a ratio in both directions."""
+        self._trade(2, 1)
+        self._trade(1, 1)
+        self.assertEqual(MarketRollupService.run(lag_seconds=0), 4)
+
+        today = MarketRollupService.bucket_start(now(), MarketVolumeRollup.DAY)
+        self.assertEqual(self._volume(self.sword, self.red_sword), [{"bucket_start": today, "quantity": 3, "trades": 2}])
+        self.assertEqual(self._volume(self.staff), [{"bucket_start": today, "quantity": 2, "trades": 2}])
+        self.assertEqual(MarketVolumeRollup.objects.count(), 6)
+
+        [sword_in_staffs] = MarketRollupService.get_ratios((self.sword.id, self.red_sword.id), (self.staff.id, None), MarketVolumeRollup.HOUR)
+        self.assertAlmostEqual(sword_in_staffs["ratio"], 2 / 3)
+        self.assertEqual((sword_in_staffs["low"], sword_in_staffs["high"], sword_in_staffs["trades"]), (0.5, 1.0, 2))
+
+        [staff_in_swords] = MarketRollupService.get_ratios((self.staff.id, None), (self.sword.id, self.red_sword.id), MarketVolumeRollup.HOUR)
+        self.assertEqual((staff_in_swords["ratio"], staff_in_swords["low"], staff_in_swords["high"]), (1.5, 1.0, 2.0))
+        self.assertEqual(MarketPairRollup.objects.count(), 3)
+
+    def test_incremental_runs(self):
+        """Test that each run folds only the ledger rows after the watermark."""
+        self._trade(2, 1)
+        MarketRollupService.run(lag_seconds=0)
+        self.assertEqual(MarketRollupService.run(lag_seconds=0), 0)
+
+        self._trade(1, 1)
+        self.assertEqual(MarketRollupService.run(lag_seconds=0), 2)
+        self.assertEqual(self._volume(self.sword, self.red_sword)[0]["quantity"], 3)
+        self.assertEqual(MarketVolumeRollup.objects.count(), 6)
+
+    def test_lag_holds_back_recent_rows(self):
+        """Test that rows younger than the lag are left for a later run."""
+        self._trade(2, 1)
+        self.assertEqual(MarketRollupService.run(lag_seconds=60), 0)
+        self.assertFalse(MarketVolumeRollup.objects.exists())
+
+    def test_batches_keep_offers_whole(self):
+        """Test that a full batch ending inside an offer leaves that offer for the next batch."""
+        self._trade(2, 1)
+        self._trade(1, 1)
+
+        self.assertEqual(MarketRollupService.roll_up_batch(batch_size=3, lag_seconds=0), 2)
+        self.assertEqual(MarketRollupService.run(batch_size=3, lag_seconds=0), 2)
+        self.assertEqual(MarketPairRollup.objects.get(resolution=MarketVolumeRollup.DAY).trades, 2)
+
+    def test_reversal_is_taken_off(self):
+        """Test that a reversal removes the trade from the buckets it was counted in."""
+        self._trade(2, 1)
+        MarketRollupService.run(lag_seconds=0)
+        trade_offer = self._trade(1, 1)
+        TradeService.reverse_trade_offer(trade_offer.id)
+        MarketRollupService.run(lag_seconds=0)
+
+        self.assertEqual(self._volume(self.sword, self.red_sword)[0]["quantity"], 2)
+        self.assertEqual(self._volume(self.staff)[0]["trades"], 1)
+        [ratio] = MarketRollupService.get_ratios((self.sword.id, self.red_sword.id), (self.staff.id, None), MarketVolumeRollup.DAY)
+        self.assertEqual((ratio["ratio"], ratio["trades"]), (0.5, 1))
+
+    def test_archived_offer_keeps_its_ratio(self):
+        """Test that a trade archived before it is rolled up still adds to the pair buckets."""
+        trade_offer = self._trade(2, 1)
+        TradeOffer.objects.filter(id=trade_offer.id).update(created_at=now() - timedelta(days=365))
+        self.assertEqual(TradeArchiveService.run(), 1)
+        MarketRollupService.run(lag_seconds=0)
+
+        self.assertEqual(MarketVolumeRollup.objects.count(), 6)
+        [ratio] = MarketRollupService.get_ratios((self.sword.id, self.red_sword.id), (self.staff.id, None), MarketVolumeRollup.DAY)
+        self.assertEqual((ratio["ratio"], ratio["trades"]), (0.5, 1))
+
+    def test_endpoint(self):
+        """Test the chart endpoint with a quote instrument and invalid parameters."""
+        self._trade(2, 1)
+        MarketRollupService.run(lag_seconds=0)
+
+        response = self.client.get(reverse("market-series", args=[self.staff.id]), {"resolution": "hour", "quote_weapon_id": self.sword.id, "quote_variant_id": self.red_sword.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["volume"][0]["quantity"], 1)
+        self.assertEqual(response.data["ratios"][0]["ratio"], 2.0)
+
+        self.assertEqual(self.client.get(reverse("market-series", args=[self.staff.id]), {"resolution": "week"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("market-series", args=[self.staff.id]), {"variant_id": "red"}).status_code, 400)
+
+    def test_command_prunes_minute_buckets(self):
+        """Test that the command rolls up new rows and prunes expired minute buckets."""
+        MarketVolumeRollup.objects.create(resolution=MarketVolumeRollup.MINUTE, weapon_id=self.staff.id, bucket_start=now() - timedelta(days=30), quantity=1, trades=1)
+        self._trade(2, 1)
+
+        out = StringIO()
+        call_command("rollup_market", "--lag", "0", stdout=out)
+        self.assertIn("Rolled up 2 ledger rows, pruned 1 minute buckets.", out.getvalue())
+        self.assertEqual(MarketVolumeRollup.objects.count(), 6)
+        self.assertEqual(RollupWatermark.objects.get(name=MarketRollupService.WATERMARK).position, Ledger.objects.latest("id").id)
@@ -0,0 +1,203 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from trading.exceptions import TradeValidationError
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory, Ledger
+from trading.services.matching import MatchingEngine, Order, OrderBook
+from trading.services.stats_service import TradeStatsService
+from trading.services.trade_service import TradeService
+
+SWORD, STAFF, AXE = (1, None, 1), (2, None, 1), (3, None, 1)
+
+
+class OrderBookTestCase(SimpleTestCase):
+    """Test cases for the in-memory order book."""
+
+    def test_complementary_orders_match(self):
+        """Test that an order matches the oldest complementary order of another user."""
+        book = OrderBook(max_cycle_length=4)
+        self.assertIsNone(book.add(Order(1, 10, SWORD, STAFF)))
+        self.assertIsNone(book.add(Order(2, 11, SWORD, STAFF)))
+
+        ring = book.add(Order(3, 12, STAFF, SWORD))
+        self.assertEqual([order.trade_offer_id for order in ring], [3, 1])
+        self.assertEqual(list(book.orders), [2])
+
+    def test_orders_of_the_same_user_do_not_match(self):
+        """Test that a user's offers are never matched with each other."""
+        book = OrderBook(max_cycle_length=4)
+        book.add(Order(1, 10, SWORD, STAFF))
+        self.assertIsNone(book.add(Order(2, 10, STAFF, SWORD)))
+        self.assertEqual(len(book), 2)
+
+    def test_ring_of_three(self):
+        """Test that a multi-party ring is found and ordered by who supplies what."""
+        book = OrderBook(max_cycle_length=3)
+        book.add(Order(1, 10, SWORD, STAFF))
+        book.add(Order(2, 11, STAFF, AXE))
+
+        ring = book.add(Order(3, 12, AXE, SWORD))
+        self.assertEqual([order.trade_offer_id for order in ring], [3, 1, 2])
+        self.assertEqual(len(book), 0)
+
+    def test_ring_length_is_bounded(self):
+        """Test that rings longer than max_cycle_length are not searched."""
+        book = OrderBook(max_cycle_length=2)
+        book.add(Order(1, 10, SWORD, STAFF))
+        book.add(Order(2, 11, STAFF, AXE))
+        self.assertIsNone(book.add(Order(3, 12, AXE, SWORD)))
+
+    def test_pairs_are_preferred_over_rings(self):
+        """Test that the shortest ring wins."""
+        book = OrderBook(max_cycle_length=3)
+        book.add(Order(1, 10, SWORD, STAFF))
+        book.add(Order(2, 11, STAFF, AXE))
+        book.add(Order(3, 13, SWORD, AXE))
+
+        ring = book.add(Order(4, 12, AXE, SWORD))
+        self.assertEqual([order.trade_offer_id for order in ring], [4, 3])
+
+
+class MatchingEngineTestCase(TestCase):
+    """Test cases for matching and settling open trade offers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up three users owning one weapon each."""
+        cls.gandalf = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.gimli = User.objects.create(username="gimli", user_type=User.DWARF)
+        cls.frodo = User.objects.create(username="frodo", user_type=User.ELF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.axe = Weapon.objects.create(type=Weapon.AXE)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+
+        Inventory.objects.create(user=cls.gandalf, weapon=cls.sword, variant=cls.red_sword, quantity=1)
+        Inventory.objects.create(user=cls.gimli, weapon=cls.staff, quantity=1)
+        Inventory.objects.create(user=cls.frodo, weapon=cls.axe, quantity=1)
+
+    def _open_offer(self, sender, gives, wants):
+        offer = TradeOffer.objects.create(sender=sender)
+        for (weapon, variant), is_offered_by_sender in ((gives, True), (wants, False)):
+            TradeItem.objects.create(offer=offer, weapon=weapon, variant=variant, quantity=1, is_offered_by_sender=is_offered_by_sender)
+        return offer
+
+    def _quantity(self, user, weapon):
+        inventory = Inventory.objects.filter(user=user, weapon=weapon).first()
+        return inventory.quantity if inventory else 0
+
+    def test_ring_is_settled(self):
+        """Test that a three-party ring moves every item to the user wanting it."""
+        first = self._open_offer(self.gandalf, (self.sword, self.red_sword), (self.staff, None))
+        second = self._open_offer(self.gimli, (self.staff, None), (self.axe, None))
+        third = self._open_offer(self.frodo, (self.axe, None), (self.sword, self.red_sword))
+
+        engine = MatchingEngine(max_cycle_length=3)
+        self.assertEqual(engine.poll(), [[third.id, first.id, second.id]])
+
+        self.assertEqual(self._quantity(self.gandalf, self.staff), 1)
+        self.assertEqual(self._quantity(self.gimli, self.axe), 1)
+        self.assertEqual(self._quantity(self.frodo, self.sword), 1)
+
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.receiver_id), (TradeOffer.ACCEPTED, self.frodo.id))
+        self.assertEqual(Ledger.objects.filter(trade_offer__in=[first, second, third]).count(), 3)
+
+    def test_new_offers_are_matched_on_poll(self):
+        """Test that offers created after the book was built are matched incrementally."""
+        engine = MatchingEngine()
+        first = self._open_offer(self.gandalf, (self.sword, self.red_sword), (self.staff, None))
+        self.assertEqual(engine.poll(), [])
+        self.assertEqual(len(engine.book), 1)
+
+        second = self._open_offer(self.gimli, (self.staff, None), (self.sword, self.red_sword))
+        self.assertEqual(engine.poll(), [[second.id, first.id]])
+        self.assertEqual(len(engine.book), 0)
+
+    def test_offer_committed_late_is_matched(self):
+        """Test that an offer becoming visible after a higher id was polled is still picked up."""
+        engine = MatchingEngine()
+        late = self._open_offer(self.gandalf, (self.sword, self.red_sword), (self.staff, None))
+        TradeOffer.objects.filter(id=late.id).update(status=TradeOffer.SETTLING)  # not committed yet
+        self._open_offer(self.frodo, (self.axe, None), (self.staff, None))
+        self.assertEqual(engine.poll(), [])
+
+        TradeOffer.objects.filter(id=late.id).update(status=TradeOffer.PENDING)
+        counter = self._open_offer(self.gimli, (self.staff, None), (self.sword, self.red_sword))
+        self.assertEqual(engine.poll(), [[counter.id, late.id]])
+
+    def test_unsettleable_offer_is_dropped(self):
+        """Test that an offer whose sender no longer owns the item leaves the book without blocking others."""
+        engine = MatchingEngine()
+        stale = self._open_offer(self.gandalf, (self.sword, self.red_sword), (self.staff, None))
+        engine.poll()
+        Inventory.objects.filter(user=self.gandalf).update(quantity=0)
+
+        self._open_offer(self.gimli, (self.staff, None), (self.sword, self.red_sword))
+        self.assertEqual(engine.poll(), [])
+        self.assertNotIn(stale.id, engine.book.orders)
+        self.assertEqual(len(engine.book), 1)
+        self.assertEqual(TradeOffer.objects.get(id=stale.id).status, TradeOffer.PENDING)
+
+    def test_open_offer_can_be_filled_by_any_user(self):
+        """Test creating an open offer through the API and accepting it as another user."""
+        response = self.client.post(
+            reverse("trade-offer-create"),
+            data=json.dumps({"sender_id": self.gandalf.id, "open": True, "offered_items": [{"weapon_id": self.sword.id, "variant_id": self.red_sword.id, "quantity": 1}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        offer = TradeService.process_trade_offer(response.json()["trade_offer_id"], self.frodo.id, "ACCEPT")
+        self.assertEqual((offer.status, offer.receiver_id), (TradeOffer.ACCEPTED, self.frodo.id))
+        self.assertEqual(self._quantity(self.frodo, self.sword), 1)
+
+    def test_batch_accept_fills_open_offers(self):
+        """Test that batch accepts fill open offers, and that offers failing to settle stay open."""
+        first = self._open_offer(self.gandalf, (self.sword, self.red_sword), (self.axe, None))
+        second = self._open_offer(self.gandalf, (self.sword, self.red_sword), (self.axe, None))
+
+        response = self.client.post(
+            reverse("trade-offer-batch-process"),
+            data=json.dumps({"receiver_id": self.frodo.id, "actions": [{"trade_offer_id": offer.id, "action": "ACCEPT"} for offer in (first, second)]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(results[0]["status"], "Accepted")
+        self.assertIn("does not have enough", results[1]["error"])
+
+        self.assertEqual(TradeOffer.objects.filter(id=first.id).values_list("status", "receiver_id").get(), (TradeOffer.ACCEPTED, self.frodo.id))
+        self.assertEqual(TradeOffer.objects.filter(id=second.id).values_list("status", "receiver_id").get(), (TradeOffer.PENDING, None))
+        self.assertEqual(self._quantity(self.frodo, self.sword), 1)
+        self.assertEqual(TradeStatsService.get_stats(self.frodo.id)["received_count"], 1)
+
+    def test_sender_can_cancel_open_offer(self):
+        """Test that only the sender can reject an open offer, which takes it out of matching."""
+        offer = self._open_offer(self.gandalf, (self.sword, self.red_sword), (self.staff, None))
+        with self.assertRaises(TradeValidationError):
+            TradeService.process_trade_offer(offer.id, self.frodo.id, "REJECT")
+
+        response = self.client.patch(
+            reverse("trade-offer-update", args=[offer.id]),
+            data=json.dumps({"receiver_id": self.gandalf.id, "action": "REJECT"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "Rejected")
+
+        self._open_offer(self.gimli, (self.staff, None), (self.sword, self.red_sword))
+        self.assertEqual(MatchingEngine().poll(), [])
+        self.assertEqual(TradeStatsService.get_stats(self.gandalf.id)["rejected_count"], 1)
+
+    def test_match_offers_command(self):
+        """Test running the matching engine once."""
+        self._open_offer(self.gandalf, (self.sword, self.red_sword), (self.staff, None))
+        self._open_offer(self.gimli, (self.staff, None), (self.sword, self.red_sword))
+
+        out = StringIO()
+        call_command("match_offers", "--once", stdout=out)
+        self.assertIn("1 matches settled, 0 open offers", out.getvalue())
@@ -0,0 +1,92 @@
+import re
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from trading.models import User, Weapon, Inventory
+from trading.services.metrics import Metrics
+from trading.services.trade_service import TradeService
+
+
+@override_settings(METRICS_SAMPLE_RATE=1.0)
+class MetricsTestCase(TestCase):
+    """Test cases for the request and service metrics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up two users owning one weapon type each."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        Inventory.objects.create(user=cls.sender, weapon=cls.sword, quantity=5)
+        Inventory.objects.create(user=cls.receiver, weapon=cls.staff, quantity=5)
+
+    def setUp(self):
+        Metrics.reset()
+
+    def _metrics(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return {
+            (name, labels): float(value)
+            for name, labels, value in re.findall(r'^(\w+)\{(.*)\} (\S+)$', response.content.decode(), re.MULTILINE)
+        }
+
+    def test_endpoint_metrics(self):
+        """Test that a request records its queries, DB time, serialization and rendering time and wall time under its route."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("inventory-view", args=[self.sender.id]))
+
+        # Read the count first: the next request resets the query log.
+        query_count = len(queries)
+        metrics = self._metrics()
+        label = 'endpoint="GET /inventory/<int:user_id>/"'
+        self.assertEqual(metrics[("trading_endpoint_queries_sum", label)], query_count)
+        self.assertEqual(metrics[("trading_endpoint_duration_seconds_count", label)], 1)
+        self.assertEqual(metrics[("trading_endpoint_render_seconds_count", label)], 1)
+        self.assertEqual(metrics[("trading_endpoint_serialize_seconds_count", label)], 1)
+        self.assertLessEqual(metrics[("trading_endpoint_db_seconds_sum", label)], metrics[("trading_endpoint_duration_seconds_sum", label)])
+        self.assertEqual(metrics[("trading_endpoint_queries_bucket", label + ',le="+Inf"')], 1)
+
+    def test_serialize_seconds(self):
+        """Test that the time spent in response serializers is recorded once per request, nested serializers included."""
+        TradeService.create_trade_offer(self.sender.id, self.receiver.id, [{"weapon_id": self.sword.id, "quantity": 1}], [])
+        self.client.get(reverse("trade-offer-history"), {"user_id": self.sender.id})
+
+        metrics = self._metrics()
+        label = 'endpoint="GET /trade-offer/history/"'
+        self.assertEqual(metrics[("trading_endpoint_serialize_seconds_count", label)], 1)
+        self.assertGreater(metrics[("trading_endpoint_serialize_seconds_sum", label)], 0)
+        self.assertLessEqual(metrics[("trading_endpoint_serialize_seconds_sum", label)], metrics[("trading_endpoint_duration_seconds_sum", label)])
+
+    def test_service_metrics(self):
+        """Test that TradeService methods are measured, nested calls included in their callers."""
+        trade_offer = TradeService.create_trade_offer(
+            self.sender.id, self.receiver.id, [{"weapon_id": self.sword.id, "quantity": 1}], [{"weapon_id": self.staff.id, "quantity": 1}],
+        )
+        with CaptureQueriesContext(connection) as queries:
+            TradeService.process_trade_offer(trade_offer.id, self.receiver.id, "ACCEPT")
+
+        query_count = len(queries)
+        metrics = self._metrics()
+        process = metrics[("trading_service_queries_sum", 'method="TradeService.process_trade_offer"')]
+        self.assertEqual(process, query_count)
+        self.assertEqual(metrics[("trading_service_duration_seconds_count", 'method="TradeService.create_trade_offer"')], 1)
+        self.assertLess(metrics[("trading_service_queries_sum", 'method="TradeService._execute_trade"')], process)
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_recorded(self):
+        """Test that requests and service calls outside the sample leave no series."""
+        self.client.get(reverse("inventory-view", args=[self.sender.id]))
+        TradeService.create_trade_offer(self.sender.id, self.receiver.id, [{"weapon_id": self.sword.id, "quantity": 1}], [])
+
+        self.assertEqual(self._metrics(), {})
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.5"], METRICS_TOKEN="secret")
+    def test_metrics_require_allowed_ip_or_token(self):
+        """Test that only allowlisted addresses or the bearer token can scrape the metrics."""
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.5").status_code, 200)
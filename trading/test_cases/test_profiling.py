@@ -0,0 +1,104 @@
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from trading.models import User, Weapon, Inventory, RequestProfile
+from trading.services.profiling_service import StackProfiler
+from trading.services.trade_service import TradeService
+
+
+class ProfilingTestCase(TestCase):
+    """Test cases for on-demand and sampled request profiling."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up an admin and two users with one accepted trade between them."""
+        cls.admin = User.objects.create(username="elrond", user_type=User.ELF, is_staff=True)
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        Inventory.objects.create(user=cls.sender, weapon=cls.sword, quantity=5)
+        Inventory.objects.create(user=cls.receiver, weapon=cls.staff, quantity=5)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _offer(self):
+        return TradeService.create_trade_offer(
+            self.sender.id, self.receiver.id, [{"weapon_id": self.sword.id, "quantity": 1}], [{"weapon_id": self.staff.id, "quantity": 1}],
+        )
+
+    def test_admin_header_profiles_request(self):
+        """Test that an admin's X-Profile header stores a profile tagged with the endpoint and query count."""
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse("trade-offer-history"), {"user_id": self.sender.id}, HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual((profile.endpoint, profile.reason, profile.status_code), ("GET /trade-offer/history/", RequestProfile.HEADER, 200))
+        self.assertGreater(profile.queries, 0)
+        self.assertIn("TradeHistoryService.get_page", profile.stacks)
+        for line in profile.stacks.splitlines():
+            self.assertRegex(line, r"^\S+(;\S+)* \d+$")
+
+    def test_header_ignored_for_other_users(self):
+        """Test that the header does nothing for anonymous and non-admin users."""
+        self.client.get(reverse("inventory-view", args=[self.sender.id]), HTTP_X_PROFILE="1")
+        self.client.force_authenticate(self.sender)
+        self.client.get(reverse("inventory-view", args=[self.sender.id]), HTTP_X_PROFILE="1")
+
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_requests(self):
+        """Test that sampled requests are profiled, e.g. accepting an offer."""
+        trade_offer = self._offer()
+        response = self.client.patch(
+            reverse("trade-offer-update", args=[trade_offer.id]), {"receiver_id": self.receiver.id, "action": "ACCEPT"}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual((profile.endpoint, profile.reason), ("PATCH /trade-offer/<int:trade_offer_id>/", RequestProfile.SAMPLED))
+        self.assertIn("TradeService._execute_trade", profile.stacks)
+
+    def test_stack_profiler_self_time(self):
+        """Test that self time is attributed to the full stack of each call."""
+        def inner():
+            return sum(range(1000))
+
+        def outer():
+            return inner() + inner()
+
+        with StackProfiler() as profiler:
+            outer()
+
+        stacks = {tuple(frame.rpartition(":")[2] for frame in stack): nanoseconds for stack, nanoseconds in profiler.stacks.items()}
+        outer_name = "ProfilingTestCase.test_stack_profiler_self_time.<locals>.outer"
+        inner_name = "ProfilingTestCase.test_stack_profiler_self_time.<locals>.inner"
+        self.assertIn((outer_name, inner_name, "builtins.sum"), stacks)
+        self.assertGreater(stacks[(outer_name,)], 0)
+
+    def test_command_lists_and_aggregates(self):
+        """Test that the command lists profiles and sums their stacks into one collapsed file."""
+        self.client.force_authenticate(self.admin)
+        for _ in range(2):
+            self.client.get(reverse("inventory-view", args=[self.sender.id]), HTTP_X_PROFILE="1")
+
+        out = StringIO()
+        call_command("profiles", "--endpoint", "GET /inventory/<int:user_id>/", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+        output = os.path.join(tempfile.mkdtemp(), "inventory.collapsed")
+        out = StringIO()
+        call_command("profiles", "--aggregate", "--output", output, "--top", "3", stdout=out, stderr=StringIO())
+        with open(output) as collapsed:
+            total = sum(int(line.rpartition(" ")[2]) for line in collapsed)
+        self.assertEqual(total, sum(
+            int(line.rpartition(" ")[2]) for profile in RequestProfile.objects.all() for line in profile.stacks.splitlines()
+        ))
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
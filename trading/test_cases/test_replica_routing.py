@@ -0,0 +1,88 @@
+from django.core.cache import cache, caches
+from django.db import connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from trading.models import User, Weapon, Inventory
+from trading.services.trade_service import TradeService
+
+
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """Test cases for read-replica routing with per-user read-your-writes stickiness."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A second connection to the test database stands in for the replica. The alias only exists
+        # while this test case runs, so it is allowed here instead of in the class attribute.
+        connections.settings["replica"] = {**connections["default"].settings_dict, "TEST": {"MIRROR": "default"}}
+        cls.databases = {"default", "replica"}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.databases = {"default"}
+        super().tearDownClass()
+
+    def setUp(self):
+        """Set up two traders and a bystander, and clear the pins and inventory snapshots."""
+        cache.clear()
+        caches["inventory"].clear()
+        self.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        self.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+        self.bystander = User.objects.create(username="frodo", user_type=User.ELF)
+        self.sword = Weapon.objects.create(type=Weapon.SWORD)
+        self.staff = Weapon.objects.create(type=Weapon.STAFF)
+        Inventory.objects.create(user=self.sender, weapon=self.sword, quantity=5)
+        Inventory.objects.create(user=self.receiver, weapon=self.staff, quantity=5)
+
+    def _trade(self):
+        trade_offer = TradeService.create_trade_offer(
+            self.sender.id, self.receiver.id, [{"weapon_id": self.sword.id, "quantity": 1}], [{"weapon_id": self.staff.id, "quantity": 1}],
+        )
+        return TradeService.process_trade_offer(trade_offer.id, self.receiver.id, "ACCEPT")
+
+    def _aliases(self, path, params=None):
+        """Returns the aliases that served the request's queries."""
+        with CaptureQueriesContext(connections["default"]) as primary, CaptureQueriesContext(connections["replica"]) as replica:
+            response = self.client.get(path, params)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return {alias for alias, queries in (("default", primary), ("replica", replica)) if len(queries)}
+
+    def test_read_only_endpoints_use_replica(self):
+        """Test that history, inventory, stats and export reads are served by the replica."""
+        user_id = self.bystander.id
+        self.assertEqual(self._aliases(reverse("trade-offer-history"), {"user_id": user_id}), {"replica"})
+        self.assertEqual(self._aliases(reverse("inventory-view", args=[user_id])), {"replica"})
+        self.assertEqual(self._aliases(reverse("user-trade-stats", args=[user_id])), {"replica"})
+        self.assertEqual(self._aliases(reverse("trade-offer-export"), {"user_id": user_id}), {"replica"})
+
+    def test_writes_stay_on_primary(self):
+        """Test that trade creation and acceptance never touch the replica."""
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            self._trade()
+        self.assertEqual(len(replica), 0)
+
+    def test_read_your_writes(self):
+        """Test that both parties of an accepted trade read from the primary while others keep using the replica."""
+        self._trade()
+
+        for user in (self.sender, self.receiver):
+            self.assertEqual(self._aliases(reverse("trade-offer-history"), {"user_id": user.id}), {"default"})
+            self.assertEqual(self._aliases(reverse("inventory-view", args=[user.id])), {"default"})
+        self.assertEqual(self._aliases(reverse("trade-offer-history"), {"user_id": self.bystander.id}), {"replica"})
+
+        cache.clear()
+        self.assertEqual(self._aliases(reverse("trade-offer-history"), {"user_id": self.sender.id}), {"replica"})
+
+    def test_inventory_edit_pins_user(self):
+        """Test that a row-level inventory edit pins its user, so the new snapshot is built from the primary."""
+        self.assertEqual(self._aliases(reverse("inventory-view", args=[self.bystander.id])), {"replica"})
+        Inventory.objects.create(user=self.bystander, weapon=self.staff, quantity=1)
+
+        self.assertEqual(self._aliases(reverse("inventory-view", args=[self.bystander.id])), {"default"})
+        self.assertEqual(self.client.get(reverse("inventory-view", args=[self.bystander.id])).json()[0]["quantity"], 1)
@@ -0,0 +1,93 @@
+from io import StringIO
+import json
+from unittest import skipUnless
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from trading.models import User, Weapon, WeaponVariant, Inventory, AnalyticsResult
+from trading.services.analytics_service import TradeAnalyticsService
+from trading.services.trade_service import TradeService
+
+
+@skipUnless(TradeAnalyticsService.available(), "NumPy is not installed")
+class TradeAnalyticsTestCase(TestCase):
+    """Test cases for the NumPy trade analytics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up three users and two accepted trades of red swords for staffs."""
+        cls.gandalf = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.gimli = User.objects.create(username="gimli", user_type=User.DWARF)
+        cls.frodo = User.objects.create(username="frodo", user_type=User.ELF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+
+        Inventory.objects.create(user=cls.gandalf, weapon=cls.sword, variant=cls.red_sword, quantity=10)
+        Inventory.objects.create(user=cls.gimli, weapon=cls.staff, quantity=10)
+        Inventory.objects.create(user=cls.frodo, weapon=cls.staff, quantity=4)
+
+        for receiver, swords in ((cls.gimli, 2), (cls.frodo, 1)):
+            trade_offer = TradeService.create_trade_offer(
+                cls.gandalf.id, receiver.id,
+                [{"weapon_id": cls.sword.id, "variant_id": cls.red_sword.id, "quantity": swords}],
+                [{"weapon_id": cls.staff.id, "quantity": 1}],
+            )
+            TradeService.process_trade_offer(trade_offer.id, receiver.id, "ACCEPT")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_exchange_rates(self):
+        """Test that both directions of a pair get a volume-weighted rate."""
+        rates = TradeAnalyticsService.compute(TradeAnalyticsService.EXCHANGE_RATES)
+
+        by_base = {(rate["base_weapon_id"], rate["base_variant_id"]): rate for rate in rates}
+        self.assertAlmostEqual(by_base[(self.sword.id, self.red_sword.id)]["ratio"], 2 / 3)
+        self.assertEqual(by_base[(self.staff.id, None)]["ratio"], 1.5)
+        self.assertEqual(by_base[(self.staff.id, None)]["trades"], 2)
+
+    def test_centrality(self):
+        """Test that the user trading with everyone ranks first and the ranks sum to one."""
+        users = TradeAnalyticsService.compute(TradeAnalyticsService.CENTRALITY)
+
+        self.assertEqual(users[0]["user_id"], self.gandalf.id)
+        self.assertEqual((users[0]["counterparties"], users[0]["sent_quantity"], users[0]["received_quantity"]), (2, 3, 2))
+        self.assertAlmostEqual(sum(user["pagerank"] for user in users), 1.0)
+
+    def test_inventory_distribution(self):
+        """Test the holders, percentiles and Gini coefficient of each instrument."""
+        staff = next(row for row in TradeAnalyticsService.compute(TradeAnalyticsService.INVENTORY) if row["weapon_id"] == self.staff.id)
+
+        self.assertEqual({key: staff[key] for key in ("variant_id", "holders", "total_quantity", "p50", "max")}, {
+            "variant_id": None, "holders": 3, "total_quantity": 14, "p50": 3, "max": 9,
+        })
+        self.assertAlmostEqual(staff["gini"], 2 * (1 * 2 + 2 * 3 + 3 * 9) / (3 * 14) - 4 / 3)
+
+    def test_endpoint_serves_stored_results(self):
+        """Test that the endpoint never computes a metric and serves the stored result from the cache."""
+        url = reverse("trade-analytics", args=[TradeAnalyticsService.CENTRALITY])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).status_code, 503)
+
+        TradeAnalyticsService.store(TradeAnalyticsService.CENTRALITY)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"limit": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIn("computed_at", response.data)
+
+        self.assertEqual(self.client.get(reverse("trade-analytics", args=["volatility"])).status_code, 400)
+
+    def test_command(self):
+        """Test that the command prints the metric as JSON and stores it with --store."""
+        out = StringIO()
+        call_command("trade_analytics", TradeAnalyticsService.INVENTORY, "--limit", "1", stdout=out)
+        self.assertEqual(len(json.loads(out.getvalue())), 1)
+        self.assertFalse(AnalyticsResult.objects.exists())
+
+        call_command("trade_analytics", TradeAnalyticsService.INVENTORY, "--store", "--limit", "1", stdout=StringIO())
+        self.assertEqual(len(AnalyticsResult.objects.get(metric=TradeAnalyticsService.INVENTORY).results), 2)
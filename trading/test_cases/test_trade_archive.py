@@ -0,0 +1,119 @@
+import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils.timezone import now, timedelta
+from trading.models import TradeOffer, TradeItem, ArchivedTradeOffer, ArchivedTradeItem, Ledger, User, Weapon
+from trading.services.archive_service import TradeArchiveService
+from trading.services.history_service import TradeHistoryService
+
+
+@override_settings(TRADE_ARCHIVE_AFTER_DAYS=30)
+class TradeArchiveTestCase(TestCase):
+    """Test cases for archiving settled trade offers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up old settled offers, an old pending offer and a recent accepted offer."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+
+        old = now() - timedelta(days=60)
+        cls.old_accepted = TradeOffer.objects.create(sender=cls.sender, receiver=cls.receiver, status=TradeOffer.ACCEPTED, created_at=old)
+        cls.old_rejected = TradeOffer.objects.create(sender=cls.sender, receiver=cls.receiver, status=TradeOffer.REJECTED, created_at=old + timedelta(days=1))
+        cls.old_pending = TradeOffer.objects.create(sender=cls.sender, receiver=cls.receiver, created_at=old + timedelta(days=2))
+        cls.recent = TradeOffer.objects.create(sender=cls.sender, receiver=cls.receiver, status=TradeOffer.ACCEPTED, created_at=now() - timedelta(days=1))
+
+        cls.item = TradeItem.objects.create(offer=cls.old_accepted, weapon=cls.sword, quantity=2, is_offered_by_sender=True)
+        cls.movement = Ledger.objects.create(trade_offer=cls.old_accepted, sender=cls.sender, receiver=cls.receiver, weapon=cls.sword, quantity=2)
+
+    def _history(self, **params):
+        response = self.client.get(reverse("trade-offer-history"), {"user_id": self.sender.id, **params})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_archives_old_settled_offers_with_items(self):
+        """Test that old accepted and rejected offers move with their items and keep their ids."""
+        self.assertEqual(TradeArchiveService.run(batch_size=1), 2)
+
+        self.assertEqual(set(ArchivedTradeOffer.objects.values_list("id", flat=True)), {self.old_accepted.id, self.old_rejected.id})
+        self.assertEqual(list(ArchivedTradeItem.objects.values_list("id", "offer_id", "quantity")), [(self.item.id, self.old_accepted.id, 2)])
+        self.assertEqual(set(TradeOffer.objects.values_list("id", flat=True)), {self.old_pending.id, self.recent.id})
+        self.assertFalse(TradeItem.objects.exists())
+
+        # Ledger entries outlive their offer.
+        self.assertEqual(Ledger.objects.get(id=self.movement.id).trade_offer_id, self.old_accepted.id)
+
+    def test_max_batches(self):
+        """Test that archiving stops after the given number of batches."""
+        self.assertEqual(TradeArchiveService.run(batch_size=1, max_batches=1), 1)
+        self.assertEqual(ArchivedTradeOffer.objects.get().id, self.old_accepted.id)
+
+    def test_history_merges_archived_offers(self):
+        """Test that history pages walk live and archived offers in one order."""
+        TradeArchiveService.run()
+
+        seen = []
+        params = {"page_size": 2}
+        while True:
+            response = self._history(**params)
+            seen += [offer["id"] for offer in response.json()]
+            if "X-Next-Cursor" not in response:
+                break
+            params["cursor"] = response["X-Next-Cursor"]
+
+        self.assertEqual(seen, [self.recent.id, self.old_pending.id, self.old_rejected.id, self.old_accepted.id])
+        archived = next(offer for offer in self._history().json() if offer["id"] == self.old_accepted.id)
+        self.assertEqual(archived["items"][0]["quantity"], 2)
+
+    def test_history_finds_offers_archived_mid_request(self):
+        """Test that offers archived between the page query and the offer lookup are still returned."""
+        page_ids = TradeHistoryService._page_ids
+
+        def archive_after_page_query(*args):
+            page = page_ids(*args)
+            TradeArchiveService.run()
+            return page
+
+        with mock.patch.object(TradeHistoryService, "_page_ids", side_effect=archive_after_page_query):
+            trade_offers, next_cursor = TradeHistoryService.get_page(self.sender.id, page_size=3)
+
+        self.assertEqual([offer.id for offer in trade_offers], [self.recent.id, self.old_pending.id, self.old_rejected.id])
+        self.assertIsInstance(trade_offers[2], ArchivedTradeOffer)
+        self.assertEqual(TradeHistoryService.decode_cursor(next_cursor)[1], self.old_rejected.id)
+
+    def test_recent_history_skips_archive(self):
+        """Test that a start date after the archive horizon does not query the archive tables."""
+        TradeArchiveService.run()
+        start_date = (now() - timedelta(days=7)).date().isoformat()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._history(start_date=start_date)
+        self.assertEqual([offer["id"] for offer in response.json()], [self.recent.id])
+        self.assertFalse(any(ArchivedTradeOffer._meta.db_table in query["sql"] for query in queries.captured_queries))
+
+    def test_pending_status_skips_archive(self):
+        """Test that only settled statuses can match archived offers."""
+        self.assertFalse(TradeArchiveService.may_contain({"status": TradeOffer.PENDING}))
+        self.assertTrue(TradeArchiveService.may_contain({"status": TradeOffer.ACCEPTED}))
+
+    def test_export_includes_archived_offers(self):
+        """Test that exports merge archived rows in trade offer id order."""
+        TradeArchiveService.run()
+        response = self.client.get(reverse("trade-offer-export"), {"user_id": self.sender.id})
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            [row["trade_offer_id"] for row in rows],
+            [self.old_accepted.id, self.old_rejected.id, self.old_pending.id, self.recent.id],
+        )
+
+    def test_archive_trades_command(self):
+        """Test the archive_trades management command."""
+        out = StringIO()
+        call_command("archive_trades", "--batch-size", "10", stdout=out)
+        self.assertIn("Archived 2 trade offers", out.getvalue())
@@ -0,0 +1,156 @@
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+from django.db import OperationalError, connection, transaction
+from django.db.models import Sum
+from django.test import TransactionTestCase, override_settings
+from trading.exceptions import TradeConflictError, TradeValidationError
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory, SettlementJob
+from trading.services.concurrency import retry_on_conflict
+from trading.services.settlement_service import SettlementService
+from trading.services.trade_service import TradeService
+
+
+@override_settings(TRADE_CONFLICT_MAX_RETRIES=100, TRADE_CONFLICT_BACKOFF_SECONDS=0.005, TRADE_CONFLICT_MAX_BACKOFF_SECONDS=0.05)
+class TradeConcurrencyTestCase(TransactionTestCase):
+    """Stress test accepting conflicting trade offers from many threads."""
+
+    USERS = 4
+    OFFERS = 300
+    THREADS = 8
+    STARTING_QUANTITY = 20
+
+    def setUp(self):
+        rng = random.Random(42)
+
+        self.users = [User.objects.create(username=f"trader{i}", user_type=User.ELF) for i in range(self.USERS)]
+        self.weapons = [Weapon.objects.create(type=Weapon.SWORD) for _ in range(self.USERS)]
+        self.variants = [WeaponVariant.objects.create(weapon=weapon, variant_name="Red") for weapon in self.weapons]
+
+        for user in self.users:
+            for weapon, variant in zip(self.weapons, self.variants):
+                Inventory.objects.create(user=user, weapon=weapon, variant=variant, quantity=self.STARTING_QUANTITY)
+
+        self.offers = []
+        for _ in range(self.OFFERS):
+            sender, receiver = rng.sample(self.users, 2)
+            offer = TradeOffer.objects.create(sender=sender, receiver=receiver)
+            for is_offered_by_sender in (True, False):
+                index = rng.randrange(len(self.weapons))
+                TradeItem.objects.create(
+                    offer=offer, weapon=self.weapons[index], variant=self.variants[index],
+                    quantity=rng.randint(1, 5), is_offered_by_sender=is_offered_by_sender,
+                )
+            self.offers.append(offer)
+
+    def _accept(self, offer):
+        try:
+            TradeService.process_trade_offer(offer.id, offer.receiver_id, "ACCEPT")
+            return True
+        except TradeValidationError:
+            return False
+        finally:
+            connection.close()
+
+    # SQLite ignores SELECT ... FOR UPDATE and serializes all writers, so only PostgreSQL exercises the
+    # id-ordered row locks and deadlock retries; TradeConflictRetryTestCase covers the retry path anywhere.
+    @skipUnless(connection.vendor == "postgresql", "Row-level locking needs PostgreSQL.")
+    def test_concurrent_accepts_never_lose_updates(self):
+        """Test that parallel accepts keep inventory consistent and never negative."""
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            outcomes = list(pool.map(self._accept, self.offers))
+
+        self.assertTrue(any(outcomes))
+        self.assertFalse(Inventory.objects.filter(quantity__lt=0).exists())
+
+        accepted_ids = set(TradeOffer.objects.filter(status=TradeOffer.ACCEPTED).values_list("id", flat=True))
+        self.assertEqual(accepted_ids, {offer.id for offer, accepted in zip(self.offers, outcomes) if accepted})
+        self._assert_consistent(accepted_ids)
+
+    @override_settings(TRADE_ASYNC_SETTLEMENT=True)
+    def test_worker_pool_settles_consistently(self):
+        """Test that settling queued offers on parallel worker threads keeps inventory consistent."""
+        for offer in self.offers:
+            TradeService.process_trade_offer(offer.id, offer.receiver_id, "ACCEPT")
+
+        # Small batches split into groups of disjoint users, which are settled on separate threads.
+        while SettlementService.run_batch(batch_size=2, workers=2):
+            pass
+
+        self.assertFalse(SettlementJob.objects.exclude(status__in=[SettlementJob.DONE, SettlementJob.FAILED]).exists())
+        self.assertFalse(TradeOffer.objects.filter(status=TradeOffer.SETTLING).exists())
+        self._assert_consistent(set(TradeOffer.objects.filter(status=TradeOffer.ACCEPTED).values_list("id", flat=True)))
+
+    def _assert_consistent(self, accepted_ids):
+        self.assertFalse(Inventory.objects.filter(quantity__lt=0).exists())
+
+        # Replay the accepted offers and compare with what ended up in the database.
+        expected = defaultdict(lambda: self.STARTING_QUANTITY)
+        for item in TradeItem.objects.filter(offer_id__in=accepted_ids).select_related("offer"):
+            giver, taker = (item.offer.sender_id, item.offer.receiver_id) if item.is_offered_by_sender else (item.offer.receiver_id, item.offer.sender_id)
+            expected[(giver, item.weapon_id)] -= item.quantity
+            expected[(taker, item.weapon_id)] += item.quantity
+
+        for inventory in Inventory.objects.all():
+            self.assertEqual(inventory.quantity, expected[(inventory.user_id, inventory.weapon_id)])
+
+        total = Inventory.objects.aggregate(total=Sum("quantity"))["total"]
+        self.assertEqual(total, self.USERS * len(self.weapons) * self.STARTING_QUANTITY)
+
+
+class SQLStateError(Exception):
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def conflict(sqlstate):
+    """Builds the OperationalError Django raises for a driver error carrying the SQLSTATE."""
+    error = OperationalError(f"SQLSTATE {sqlstate}")
+    error.__cause__ = SQLStateError(sqlstate)
+    return error
+
+
+@override_settings(TRADE_CONFLICT_MAX_RETRIES=2, TRADE_CONFLICT_BACKOFF_SECONDS=0)
+class TradeConflictRetryTestCase(TransactionTestCase):
+    """Test cases for retrying transactions that fail with serialization failures or deadlocks."""
+
+    def _flaky(self, errors):
+        calls = []
+
+        @retry_on_conflict
+        def work():
+            calls.append(connection.in_atomic_block)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return "done"
+
+        return work, calls
+
+    def test_serialization_failure_and_deadlock_are_retried(self):
+        """Test that 40001 and 40P01 errors rerun the whole transaction."""
+        work, calls = self._flaky([conflict("40001"), conflict("40P01")])
+        self.assertEqual(work(), "done")
+        self.assertEqual(calls, [True, True, True])
+
+    def test_gives_up_with_conflict_error(self):
+        """Test that a conflict persisting past the retry limit becomes a 409 TradeConflictError."""
+        work, calls = self._flaky([conflict("40P01")] * 3)
+        with self.assertRaises(TradeConflictError):
+            work()
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        """Test that errors other than lock conflicts are raised at once."""
+        work, calls = self._flaky([conflict("23505")])
+        with self.assertRaises(OperationalError):
+            work()
+        self.assertEqual(len(calls), 1)
+
+    def test_no_retry_inside_outer_transaction(self):
+        """Test that a conflict inside a caller's transaction is left to the caller."""
+        work, calls = self._flaky([conflict("40001")])
+        with self.assertRaises(OperationalError), transaction.atomic():
+            work()
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,99 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from trading.exceptions import TradeValidationError
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory, Ledger
+from trading.repositories.inventory_repository import InventoryRepository
+from trading.services.trade_service import TradeService
+
+
+class TradeExecutionTestCase(TestCase):
+    """Test cases for set-based trade execution."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up users with one variant of ten different weapons each."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.weapons = [Weapon.objects.create(type=Weapon.SWORD) for _ in range(10)]
+        cls.variants = [WeaponVariant.objects.create(weapon=weapon, variant_name="Red") for weapon in cls.weapons]
+
+        for weapon, variant in zip(cls.weapons[:5], cls.variants[:5]):
+            Inventory.objects.create(user=cls.sender, weapon=weapon, variant=variant, quantity=5)
+        for weapon, variant in zip(cls.weapons[5:], cls.variants[5:]):
+            Inventory.objects.create(user=cls.receiver, weapon=weapon, variant=variant, quantity=5)
+
+    def _create_offer(self, item_count):
+        offer = TradeOffer.objects.create(sender=self.sender, receiver=self.receiver)
+        for index in range(item_count):
+            TradeItem.objects.create(offer=offer, weapon=self.weapons[index], variant=self.variants[index], quantity=2, is_offered_by_sender=True)
+            TradeItem.objects.create(offer=offer, weapon=self.weapons[5 + index], variant=self.variants[5 + index], quantity=1, is_offered_by_sender=False)
+        return offer
+
+    def _quantity(self, user, index):
+        inventory = Inventory.objects.filter(user=user, weapon=self.weapons[index], variant=self.variants[index]).first()
+        return inventory.quantity if inventory else None
+
+    def test_execute_trade_moves_inventory(self):
+        """Test that debits and credits are applied for both parties."""
+        TradeService._execute_trade(self._create_offer(2))
+
+        self.assertEqual(self._quantity(self.sender, 0), 3)
+        self.assertEqual(self._quantity(self.receiver, 0), 2)
+        self.assertEqual(self._quantity(self.receiver, 5), 4)
+        self.assertEqual(self._quantity(self.sender, 5), 1)
+
+    def test_row_inserted_concurrently_is_added_to(self):
+        """Test that a missing row created by a concurrent trade after locking is updated instead of failing."""
+        rows = InventoryRepository.lock_inventory([self.receiver.id], [self.weapons[0].id])
+        Inventory.objects.create(user=self.receiver, weapon=self.weapons[0], variant=self.variants[0], quantity=2)
+
+        created = InventoryRepository.apply_deltas(rows, {(self.receiver.id, self.weapons[0].id, self.variants[0].id): 3})
+
+        self.assertEqual(created, [])
+        self.assertEqual(self._quantity(self.receiver, 0), 5)
+        self.assertIn((self.receiver.id, self.weapons[0].id, self.variants[0].id), rows)
+
+    def test_execute_trade_writes_ledger(self):
+        """Test that every item movement is recorded as one ledger entry."""
+        offer = self._create_offer(2)
+        TradeService._execute_trade(offer)
+
+        entries = Ledger.objects.filter(trade_offer=offer)
+        self.assertEqual(entries.count(), 4)
+        self.assertEqual(entries.filter(sender=self.sender, receiver=self.receiver).count(), 2)
+        self.assertEqual(entries.get(weapon=self.weapons[5]).quantity, 1)
+
+    def test_ledger_is_append_only(self):
+        """Test that ledger entries cannot be edited or deleted one by one."""
+        TradeService._execute_trade(self._create_offer(1))
+        entry = Ledger.objects.first()
+
+        entry.quantity = 100
+        with self.assertRaises(ValueError):
+            entry.save()
+        with self.assertRaises(ValueError):
+            entry.delete()
+
+    def test_query_count_is_constant(self):
+        """Test that the number of queries does not grow with the number of items."""
+        small_offer = self._create_offer(1)
+        with CaptureQueriesContext(connection) as small:
+            TradeService._execute_trade(small_offer)
+        small_offer_queries = len(small.captured_queries)
+
+        large_offer = self._create_offer(5)
+        with self.assertNumQueries(small_offer_queries):
+            TradeService._execute_trade(large_offer)
+
+    def test_insufficient_inventory_changes_nothing(self):
+        """Test that a failing validation leaves every inventory row untouched."""
+        offer = self._create_offer(2)
+        TradeItem.objects.create(offer=offer, weapon=self.weapons[2], variant=self.variants[2], quantity=10, is_offered_by_sender=True)
+
+        with self.assertRaises(TradeValidationError):
+            TradeService._execute_trade(offer)
+
+        self.assertEqual(self._quantity(self.sender, 0), 5)
+        self.assertIsNone(self._quantity(self.receiver, 0))
@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant
+
+
+class TradeExportTestCase(TestCase):
+    """Test cases for streaming trade history exports."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up an accepted two-item offer, a pending offer without items and an offer between other users."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+        cls.other = User.objects.create(username="frodo", user_type=User.ELF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+
+        cls.accepted = TradeOffer.objects.create(sender=cls.sender, receiver=cls.receiver, status=TradeOffer.ACCEPTED)
+        TradeItem.objects.create(offer=cls.accepted, weapon=cls.sword, variant=cls.red_sword, quantity=2, is_offered_by_sender=True)
+        TradeItem.objects.create(offer=cls.accepted, weapon=cls.staff, quantity=1, is_offered_by_sender=False)
+
+        cls.pending = TradeOffer.objects.create(sender=cls.receiver, receiver=cls.sender)
+        cls.unrelated = TradeOffer.objects.create(sender=cls.other, receiver=cls.receiver)
+
+    def _export(self, **params):
+        response = self.client.get(reverse("trade-offer-export"), params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_export_of_user(self):
+        """Test that a user's export has one line per item and one for an offer without items."""
+        rows = [json.loads(line) for line in self._export(user_id=self.sender.id).splitlines()]
+
+        self.assertEqual([row["trade_offer_id"] for row in rows], [self.accepted.id, self.accepted.id, self.pending.id])
+        self.assertEqual(rows[0]["status"], "Accepted")
+        self.assertEqual(rows[0]["sender_username"], "gandalf")
+        self.assertEqual(
+            {key: rows[0][key] for key in ("weapon_type", "variant_name", "quantity", "direction")},
+            {"weapon_type": "Sword", "variant_name": "Red", "quantity": 2, "direction": "offered"},
+        )
+        self.assertEqual(rows[1]["direction"], "requested")
+        self.assertIsNone(rows[2]["weapon_id"])
+
+    def test_csv_export_with_filters(self):
+        """Test a filtered CSV export of everyone's offers."""
+        rows = list(csv.DictReader(io.StringIO(self._export(file_format="csv", status=TradeOffer.PENDING))))
+
+        self.assertEqual([int(row["trade_offer_id"]) for row in rows], [self.pending.id, self.unrelated.id])
+        self.assertEqual(rows[0]["status"], "Pending")
+
+    def test_type_filter(self):
+        """Test exporting only the offers a user received."""
+        rows = [json.loads(line) for line in self._export(user_id=self.receiver.id, type="received").splitlines()]
+        self.assertEqual({row["trade_offer_id"] for row in rows}, {self.accepted.id, self.unrelated.id})
+
+    def test_invalid_parameters(self):
+        """Test that an unknown format or a type without a user is rejected."""
+        self.assertEqual(self.client.get(reverse("trade-offer-export"), {"file_format": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("trade-offer-export"), {"type": "sent"}).status_code, 400)
+
+    def test_export_command(self):
+        """Test that the command writes the same rows as the endpoint."""
+        out = io.StringIO()
+        call_command("export_trades", "--user", str(self.sender.id), "--chunk-size", "1", stdout=out)
+        self.assertEqual(out.getvalue(), self._export(user_id=self.sender.id))
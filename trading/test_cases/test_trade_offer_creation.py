@@ -2,7 +2,9 @@ import json
 from django.test import TestCase
 from django.urls import reverse
 from django.utils.timezone import now
-from trading.models import TradeOffer, User, Weapon, WeaponVariant, Inventory
+from trading.exceptions import TradeValidationError
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory
+from trading.services.trade_service import TradeService
 from rest_framework.test import APIClient
 
 class TradeOfferTestCase(TestCase):
@@ -79,6 +81,25 @@ class TradeOfferTestCase(TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("error", response.json())
 
+    def test_create_trade_offer_requires_receiver_unless_open(self):
+        """Test that a missing receiver_id is rejected unless the offer is explicitly open."""
+        data = {
+            "sender_id": self.sender.id,
+            "offered_items": [{"weapon_id": self.sword.id, "variant_id": self.red_sword.id, "quantity": 1}],
+        }
+        response = self.client.post(reverse("trade-offer-create"), data=json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("receiver_id", response.json())
+
+        response = self.client.post(
+            reverse("trade-offer-create"), data=json.dumps({**data, "open": True, "receiver_id": self.receiver.id}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(reverse("trade-offer-create"), data=json.dumps({**data, "open": True}), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(TradeOffer.objects.get(id=response.json()["trade_offer_id"]).receiver_id)
+
     def test_accept_trade_offer(self):
         """Test successful trade offer acceptance."""
         data = {"receiver_id": self.receiver.id, "action": "ACCEPT"}
@@ -133,3 +154,166 @@ class TradeOfferTestCase(TestCase):
         )
         self.assertEqual(response.status_code, 400)
         self.assertIn("error", response.json())
+
+
+class TradeOfferValidationTestCase(TestCase):
+    """Test cases for batched trade offer validation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up a sender owning one variant of fifty different weapons."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.weapons = [Weapon.objects.create(type=Weapon.SWORD) for _ in range(50)]
+        cls.variants = [WeaponVariant.objects.create(weapon=weapon, variant_name="Red") for weapon in cls.weapons]
+
+        for weapon, variant in zip(cls.weapons, cls.variants):
+            Inventory.objects.create(user=cls.sender, weapon=weapon, variant=variant, quantity=2)
+
+    def _items(self, count, quantity=1):
+        return [{"weapon_id": weapon.id, "variant_id": variant.id, "quantity": quantity} for weapon, variant in zip(self.weapons[:count], self.variants[:count])]
+
+    def test_query_count_does_not_grow_with_items(self):
+        """Test that validating and creating an offer runs a fixed number of queries."""
+        # Includes one INSERT and one UPDATE maintaining the users' trade statistics.
+        with self.assertNumQueries(11):
+            TradeService.create_trade_offer(self.sender.id, self.receiver.id, self._items(1), self._items(1))
+
+        with self.assertNumQueries(11):
+            TradeService.create_trade_offer(self.sender.id, self.receiver.id, self._items(50), self._items(50))
+
+        self.assertEqual(TradeItem.objects.count(), 102)
+
+    def test_duplicate_lines_are_validated_together(self):
+        """Test that repeated lines for the same weapon are summed before checking inventory."""
+        with self.assertRaises(TradeValidationError):
+            TradeService.create_trade_offer(self.sender.id, self.receiver.id, self._items(1) * 3, [])
+
+    def test_variant_of_another_weapon_is_rejected(self):
+        """Test that a variant must belong to the weapon it is offered with."""
+        items = [{"weapon_id": self.weapons[0].id, "variant_id": self.variants[1].id, "quantity": 1}]
+        with self.assertRaises(TradeValidationError):
+            TradeService.create_trade_offer(self.sender.id, self.receiver.id, items, [])
+
+
+class TradeOfferBulkCreationTestCase(TestCase):
+    """Test cases for the bulk trade offer creation API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up two traders owning one weapon each."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+        cls.blue_staff = WeaponVariant.objects.create(weapon=cls.staff, variant_name="Blue")
+
+        Inventory.objects.create(user=cls.sender, weapon=cls.sword, variant=cls.red_sword, quantity=3)
+        Inventory.objects.create(user=cls.receiver, weapon=cls.staff, variant=cls.blue_staff, quantity=2)
+
+    def _offer(self, quantity=1, weapon_id=None):
+        return {
+            "sender_id": self.sender.id,
+            "receiver_id": self.receiver.id,
+            "offered_items": [{"weapon_id": weapon_id or self.sword.id, "variant_id": self.red_sword.id, "quantity": quantity}],
+            "requested_items": [{"weapon_id": self.staff.id, "variant_id": self.blue_staff.id, "quantity": 1}],
+        }
+
+    def _post(self, offers):
+        return self.client.post(reverse("trade-offer-bulk-create"), data=json.dumps({"offers": offers}), content_type="application/json")
+
+    def test_bulk_create_trade_offers(self):
+        """Test creating several offers in one request."""
+        response = self._post([self._offer(), self._offer(2)])
+        self.assertEqual(response.status_code, 201)
+
+        ids = [result["trade_offer_id"] for result in response.json()["results"]]
+        self.assertEqual(TradeOffer.objects.filter(id__in=ids).count(), 2)
+        self.assertEqual(TradeItem.objects.filter(offer_id__in=ids).count(), 4)
+
+    def test_partial_failure_is_reported_per_offer(self):
+        """Test that invalid offers are reported without blocking the valid ones."""
+        response = self._post([self._offer(), self._offer(10), self._offer(weapon_id=999)])
+        self.assertEqual(response.status_code, 207)
+
+        results = response.json()["results"]
+        self.assertIn("trade_offer_id", results[0])
+        self.assertIn("does not have enough", results[1]["error"])
+        self.assertEqual(results[2], {"index": 2, "error": "Weapon with ID 999 does not exist."})
+        self.assertEqual(TradeOffer.objects.count(), 1)
+
+    def test_query_count_does_not_grow_with_offers(self):
+        """Test that validating and creating offers in bulk runs a fixed number of queries."""
+        with self.assertNumQueries(10):
+            TradeService.create_trade_offers([self._offer()])
+        with self.assertNumQueries(10):
+            TradeService.create_trade_offers([self._offer() for _ in range(20)])
+
+
+class TradeOfferBatchProcessTestCase(TestCase):
+    """Test cases for accepting and rejecting many offers in one request."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up pending offers from two senders to one receiver."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.other_sender = User.objects.create(username="frodo", user_type=User.ELF)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+        Inventory.objects.create(user=cls.sender, weapon=cls.sword, variant=cls.red_sword, quantity=3)
+
+        cls.offers = []
+        for _ in range(3):
+            offer = TradeOffer.objects.create(sender=cls.sender, receiver=cls.receiver)
+            TradeItem.objects.create(offer=offer, weapon=cls.sword, variant=cls.red_sword, quantity=2, is_offered_by_sender=True)
+            cls.offers.append(offer)
+
+        cls.other_offers = [TradeOffer.objects.create(sender=cls.other_sender, receiver=cls.receiver) for _ in range(2)]
+        cls.foreign_offer = TradeOffer.objects.create(sender=cls.receiver, receiver=cls.sender)
+
+    def _post(self, data):
+        return self.client.post(reverse("trade-offer-batch-process"), data=json.dumps(data), content_type="application/json")
+
+    def test_batch_accept_and_reject(self):
+        """Test that accepts run in order against shared balances and rejects are applied together."""
+        response = self._post({
+            "receiver_id": self.receiver.id,
+            "actions": [
+                {"trade_offer_id": self.offers[1].id, "action": "ACCEPT"},
+                {"trade_offer_id": self.offers[0].id, "action": "ACCEPT"},
+                {"trade_offer_id": self.offers[2].id, "action": "REJECT"},
+                {"trade_offer_id": self.foreign_offer.id, "action": "ACCEPT"},
+            ],
+        })
+        self.assertEqual(response.status_code, 200)
+
+        results = {result["trade_offer_id"]: result for result in response.json()["results"]}
+        self.assertEqual(results[self.offers[0].id]["status"], "Accepted")
+        self.assertIn("does not have enough", results[self.offers[1].id]["error"])
+        self.assertEqual(results[self.offers[2].id]["status"], "Rejected")
+        self.assertEqual(results[self.foreign_offer.id]["error"], "Only the receiver can accept or reject this trade.")
+
+        self.assertEqual(Inventory.objects.get(user=self.receiver, weapon=self.sword).quantity, 2)
+        self.assertEqual(TradeOffer.objects.get(id=self.offers[1].id).status, TradeOffer.PENDING)
+
+    def test_reject_all_pending_from_sender(self):
+        """Test rejecting every pending offer from one sender."""
+        response = self._post({"receiver_id": self.receiver.id, "reject_pending_from": self.other_sender.id})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            response.json()["results"],
+            [{"trade_offer_id": offer.id, "status": "Rejected"} for offer in self.other_offers],
+        )
+        self.assertEqual(TradeOffer.objects.filter(sender=self.sender, status=TradeOffer.PENDING).count(), 3)
+
+    def test_duplicate_offers_are_rejected(self):
+        """Test that an offer cannot be listed twice."""
+        action = {"trade_offer_id": self.offers[0].id, "action": "ACCEPT"}
+        response = self._post({"receiver_id": self.receiver.id, "actions": [action, action]})
+        self.assertEqual(response.status_code, 400)
@@ -2,7 +2,7 @@ import json
 from django.test import TestCase
 from django.urls import reverse
 from django.utils.timezone import now, timedelta
-from trading.models import TradeOffer, User, Weapon, WeaponVariant
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant
 from django.utils.timezone import make_aware
 from datetime import datetime
 
@@ -94,3 +94,90 @@ class TradeOfferHistoryTestCase(TestCase):
         response = self.client.get(reverse("trade-offer-history"), {"user_id": self.receiver.id, "type": "invalid"})
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json(), {"error": "Invalid type parameter"})
+
+    def test_results_are_newest_first(self):
+        """Test that trade offers are ordered by creation time, newest first."""
+        response = self.client.get(reverse("trade-offer-history"), {"user_id": self.receiver.id})
+        self.assertEqual(
+            [offer["id"] for offer in response.json()],
+            [self.trade_pending.id, self.trade_rejected.id, self.trade_accepted.id],
+        )
+
+    def test_keyset_pagination(self):
+        """Test walking the history page by page with the returned cursor."""
+        seen = []
+        params = {"user_id": self.receiver.id, "page_size": 2}
+
+        response = self.client.get(reverse("trade-offer-history"), params)
+        self.assertEqual(len(response.json()), 2)
+        seen += [offer["id"] for offer in response.json()]
+        self.assertIn("X-Next-Cursor", response)
+        self.assertIn('rel="next"', response["Link"])
+
+        response = self.client.get(reverse("trade-offer-history"), {**params, "cursor": response["X-Next-Cursor"]})
+        self.assertEqual(len(response.json()), 1)
+        seen += [offer["id"] for offer in response.json()]
+        self.assertNotIn("X-Next-Cursor", response)
+
+        self.assertEqual(seen, [self.trade_pending.id, self.trade_rejected.id, self.trade_accepted.id])
+
+    def test_pagination_with_identical_timestamps(self):
+        """Test that offers created at the same instant are neither skipped nor repeated."""
+        created_at = make_aware(datetime(2025, 4, 1, 9, 0))
+        same_time = [TradeOffer.objects.create(sender=self.receiver, receiver=self.sender, created_at=created_at) for _ in range(3)]
+
+        seen = []
+        params = {"user_id": self.receiver.id, "page_size": 1, "start_date": "2025-04-01"}
+        while True:
+            response = self.client.get(reverse("trade-offer-history"), params)
+            seen += [offer["id"] for offer in response.json()]
+            if "X-Next-Cursor" not in response:
+                break
+            params["cursor"] = response["X-Next-Cursor"]
+
+        self.assertEqual(seen, sorted((offer.id for offer in same_time), reverse=True))
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        response = self.client.get(reverse("trade-offer-history"), {"user_id": self.receiver.id, "cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid cursor"})
+
+
+class TradeOfferHistoryQueryCountTestCase(TestCase):
+    """Query-count regression tests for the Trade Offer History API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up 100 offers with one offered and one requested item each."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+
+        offers = TradeOffer.objects.bulk_create(
+            TradeOffer(sender=cls.sender, receiver=cls.receiver, created_at=now() - timedelta(minutes=i)) for i in range(100)
+        )
+        TradeItem.objects.bulk_create(
+            item
+            for offer in offers
+            for item in (
+                TradeItem(offer=offer, weapon=cls.sword, variant=cls.red_sword, quantity=2, is_offered_by_sender=True),
+                TradeItem(offer=offer, weapon=cls.staff, quantity=1, is_offered_by_sender=False),
+            )
+        )
+
+    def test_page_of_100_offers_query_count(self):
+        """Test that a page of 100 offers with their items is built in a constant number of queries."""
+        # One UNION for the page ids, one for the offers with both users, one for all items.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("trade-offer-history"), {"user_id": self.receiver.id, "page_size": 100})
+
+        self.assertEqual(len(response.json()), 100)
+        self.assertEqual(response.json()[0]["sender_username"], "gandalf")
+        self.assertEqual(response.json()[0]["items"], [
+            {"weapon_id": self.sword.id, "weapon_name": "Sword", "variant_id": self.red_sword.id, "variant_name": "Red", "quantity": 2, "direction": "offered"},
+            {"weapon_id": self.staff.id, "weapon_name": "Staff", "variant_id": None, "variant_name": None, "quantity": 1, "direction": "requested"},
+        ])
@@ -0,0 +1,112 @@
+import json
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory, Ledger
+from trading.services.ledger_service import LedgerReplayService
+from trading.services.trade_service import TradeService
+
+
+class TradeReversalTestCase(TestCase):
+    """Test cases for reversing accepted trade offers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up a sword that travels gandalf -> gimli -> frodo through two accepted offers."""
+        cls.gandalf = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.gimli = User.objects.create(username="gimli", user_type=User.DWARF)
+        cls.frodo = User.objects.create(username="frodo", user_type=User.ELF)
+        cls.admin = User.objects.create(username="elrond", user_type=User.ELF, is_staff=True)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+        cls.blue_staff = WeaponVariant.objects.create(weapon=cls.staff, variant_name="Blue")
+
+        inventory = [
+            Inventory.objects.create(user=cls.gandalf, weapon=cls.sword, variant=cls.red_sword, quantity=1),
+            Inventory.objects.create(user=cls.gimli, weapon=cls.staff, variant=cls.blue_staff, quantity=1),
+        ]
+        Ledger.objects.bulk_create(Ledger.adjustment(row.user_id, row.weapon_id, row.variant_id, row.quantity) for row in inventory)
+
+        cls.first_trade = cls._accepted_offer(cls.gandalf, cls.gimli, [(cls.sword, cls.red_sword, True), (cls.staff, cls.blue_staff, False)])
+        cls.second_trade = cls._accepted_offer(cls.gimli, cls.frodo, [(cls.sword, cls.red_sword, True)])
+
+    @classmethod
+    def _accepted_offer(cls, sender, receiver, items):
+        offer = TradeOffer.objects.create(sender=sender, receiver=receiver)
+        for weapon, variant, is_offered_by_sender in items:
+            TradeItem.objects.create(offer=offer, weapon=weapon, variant=variant, quantity=1, is_offered_by_sender=is_offered_by_sender)
+        TradeService.process_trade_offer(offer.id, receiver.id, "ACCEPT")
+        return offer
+
+    def _quantity(self, user, weapon):
+        inventory = Inventory.objects.filter(user=user, weapon=weapon).first()
+        return inventory.quantity if inventory else 0
+
+    def test_reverse_trade_offer(self):
+        """Test that reversing gives items back and flags the original ledger entries."""
+        TradeService.reverse_trade_offer(self.second_trade.id)
+
+        self.second_trade.refresh_from_db()
+        self.assertEqual(self.second_trade.status, TradeOffer.REVERSED)
+        self.assertEqual(self._quantity(self.gimli, self.sword), 1)
+        self.assertEqual(self._quantity(self.frodo, self.sword), 0)
+
+        original = Ledger.objects.get(trade_offer=self.second_trade, reversal_of__isnull=True)
+        self.assertTrue(original.reversed)
+        compensation = original.reversals.get()
+        self.assertEqual((compensation.sender_id, compensation.receiver_id), (self.frodo.id, self.gimli.id))
+
+    def test_reverse_requires_items_to_be_returnable(self):
+        """Test that a trade cannot be reversed once its items have been traded on."""
+        result = TradeService.reverse_trade_offers([self.first_trade.id])
+
+        self.assertEqual(result["reversed"], [])
+        self.assertIn("gimli does not have enough Sword", result["failed"][0]["error"])
+        self.assertEqual(self._quantity(self.gandalf, self.staff), 1)
+
+    def test_reverse_all_offers_of_user(self):
+        """Test that a user's offers are reversed newest first so chained trades unwind."""
+        result = TradeService.reverse_trade_offers(user_id=self.gimli.id, chunk_size=1)
+
+        self.assertEqual(sorted(result["reversed"]), [self.first_trade.id, self.second_trade.id])
+        self.assertEqual(result["failed"], [])
+        self.assertEqual(self._quantity(self.gandalf, self.sword), 1)
+        self.assertEqual(self._quantity(self.gimli, self.staff), 1)
+        self.assertEqual(LedgerReplayService.reconcile([self.gandalf.id, self.gimli.id, self.frodo.id]), [])
+
+    def test_reverse_is_not_repeatable(self):
+        """Test that an offer can only be reversed once."""
+        TradeService.reverse_trade_offers([self.second_trade.id])
+        result = TradeService.reverse_trade_offers([self.second_trade.id])
+        self.assertEqual(result["reversed"], [])
+        self.assertEqual(self._quantity(self.gimli, self.sword), 1)
+
+    def test_reverse_endpoint_is_admin_only(self):
+        """Test that only staff users can reverse trades through the API."""
+        client = APIClient()
+        url = reverse("trade-offer-reverse", args=[self.second_trade.id])
+
+        self.assertEqual(client.post(url).status_code, 403)
+
+        client.force_authenticate(self.admin)
+        response = client.post(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "Reversed")
+
+    def test_bulk_reverse_endpoint(self):
+        """Test reversing a batch of offers through the API."""
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.post(
+            reverse("trade-offer-bulk-reverse"),
+            data=json.dumps({"trade_offer_ids": [self.first_trade.id, self.second_trade.id]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["reversed"], [self.first_trade.id, self.second_trade.id])
+
+        response = client.post(reverse("trade-offer-bulk-reverse"), data={}, format="json")
+        self.assertEqual(response.status_code, 400)
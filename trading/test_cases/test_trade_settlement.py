@@ -0,0 +1,153 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from trading.checks import check_shared_caches
+from trading.models import TradeOffer, TradeItem, User, Weapon, WeaponVariant, Inventory, SettlementJob, UserTradeStats
+from trading.services.settlement_service import SettlementService
+
+
+@override_settings(TRADE_ASYNC_SETTLEMENT=True)
+class TradeSettlementTestCase(TestCase):
+    """Test cases for accepting offers in async settlement mode."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up two senders with one sword each and pending offers to two receivers."""
+        cls.gandalf = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.gimli = User.objects.create(username="gimli", user_type=User.DWARF)
+        cls.frodo = User.objects.create(username="frodo", user_type=User.ELF)
+        cls.sam = User.objects.create(username="sam", user_type=User.ELF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+        Inventory.objects.create(user=cls.gandalf, weapon=cls.sword, variant=cls.red_sword, quantity=1)
+        Inventory.objects.create(user=cls.frodo, weapon=cls.sword, variant=cls.red_sword, quantity=1)
+
+        cls.first_offer = cls._offer(cls.gandalf, cls.gimli)
+        cls.second_offer = cls._offer(cls.gandalf, cls.gimli)
+        cls.third_offer = cls._offer(cls.frodo, cls.sam)
+
+    @classmethod
+    def _offer(cls, sender, receiver):
+        offer = TradeOffer.objects.create(sender=sender, receiver=receiver)
+        TradeItem.objects.create(offer=offer, weapon=cls.sword, variant=cls.red_sword, quantity=1, is_offered_by_sender=True)
+        return offer
+
+    def _accept(self, offer):
+        return self.client.patch(
+            reverse("trade-offer-update", args=[offer.id]),
+            data=json.dumps({"receiver_id": offer.receiver_id, "action": "ACCEPT"}),
+            content_type="application/json",
+        )
+
+    def test_accept_is_queued(self):
+        """Test that accepting returns 202 with a status URL and leaves inventory untouched."""
+        response = self._accept(self.first_offer)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], "Settling")
+        self.assertTrue(response.json()["status_url"].endswith(reverse("trade-offer-settlement", args=[self.first_offer.id])))
+
+        self.assertEqual(Inventory.objects.get(user=self.gandalf).quantity, 1)
+        self.assertEqual(SettlementJob.objects.get(trade_offer=self.first_offer).status, SettlementJob.QUEUED)
+
+    def test_worker_settles_queued_offers(self):
+        """Test that the worker settles conflicting offers in queue order and reports failures."""
+        for offer in (self.first_offer, self.second_offer, self.third_offer):
+            self._accept(offer)
+
+        outcomes = SettlementService.run_batch(workers=1)
+        self.assertEqual(outcomes, {SettlementService.SETTLED: 2, SettlementService.FAILED: 1})
+
+        self.assertEqual(Inventory.objects.get(user=self.gimli).quantity, 1)
+        self.assertEqual(Inventory.objects.get(user=self.sam).quantity, 1)
+
+        response = self.client.get(reverse("trade-offer-settlement", args=[self.first_offer.id]))
+        self.assertEqual(response.json()["status"], "Accepted")
+        self.assertEqual(response.json()["settlement"]["status"], "Done")
+
+        response = self.client.get(reverse("trade-offer-settlement", args=[self.second_offer.id]))
+        self.assertEqual(response.json()["status"], "Pending")
+        self.assertIn("does not have enough", response.json()["settlement"]["error"])
+
+    def test_batch_accept_is_queued(self):
+        """Test that batch accepts are queued like single accepts and settled by the worker."""
+        response = self.client.post(
+            reverse("trade-offer-batch-process"),
+            data=json.dumps({"receiver_id": self.gimli.id, "actions": [{"trade_offer_id": self.first_offer.id, "action": "ACCEPT"}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        result = response.json()["results"][0]
+        self.assertEqual(result["status"], "Settling")
+        self.assertTrue(result["status_url"].endswith(reverse("trade-offer-settlement", args=[self.first_offer.id])))
+
+        self.assertEqual(Inventory.objects.get(user=self.gandalf).quantity, 1)
+        self.assertEqual(SettlementJob.objects.get(trade_offer=self.first_offer).status, SettlementJob.QUEUED)
+
+        self.assertEqual(SettlementService.run_batch(workers=1), {SettlementService.SETTLED: 1})
+        self.assertEqual(Inventory.objects.get(user=self.gimli).quantity, 1)
+
+    def test_failed_offer_can_be_accepted_again(self):
+        """Test that an offer returned to pending can be queued again."""
+        self._accept(self.second_offer)
+        self._accept(self.first_offer)
+        SettlementService.run_batch(workers=1)
+
+        self.assertEqual(SettlementJob.objects.get(trade_offer=self.first_offer).status, SettlementJob.FAILED)
+        self.assertEqual(self._accept(self.first_offer).status_code, 202)
+
+        job = SettlementJob.objects.get(trade_offer=self.first_offer)
+        self.assertEqual((job.status, job.attempts, job.error), (SettlementJob.QUEUED, 0, ""))
+
+    def test_failed_fill_reopens_open_offer(self):
+        """Test that an open offer whose fill fails to settle is open again and not counted as received."""
+        open_offer = self._offer(self.gandalf, None)
+        self._accept(self.first_offer)
+        response = self.client.patch(
+            reverse("trade-offer-update", args=[open_offer.id]),
+            data=json.dumps({"receiver_id": self.sam.id, "action": "ACCEPT"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(UserTradeStats.objects.get(user=self.sam).received_count, 1)
+
+        self.assertEqual(SettlementService.run_batch(workers=1), {SettlementService.SETTLED: 1, SettlementService.FAILED: 1})
+
+        open_offer.refresh_from_db()
+        self.assertEqual((open_offer.status, open_offer.receiver_id), (TradeOffer.PENDING, None))
+        self.assertEqual(UserTradeStats.objects.get(user=self.sam).received_count, 0)
+
+    def test_groups_only_disjoint_users(self):
+        """Test that offers sharing a user are settled in the same group, in queue order."""
+        for offer in (self.first_offer, self.third_offer, self.second_offer):
+            self._accept(offer)
+
+        groups = SettlementService.group_by_users(SettlementService.claim_batch(10))
+        offer_ids = sorted([job.trade_offer_id for job in group] for group in groups)
+        self.assertEqual(offer_ids, [[self.first_offer.id, self.second_offer.id], [self.third_offer.id]])
+
+    def test_settle_trades_command(self):
+        """Test draining the queue with the settle_trades command."""
+        self._accept(self.third_offer)
+
+        out = StringIO()
+        call_command("settle_trades", "--once", "--workers", "1", stdout=out)
+        self.assertIn("Done: 1 settled, 0 failed, 0 requeued", out.getvalue())
+
+    @override_settings(TRADE_ASYNC_SETTLEMENT=False)
+    def test_synchronous_mode_settles_inline(self):
+        """Test that accepting settles immediately when async settlement is off."""
+        response = self._accept(self.first_offer)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "Accepted")
+        self.assertFalse(SettlementJob.objects.exists())
+
+    def test_async_settlement_requires_shared_caches(self):
+        """Test that the system check rejects process-local caches in async settlement mode."""
+        self.assertEqual([error.id for error in check_shared_caches(None)], ["trading.E001"])
+
+        shared = {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://localhost:6379"}
+        with self.settings(CACHES={"default": shared, "inventory": shared}):
+            self.assertEqual(check_shared_caches(None), [])
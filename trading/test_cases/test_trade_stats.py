@@ -0,0 +1,138 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from trading.models import TradeOffer, User, Weapon, WeaponVariant, Inventory, UserTradeStats, UserWeaponVolume
+from trading.services.stats_service import TradeStatsService
+from trading.services.trade_service import TradeService
+
+
+class TradeStatsTestCase(TestCase):
+    """Test cases for the incrementally maintained per-user trade statistics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up two users owning one weapon type each."""
+        cls.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        cls.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+
+        cls.sword = Weapon.objects.create(type=Weapon.SWORD)
+        cls.staff = Weapon.objects.create(type=Weapon.STAFF)
+        cls.red_sword = WeaponVariant.objects.create(weapon=cls.sword, variant_name="Red")
+
+        Inventory.objects.create(user=cls.sender, weapon=cls.sword, variant=cls.red_sword, quantity=5)
+        Inventory.objects.create(user=cls.receiver, weapon=cls.staff, quantity=5)
+
+    def _offer(self, sword_quantity=2):
+        return TradeService.create_trade_offer(
+            self.sender.id, self.receiver.id,
+            [{"weapon_id": self.sword.id, "variant_id": self.red_sword.id, "quantity": sword_quantity}],
+            [{"weapon_id": self.staff.id, "quantity": 1}],
+        )
+
+    def _trade(self):
+        accepted = self._offer()
+        TradeService.process_trade_offer(accepted.id, self.receiver.id, "ACCEPT")
+        rejected = self._offer(1)
+        TradeService.process_trade_offer(rejected.id, self.receiver.id, "REJECT")
+        reversed_offer = self._offer(1)
+        TradeService.process_trade_offer(reversed_offer.id, self.receiver.id, "ACCEPT")
+        TradeService.reverse_trade_offer(reversed_offer.id)
+        self._offer(1)
+
+    def _snapshot(self):
+        return [TradeStatsService.get_stats(user.id) for user in (self.sender, self.receiver)]
+
+    def test_counters_follow_trades(self):
+        """Test that creating, accepting, rejecting and reversing offers update both users' statistics."""
+        self._trade()
+
+        sender, receiver = self._snapshot()
+        self.assertEqual(
+            {key: sender[key] for key in ("sent_count", "received_count", "accepted_count", "rejected_count", "reversed_count")},
+            {"sent_count": 4, "received_count": 0, "accepted_count": 1, "rejected_count": 1, "reversed_count": 1},
+        )
+        self.assertEqual(receiver["received_count"], 4)
+        self.assertEqual(sender["volume"], [
+            {"weapon_type": "Sword", "sent_quantity": 2, "received_quantity": 0},
+            {"weapon_type": "Staff", "sent_quantity": 0, "received_quantity": 1},
+        ])
+
+    def test_rebuild_matches_incremental_counters(self):
+        """Test that the rebuild command reproduces the incrementally maintained tables."""
+        self._trade()
+        incremental = self._snapshot()
+
+        UserTradeStats.objects.all().delete()
+        UserWeaponVolume.objects.update(sent_quantity=0)
+        out = StringIO()
+        call_command("rebuild_trade_stats", stdout=out)
+
+        self.assertIn("Rebuilt trade statistics of 2 users.", out.getvalue())
+        self.assertEqual(self._snapshot(), incremental)
+
+    def test_stats_endpoint_reads_one_row(self):
+        """Test that the stats endpoint answers from the summary tables in two queries."""
+        self._trade()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("user-trade-stats", args=[self.receiver.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["accepted_count"], 1)
+
+    def test_user_without_trades(self):
+        """Test that a user without any trades gets zero counters."""
+        response = self.client.get(reverse("user-trade-stats", args=[self.sender.id]))
+        self.assertEqual(response.json()["sent_count"], 0)
+        self.assertEqual(response.json()["volume"], [])
+
+    def test_batch_processing_updates_counters(self):
+        """Test that the batch accept/reject endpoint keeps the counters in step."""
+        first, second = self._offer(), self._offer(1)
+        TradeService.process_trade_offers(self.receiver.id, [
+            {"trade_offer_id": first.id, "action": "ACCEPT"},
+            {"trade_offer_id": second.id, "action": "REJECT"},
+        ])
+
+        stats = TradeStatsService.get_stats(self.receiver.id)
+        self.assertEqual((stats["accepted_count"], stats["rejected_count"]), (1, 1))
+        self.assertEqual(TradeOffer.objects.filter(status=TradeOffer.ACCEPTED).count(), 1)
+
+
+@override_settings(TRADE_CONFLICT_BACKOFF_SECONDS=0)
+class TradeStatsConflictTestCase(TransactionTestCase):
+    """Test that offer creation retries when updating the statistics conflicts."""
+
+    def setUp(self):
+        """Set up a sender owning a sword and a receiver."""
+        self.sender = User.objects.create(username="gandalf", user_type=User.WIZARD)
+        self.receiver = User.objects.create(username="gimli", user_type=User.DWARF)
+        self.sword = Weapon.objects.create(type=Weapon.SWORD)
+        Inventory.objects.create(user=self.sender, weapon=self.sword, quantity=5)
+
+    def _conflict_once(self):
+        record_created = TradeStatsService.record_created
+        calls = []
+
+        def flaky(trade_offers):
+            calls.append(trade_offers)
+            if len(calls) == 1:
+                raise OperationalError("database is locked")
+            return record_created(trade_offers)
+
+        return mock.patch.object(TradeStatsService, "record_created", side_effect=flaky)
+
+    def test_create_retries_on_conflict(self):
+        """Test that single and bulk creation are retried as a whole after a conflict."""
+        items = [{"weapon_id": self.sword.id, "quantity": 1}]
+        with self._conflict_once():
+            TradeService.create_trade_offer(self.sender.id, self.receiver.id, items, [])
+        with self._conflict_once():
+            results = TradeService.create_trade_offers([{"sender_id": self.sender.id, "receiver_id": self.receiver.id, "offered_items": items}])
+
+        self.assertEqual(TradeOffer.objects.count(), 2)
+        self.assertIn(results[0]["trade_offer_id"], TradeOffer.objects.values_list("id", flat=True))
+        self.assertEqual(UserTradeStats.objects.get(user=self.sender).sent_count, 2)
+        self.assertEqual(UserTradeStats.objects.get(user=self.receiver).received_count, 2)
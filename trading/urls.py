@@ -1,9 +1,28 @@
 from django.urls import path
-from trading.views.trade import TradeOfferCreateView, TradeOfferUpdateView, TradeOfferHistoryView, InventoryView
+from trading.views.trade import (
+    TradeOfferCreateView, TradeOfferUpdateView, TradeOfferHistoryView, InventoryView,
+    TradeOfferBulkCreateView, TradeOfferBatchProcessView, TradeOfferReverseView, TradeOfferBulkReverseView,
+    TradeOfferSettlementView, TradeOfferExportView, UserTradeStatsView, MarketSeriesView,
+    TradeAnalyticsView,
+)
+from trading.views.async_read import AsyncInventoryView, AsyncTradeOfferHistoryView
+from trading.views.metrics import MetricsView
 
 urlpatterns = [
     path("trade-offer/", TradeOfferCreateView.as_view(), name="trade-offer-create"),
+    path("trade-offer/bulk/", TradeOfferBulkCreateView.as_view(), name="trade-offer-bulk-create"),
+    path("trade-offer/process/", TradeOfferBatchProcessView.as_view(), name="trade-offer-batch-process"),
     path("trade-offer/<int:trade_offer_id>/", TradeOfferUpdateView.as_view(), name="trade-offer-update"),
+    path("trade-offer/<int:trade_offer_id>/settlement/", TradeOfferSettlementView.as_view(), name="trade-offer-settlement"),
+    path("trade-offer/<int:trade_offer_id>/reverse/", TradeOfferReverseView.as_view(), name="trade-offer-reverse"),
+    path("trade-offer/reverse/", TradeOfferBulkReverseView.as_view(), name="trade-offer-bulk-reverse"),
     path("trade-offer/history/", TradeOfferHistoryView.as_view(), name="trade-offer-history"),
+    path("trade-offer/export/", TradeOfferExportView.as_view(), name="trade-offer-export"),
     path("inventory/<int:user_id>/", InventoryView.as_view(), name="inventory-view"),
+    path("users/<int:user_id>/stats/", UserTradeStatsView.as_view(), name="user-trade-stats"),
+    path("market/<int:weapon_id>/", MarketSeriesView.as_view(), name="market-series"),
+    path("analytics/<str:metric>/", TradeAnalyticsView.as_view(), name="trade-analytics"),
+    path("async/trade-offer/history/", AsyncTradeOfferHistoryView.as_view(), name="async-trade-offer-history"),
+    path("async/inventory/<int:user_id>/", AsyncInventoryView.as_view(), name="async-inventory-view"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
\ No newline at end of file
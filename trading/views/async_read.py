@@ -0,0 +1,64 @@
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import parse_etags, quote_etag
+from django.views import View
+from rest_framework.utils.urls import replace_query_param
+from trading.exceptions import TradeValidationError
+from trading.models import Inventory
+from trading.serializers.inventory import InventorySerializer
+from trading.serializers.trade import TradeOfferSerializer
+from trading.services.history_service import TradeHistoryService
+from trading.services.inventory_cache import InventoryCache
+from trading.views.mixins import ReplicaReadMixin
+
+# Native async versions of the read endpoints, for serving under an ASGI server such as uvicorn.
+# They return the same payloads and headers as InventoryView and TradeOfferHistoryView, but
+# query through the async ORM instead of holding a worker thread for the whole request.
+
+
+class AsyncInventoryView(ReplicaReadMixin, View):
+    """
+    Async InventoryView: returns a user's inventory from the read-through inventory cache.
+    """
+
+    async def get(self, request, user_id):
+        async def build():
+            queryset = Inventory.objects.filter(user_id=user_id).select_related("weapon", "variant").order_by("id")
+            return InventorySerializer([row async for row in queryset], many=True).data
+
+        snapshot = await InventoryCache.aget_snapshot(user_id, build)
+        etag = quote_etag(snapshot["etag"])
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponse(status=304)
+        else:
+            response = JsonResponse(snapshot["data"], safe=False)
+
+        response["ETag"] = etag
+        return response
+
+
+class AsyncTradeOfferHistoryView(ReplicaReadMixin, View):
+    """
+    Async TradeOfferHistoryView: keyset-paginated trade history, newest first.
+    """
+
+    async def get(self, request):
+        user_id = request.GET.get("user_id")
+        if not user_id:
+            return JsonResponse({"error": "user_id is required"}, status=400)
+
+        try:
+            direction, filters = TradeHistoryService.parse_filters(request.GET)
+            page_size = TradeHistoryService.parse_page_size(request.GET.get("page_size"))
+            trade_offers, next_cursor = await TradeHistoryService.aget_page(user_id, direction, filters, request.GET.get("cursor"), page_size)
+        except TradeValidationError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        response = JsonResponse(TradeOfferSerializer(trade_offers, many=True).data, safe=False)
+
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), "cursor", next_cursor)
+            response["X-Next-Cursor"] = next_cursor
+            response["Link"] = f'<{next_url}>; rel="next"'
+
+        return response
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from trading.services.metrics import Metrics
+
+
+class MetricsView(View):
+    """
+    Exposes the request and service histograms of this process in the Prometheus text format,
+    to clients in METRICS_ALLOWED_IPS or presenting METRICS_TOKEN as a bearer token.
+    """
+
+    def get(self, request):
+        if not self._allowed(request):
+            return HttpResponseForbidden()
+        return HttpResponse(Metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    @staticmethod
+    def _allowed(request):
+        token = settings.METRICS_TOKEN
+        if token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return True
+        return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
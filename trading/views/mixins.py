@@ -0,0 +1,43 @@
+from rest_framework.exceptions import APIException
+from trading.routers import ReplicaRouter
+from trading.services.metrics import Metrics
+from trading.services.profiling_service import ProfilingService
+
+
+class ProfiledViewMixin:
+    """
+    Profiles the dispatch of sampled requests (PROFILING_SAMPLE_RATE) and of requests sent with
+    "X-Profile: 1" by an admin, storing the collapsed stacks as a RequestProfile.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        reason = ProfilingService.reason(request, lambda: self._is_admin(request, *args, **kwargs))
+        if reason is None:
+            return super().dispatch(request, *args, **kwargs)
+        return ProfilingService.profile(Metrics.endpoint(request), reason, lambda: super(ProfiledViewMixin, self).dispatch(request, *args, **kwargs))
+
+    def _is_admin(self, request, *args, **kwargs):
+        # Authenticates with the view's own authentication classes, as IsAdminUser would.
+        try:
+            return self.initialize_request(request, *args, **kwargs).user.is_staff
+        except APIException:
+            return False
+
+
+class ReplicaReadMixin:
+    """
+    Serves a read-only view from the read replica (see ReplicaRouter). The user whose data is read
+    (the user_id URL argument or query parameter) stays on the primary right after their own writes.
+    Works for both sync and async views.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        user_ids = [kwargs.get("user_id", request.GET.get("user_id"))]
+        if self.view_is_async:
+            return self._adispatch(user_ids, request, *args, **kwargs)
+        with ReplicaRouter.replica_reads(user_ids):
+            return super().dispatch(request, *args, **kwargs)
+
+    async def _adispatch(self, user_ids, request, *args, **kwargs):
+        async with ReplicaRouter.areplica_reads(user_ids):
+            return await super().dispatch(request, *args, **kwargs)
@@ -1,18 +1,31 @@
 from rest_framework.generics import CreateAPIView, ListAPIView
 from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from trading.exceptions import TradeValidationError
-from trading.serializers.trade import TradeOfferSerializer
+from trading.serializers.trade import (
+    TradeOfferSerializer, TradeOfferBulkCreateSerializer, TradeOfferBatchProcessSerializer, TradeOfferReversalSerializer,
+)
 from trading.services.trade_service import TradeService
-from trading.models import TradeOffer, Inventory
-from django.db.models import Q
-from django.utils.dateparse import parse_date
+from trading.services.history_service import TradeHistoryService
+from trading.services.inventory_cache import InventoryCache
+from trading.services.export_service import TradeExportService
+from trading.services.stats_service import TradeStatsService
+from trading.services.market_service import MarketRollupService
+from trading.services.analytics_service import TradeAnalyticsService
+from trading.models import Inventory, TradeOffer
+from trading.views.mixins import ProfiledViewMixin, ReplicaReadMixin
 from trading.serializers.inventory import InventorySerializer
-from django.utils.timezone import make_aware
-from datetime import datetime
+from rest_framework.utils.urls import replace_query_param
+from django.utils.http import parse_etags, quote_etag
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db import router
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 
-class TradeOfferCreateView(CreateAPIView):
+class TradeOfferCreateView(ProfiledViewMixin, CreateAPIView):
     serializer_class = TradeOfferSerializer
 
     def post(self, request, *args, **kwargs):
@@ -20,9 +33,9 @@ class TradeOfferCreateView(CreateAPIView):
         serializer.is_valid(raise_exception=True)
 
         sender_id = serializer.validated_data["sender_id"]
-        receiver_id = serializer.validated_data["receiver_id"]
-        offered_items = request.data.get("offered_items", [])
-        requested_items = request.data.get("requested_items", [])
+        receiver_id = serializer.validated_data.get("receiver_id")
+        offered_items = serializer.validated_data.get("offered_items", [])
+        requested_items = serializer.validated_data.get("requested_items", [])
 
         try:
             trade_offer = TradeService.create_trade_offer(sender_id, receiver_id, offered_items, requested_items)
@@ -30,7 +43,21 @@ class TradeOfferCreateView(CreateAPIView):
         except TradeValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class TradeOfferUpdateView(APIView):
+class TradeOfferBulkCreateView(ProfiledViewMixin, APIView):
+    """
+    Creates many trade offers in one request.
+    Responds 201 when every offer was created, otherwise 207 with the error of each failed offer.
+    """
+
+    def post(self, request):
+        serializer = TradeOfferBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = TradeService.create_trade_offers(serializer.validated_data["offers"])
+        all_created = all("trade_offer_id" in result for result in results)
+        return Response({"results": results}, status=status.HTTP_201_CREATED if all_created else status.HTTP_207_MULTI_STATUS)
+
+class TradeOfferUpdateView(ProfiledViewMixin, APIView):
     """
     Allows users to accept or reject a trade offer.
     """
@@ -47,58 +74,235 @@ class TradeOfferUpdateView(APIView):
 
         try:
             trade_offer = TradeService.process_trade_offer(trade_offer_id, receiver_id, action)
-            return Response({"trade_offer_id": trade_offer.id, "status": trade_offer.get_status_display()}, status=status.HTTP_200_OK)
         except TradeValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {"trade_offer_id": trade_offer.id, "status": trade_offer.get_status_display()}
+        if trade_offer.status != TradeOffer.SETTLING:
+            return Response(data, status=status.HTTP_200_OK)
+
+        # Async settlement: the transfer is queued, poll the status URL for the outcome.
+        data["status_url"] = request.build_absolute_uri(reverse("trade-offer-settlement", args=[trade_offer.id]))
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["status_url"]})
+
+
+class TradeOfferSettlementView(ProfiledViewMixin, APIView):
+    """
+    Reports the settlement progress of an offer accepted in async settlement mode.
+    """
+
+    def get(self, request, trade_offer_id):
+        trade_offer = get_object_or_404(TradeOffer.objects.select_related("settlement"), id=trade_offer_id)
+
+        job = getattr(trade_offer, "settlement", None)
+        return Response({
+            "trade_offer_id": trade_offer.id,
+            "status": trade_offer.get_status_display(),
+            "settlement": job and {"status": job.get_status_display(), "attempts": job.attempts, "error": job.error or None},
+        })
         
 
-class TradeOfferHistoryView(APIView):
+class TradeOfferBatchProcessView(ProfiledViewMixin, APIView):
     """
-    Fetch trade history with optional filters.
+    Accepts or rejects many of a receiver's offers in one transaction, either listed
+    individually in `actions` or every pending offer from the sender in `reject_pending_from`.
+    """
+
+    def post(self, request):
+        serializer = TradeOfferBatchProcessSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = TradeService.process_trade_offers(
+            serializer.validated_data["receiver_id"],
+            serializer.validated_data.get("actions", []),
+            serializer.validated_data.get("reject_pending_from"),
+        )
+
+        # Async settlement: queued accepts carry the status URL to poll, as in TradeOfferUpdateView.
+        settling = dict(TradeOffer.STATUS_CHOICES)[TradeOffer.SETTLING]
+        for result in results:
+            if result.get("status") == settling:
+                result["status_url"] = request.build_absolute_uri(reverse("trade-offer-settlement", args=[result["trade_offer_id"]]))
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class TradeOfferReverseView(ProfiledViewMixin, APIView):
+    """
+    Reverses an accepted trade offer. Admin only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, trade_offer_id):
+        try:
+            trade_offer = TradeService.reverse_trade_offer(trade_offer_id)
+            return Response({"trade_offer_id": trade_offer.id, "status": trade_offer.get_status_display()}, status=status.HTTP_200_OK)
+        except TradeValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class TradeOfferBulkReverseView(ProfiledViewMixin, APIView):
+    """
+    Reverses many accepted trade offers, one transaction per chunk. Admin only.
+    Takes either a list of `trade_offer_ids` or a `user_id` whose accepted offers are all reversed.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = TradeOfferReversalSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = TradeService.reverse_trade_offers(
+            trade_offer_ids=serializer.validated_data.get("trade_offer_ids"),
+            user_id=serializer.validated_data.get("user_id"),
+            chunk_size=serializer.validated_data.get("chunk_size"),
+        )
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class TradeOfferHistoryView(ReplicaReadMixin, ProfiledViewMixin, APIView):
+    """
+    Fetch trade history with optional filters, newest first.
+    Results are keyset-paginated: pass `page_size` to size the page and the `X-Next-Cursor`
+    response header back as `cursor` to fetch the next one.
     """
 
     def get(self, request):
         user_id = request.query_params.get("user_id")
-        status_filter = request.query_params.get("status")
-        sent_or_received = request.query_params.get("type")
-        start_date = request.query_params.get("start_date")
-        end_date = request.query_params.get("end_date")
+        cursor = request.query_params.get("cursor")
 
         if not user_id:
             return Response({"error": "user_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        trade_offers = TradeOffer.objects.filter(Q(sender_id=user_id) | Q(receiver_id=user_id))
+        try:
+            direction, filters = TradeHistoryService.parse_filters(request.query_params)
+            page_size = TradeHistoryService.parse_page_size(request.query_params.get("page_size"))
+            trade_offers, next_cursor = TradeHistoryService.get_page(user_id, direction, filters, cursor, page_size)
+        except TradeValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serialized_data = TradeOfferSerializer(trade_offers, many=True).data
+        response = Response(serialized_data, status=status.HTTP_200_OK)
 
-        if sent_or_received:
-            if sent_or_received.lower() == "sent":
-                trade_offers = trade_offers.filter(sender_id=user_id)
-            elif sent_or_received.lower() == "received":
-                trade_offers = trade_offers.filter(receiver_id=user_id)
-            else:
-                return Response({"error": "Invalid type parameter"}, status=400)
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), "cursor", next_cursor)
+            response["X-Next-Cursor"] = next_cursor
+            response["Link"] = f'<{next_url}>; rel="next"'
 
-        if status_filter:
-            trade_offers = trade_offers.filter(status=status_filter)
+        return response
 
-        if start_date:
-            start_date = parse_date(start_date)
-            if start_date:
-                start_date = make_aware(datetime.combine(start_date, datetime.min.time()))
-                trade_offers = trade_offers.filter(created_at__gte=start_date)
 
-        if end_date:
-            end_date = parse_date(end_date)
-            if end_date:
-                end_date = make_aware(datetime.combine(end_date, datetime.max.time()))
-                trade_offers = trade_offers.filter(created_at__lte=end_date)
+class TradeOfferExportView(ReplicaReadMixin, ProfiledViewMixin, APIView):
+    """
+    Streams the full trade history, of one user (`user_id`) or of everyone, as NDJSON or CSV
+    (`file_format`), one row per trade item. Accepts the history filters (status, type,
+    start_date, end_date) and runs in constant memory regardless of the number of rows.
+    """
 
-        serialized_data = TradeOfferSerializer(trade_offers, many=True).data
-        return Response(serialized_data, status=status.HTTP_200_OK)
+    def get(self, request):
+        file_format = request.query_params.get("file_format", TradeExportService.NDJSON).lower()
+        if file_format not in TradeExportService.FORMATS:
+            return Response({"error": "Invalid file_format parameter"}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            direction, filters = TradeHistoryService.parse_filters(request.query_params)
+        except TradeValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class InventoryView(ListAPIView):
+        user_id = request.query_params.get("user_id")
+        if direction and not user_id:
+            return Response({"error": "type requires user_id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The rows are read while the response streams, after dispatch(): fix the database now.
+        rows = TradeExportService.rows(user_id, direction, filters, using=router.db_for_read(TradeOffer))
+        response = StreamingHttpResponse(TradeExportService.encode(rows, file_format), content_type=TradeExportService.FORMATS[file_format])
+        response["Content-Disposition"] = f'attachment; filename="trades.{file_format}"'
+        return response
+
+
+class UserTradeStatsView(ReplicaReadMixin, ProfiledViewMixin, APIView):
+    """
+    Returns a user's offer counts and traded volume per weapon type from the
+    incrementally maintained summary tables.
+    """
+
+    def get(self, request, user_id):
+        return Response(TradeStatsService.get_stats(user_id), status=status.HTTP_200_OK)
+
+
+class MarketSeriesView(ReplicaReadMixin, ProfiledViewMixin, APIView):
+    """
+    Returns the traded volume of a weapon (variant) per minute, hour or day bucket from the
+    market rollups (`resolution`, `variant_id`, `start_date`, `end_date`). With
+    `quote_weapon_id` (and `quote_variant_id`) it also returns the implied exchange ratio
+    against that instrument.
+    """
+
+    def get(self, request, weapon_id):
+        params = request.query_params
+        try:
+            resolution, start, end = MarketRollupService.parse_params(params)
+            variant_id = int(params.get("variant_id") or 0)
+            quote_weapon_id = int(params["quote_weapon_id"]) if params.get("quote_weapon_id") else None
+            quote_variant_id = int(params.get("quote_variant_id") or 0)
+        except ValueError:
+            return Response({"error": "Invalid instrument parameter"}, status=status.HTTP_400_BAD_REQUEST)
+        except TradeValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            "weapon_id": weapon_id,
+            "variant_id": variant_id or None,
+            "resolution": params.get("resolution", "day").lower(),
+            "volume": MarketRollupService.get_volume(weapon_id, variant_id, resolution, start, end),
+        }
+        if quote_weapon_id is not None:
+            data["ratios"] = MarketRollupService.get_ratios((weapon_id, variant_id), (quote_weapon_id, quote_variant_id), resolution, start, end)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class TradeAnalyticsView(ReplicaReadMixin, ProfiledViewMixin, APIView):
+    """
+    Returns the last stored result of an offline analytics metric (exchange-rates, centrality or
+    inventory), computed with NumPy over the whole trade history by `trade_analytics --store`.
+    """
+
+    def get(self, request, metric):
+        if metric not in TradeAnalyticsService.METRICS:
+            return Response({"error": "Invalid metric"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.query_params.get("limit") or settings.ANALYTICS_RESULT_LIMIT)
+        except ValueError:
+            return Response({"error": "Invalid limit parameter"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.ANALYTICS_RESULT_LIMIT))
+
+        stored = TradeAnalyticsService.get_stored(metric, limit)
+        if stored is None:
+            return Response({"error": f"Metric {metric} has not been computed yet"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({"metric": metric, **stored}, status=status.HTTP_200_OK)
+
+
+class InventoryView(ReplicaReadMixin, ProfiledViewMixin, ListAPIView):
+    """
+    Returns a user's inventory from the read-through inventory cache.
+    Responds with 304 when the client's If-None-Match matches the current snapshot.
+    """
     serializer_class = InventorySerializer
 
     def get_queryset(self):
         user_id = self.kwargs["user_id"]
-        return Inventory.objects.filter(user_id=user_id)
\ No newline at end of file
+        return Inventory.objects.filter(user_id=user_id).select_related("weapon", "variant").order_by("id")
+
+    def list(self, request, *args, **kwargs):
+        snapshot = InventoryCache.get_snapshot(
+            self.kwargs["user_id"], lambda: self.get_serializer(self.get_queryset(), many=True).data
+        )
+        etag = quote_etag(snapshot["etag"])
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(snapshot["data"], status=status.HTTP_200_OK)
+
+        response["ETag"] = etag
+        return response